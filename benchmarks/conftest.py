@@ -0,0 +1,211 @@
+"""Configuration des benchmarks Piscinexa : chemin d'import et baselines.
+
+Les latences sont relatives : chaque série d'appels est chronométrée contre une
+charge de référence, mesurée juste après. Leur rapport ne dépend ni de la
+vitesse de la machine, ni de ses variations pendant le run (fréquence du CPU,
+voisins d'une machine virtuelle). baselines.json le stocke en µs, multiplié par
+la latence de la charge de référence sur la machine qui l'a écrit ("_calibration").
+
+Options :
+  --update-baselines      réécrit baselines.json avec les mesures du run
+  --baseline-threshold=X  régression tolérée, en fraction (1.0 = +100 %)
+  --storm-pools=1,10      nombres de piscines des rafales de bout en bout
+  --storm-seconds=X       durée de chaque rafale, en secondes
+"""
+import gc
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+CALIBRATION_KEY = "_calibration"
+DEFAULT_THRESHOLD = 1.0
+# Écart absolu en dessous duquel une hausse de latence n'est pas une régression : sous la
+# microseconde, l'ordonnanceur suffit à doubler une médiane. Un getter de 0,3 µs qui passe
+# à 3 µs échoue toujours.
+MIN_REGRESSION_US = 1.0
+# Durée minimale d'une série chronométrée, très au-dessus de la résolution de l'horloge
+MIN_SERIES_SECONDS = 0.01
+# Séries par mesure, dont on retient la médiane
+LATENCY_SERIES = 9
+# Nouvelles mesures avant de confirmer une régression de latence
+LATENCY_CONFIRMATIONS = 3
+# Marge absolue sur la mémoire, pour les variations d'allocateur
+ALLOCATION_SLACK_BYTES = 512
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("piscinexa-baselines")
+    group.addoption("--update-baselines", action="store_true", default=False,
+                    help="Réécrit benchmarks/baselines.json avec les mesures du run")
+    group.addoption("--baseline-threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="Régression tolérée par rapport à la baseline (1.0 = +100 %%)")
+    group = parser.getgroup("piscinexa-storm")
+    group.addoption("--storm-pools", default="1,10",
+                    help="Nombres de piscines simulées, séparés par des virgules")
+    group.addoption("--storm-seconds", type=float, default=5.0,
+                    help="Durée de chaque rafale d'états, en secondes")
+
+
+def pytest_configure(config):
+    logging.getLogger("custom_components.piscinexa").setLevel(logging.WARNING)
+    config._piscinexa_measures = {}
+    config._piscinexa_calibration_us = None
+    config._piscinexa_storm = StormReport(config.getoption("--storm-seconds"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if config.getoption("--update-baselines") and config._piscinexa_measures:
+        baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+        baselines.update(config._piscinexa_measures)
+        baselines[CALIBRATION_KEY] = {"latency_us": config._piscinexa_calibration_us}
+        BASELINES_FILE.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    report = config._piscinexa_storm
+    if report.results:
+        terminalreporter.write_sep("-", "Rafales d'états Piscinexa")
+        for line in report.lines():
+            terminalreporter.write_line(line)
+
+
+class StormReport:
+    """Résultats des rafales de bout en bout, affichés en fin de session."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.results: List[Dict[str, Any]] = []
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.results.append(result)
+
+    def lines(self) -> List[str]:
+        header = (
+            f"{'piscines':>8} {'entités':>8} {'sources/s':>10} {'écritures/s':>12} "
+            f"{'CPU intég. (s)':>15} {'CPU %':>6} {'latence moy/p99/max (ms)':>26} {'p99 réf. (ms)':>14}"
+        )
+        lines = [header]
+        for result in sorted(self.results, key=lambda item: item["pools"]):
+            elapsed = result["elapsed"] or 1.0
+            lag = f"{result['lag_mean_ms']:.2f}/{result['lag_p99_ms']:.2f}/{result['lag_max_ms']:.2f}"
+            lines.append(
+                f"{result['pools']:>8} {result['entities']:>8} {result['source_events'] / elapsed:>10.0f} "
+                f"{result['writes'] / elapsed:>12.1f} {result['integration_cpu']:>15.3f} "
+                f"{result['integration_cpu'] / elapsed:>6.1%} {lag:>26} {result['reference_lag_p99_ms']:>14.2f}"
+            )
+        return lines
+
+
+_CALIBRATION_VALUES = {"ph": 7.2, "chlore": 1.5, "volume": 48.0}
+
+
+def _calibration_workload() -> float:
+    """Charge de référence : lectures de dictionnaire et calcul flottant, comme un getter."""
+    values = _CALIBRATION_VALUES
+    return round(values["ph"] * values["volume"] / (values["chlore"] + 1.0), 2)
+
+
+def _series(func: Callable[[], Any], calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return time.perf_counter() - started
+
+
+def _calls_per_series(func: Callable[[], Any]) -> int:
+    """Nombre d'appels pour qu'une série dure au moins MIN_SERIES_SECONDS."""
+    calls = 1000
+    while _series(func, calls) < MIN_SERIES_SECONDS:
+        calls *= 2
+    return calls
+
+
+def relative_latency(func: Callable[[], Any]) -> float:
+    """Latence d'un appel de func rapportée à celle de la charge de référence.
+
+    Chaque série de func est suivie d'une série de la charge de référence : un
+    ralentissement de la machine touche les deux. La médiane des LATENCY_SERIES
+    rapports écarte les séries troublées par l'ordonnanceur. Comme timeit, le
+    ramasse-miettes est suspendu pendant la mesure.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        calls = _calls_per_series(func)
+        reference_calls = _calls_per_series(_calibration_workload)
+        return statistics.median(
+            (_series(func, calls) / calls) / (_series(_calibration_workload, reference_calls) / reference_calls)
+            for _ in range(LATENCY_SERIES)
+        )
+    finally:
+        gc.enable()
+
+
+def calibration_latency_us() -> float:
+    """Latence médiane de la charge de référence sur cette machine, en µs."""
+    gc.collect()
+    gc.disable()
+    try:
+        calls = _calls_per_series(_calibration_workload)
+        return statistics.median(_series(_calibration_workload, calls) / calls for _ in range(LATENCY_SERIES)) * 1e6
+    finally:
+        gc.enable()
+
+
+@pytest.fixture
+def storm_report(request) -> StormReport:
+    return request.config._piscinexa_storm
+
+
+@pytest.fixture
+def baseline(request):
+    """Compare la latence et l'allocation d'un appel à sa baseline ; échoue au-delà du seuil de régression."""
+    config = request.config
+    baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+    threshold = config.getoption("--baseline-threshold")
+
+    def check(name: str, func: Callable[[], Any], peak_bytes: int) -> None:
+        if config.getoption("--update-baselines"):
+            # La charge de référence n'est mesurée qu'une fois : les baselines réécrites
+            # et celles laissées telles quelles restent comparables
+            if config._piscinexa_calibration_us is None:
+                config._piscinexa_calibration_us = (
+                    baselines[CALIBRATION_KEY]["latency_us"] if CALIBRATION_KEY in baselines
+                    else round(calibration_latency_us(), 4)
+                )
+            latency_us = relative_latency(func) * config._piscinexa_calibration_us
+            config._piscinexa_measures[name] = {"latency_us": round(latency_us, 3), "peak_bytes": peak_bytes}
+            return
+        reference = baselines.get(name)
+        if reference is None or CALIBRATION_KEY not in baselines:
+            pytest.skip(f"Pas de baseline pour {name} : lancer avec --update-baselines")
+        calibration_us = baselines[CALIBRATION_KEY]["latency_us"]
+        latency_us = relative_latency(func) * calibration_us
+        limit = max(reference["latency_us"] * (1 + threshold), reference["latency_us"] + MIN_REGRESSION_US)
+        # Un dépassement isolé est souvent du bruit (ordonnanceur) : il n'est retenu
+        # que s'il se confirme sur les mesures suivantes
+        for _ in range(LATENCY_CONFIRMATIONS):
+            if latency_us <= limit:
+                break
+            latency_us = min(latency_us, relative_latency(func) * calibration_us)
+        failures = []
+        if latency_us > limit:
+            failures.append(f"latence {latency_us:.2f} µs > {reference['latency_us']:.2f} µs")
+        if peak_bytes > reference["peak_bytes"] * (1 + threshold) + ALLOCATION_SLACK_BYTES:
+            failures.append(f"mémoire {peak_bytes} o > {reference['peak_bytes']} o")
+        if failures:
+            pytest.fail(f"Régression de {name} au-delà de {threshold:.0%} : " + ", ".join(failures))
+
+    return check
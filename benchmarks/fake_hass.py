@@ -0,0 +1,192 @@
+"""Faux hass pour les benchmarks Piscinexa.
+
+Les capteurs sont construits sur un faux hass réduit à ce qu'ils lisent
+(hass.states, hass.data, hass.config, registre des entités) ; les objets d'exécution de l'entrée
+(répartiteur, planificateur, flotte, stocks...) sont les vrais.
+"""
+import asyncio
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from custom_components.piscinexa.const import DOMAIN
+from custom_components.piscinexa.dispatcher import PiscinexaDispatcher
+from custom_components.piscinexa.fleet import PiscinexaFleet
+from custom_components.piscinexa.helpers import source_entity_ids
+from custom_components.piscinexa.inventory import PiscinexaInventory
+from custom_components.piscinexa.pool_config import PoolConfig
+from custom_components.piscinexa.pump_controller import PiscinexaPumpController
+from custom_components.piscinexa.scheduler import PiscinexaFiltrationScheduler
+from custom_components.piscinexa.temperature_forecast import PiscinexaWaterTemperatureModel
+
+NAME = "bench"
+ENTRY_DATA = {
+    "name": NAME,
+    "pool_type": "square",
+    "length": 8.0,
+    "width": 4.0,
+    "depth": 1.5,
+    "ph_current": 7.0,
+    "ph_target": 7.4,
+    "chlore_current": 1.0,
+    "chlore_target": 2.0,
+    "temperature": 24.0,
+    "temperature_sensor": "sensor.bench_water_temperature",
+    "ph_sensor": "sensor.bench_ph_probe",
+    "chlore_sensor": "sensor.bench_chlore_probe",
+    "power_sensor_entity_id": "sensor.bench_pump_power",
+    "ph_plus_treatment": "Liquide",
+    "ph_minus_treatment": "Liquide",
+    "chlore_treatment": "Chlore choc (poudre)",
+}
+ENTRY_OPTIONS = {
+    "pump_switch": "switch.bench_pump",
+    "weather_entity": "weather.bench",
+    "heat_pump_power": 1500,
+    "tariff_schedule": [{"start": "00:00", "price": 0.15}, {"start": "06:00", "price": 0.30}],
+}
+SOURCE_STATES = {
+    "sensor.bench_water_temperature": ("26.5", {"unit_of_measurement": "°C"}),
+    "sensor.bench_ph_probe": ("7.1", {}),
+    "sensor.bench_chlore_probe": ("0.8", {}),
+    "sensor.bench_pump_power": ("650", {"unit_of_measurement": "W"}),
+    "switch.bench_pump": ("on", {}),
+    "weather.bench": ("sunny", {"temperature": 27.0, "cloud_coverage": 20, "wind_speed": 8}),
+    # Entités des capteurs lues par l'état de la piscine
+    f"sensor.{NAME}_temperature": ("26.5", {}),
+    f"sensor.{NAME}_ph": ("7.1", {}),
+    f"sensor.{NAME}_chlore": ("0.8", {}),
+    f"sensor.{NAME}_tempsfiltration_recommande": ("13.2", {}),
+    f"sensor.{NAME}_tempsfiltration_effectue": ("6.5", {}),
+    f"number.{NAME}_ph_target": ("7.4", {}),
+    f"number.{NAME}_chlore_target": ("2.0", {}),
+    f"number.{NAME}_cya": ("40", {}),
+    f"number.{NAME}_temperature_target": ("29", {}),
+    f"select.{NAME}_ph_plus_treatment": ("Liquide", {}),
+    f"select.{NAME}_ph_minus_treatment": ("Liquide", {}),
+    f"select.{NAME}_chlore_treatment": ("Chlore choc (poudre)", {}),
+}
+
+
+class FakeState:
+    """État minimal : valeur, attributs et horodatage."""
+
+    def __init__(self, entity_id: str, state: str, attributes: Optional[Dict[str, Any]] = None):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+        self.last_updated = self.last_changed = dt_util.utcnow()
+
+
+class FakeStates:
+    def __init__(self):
+        self._states: Dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> Optional[FakeState]:
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self._states[entity_id] = FakeState(entity_id, state, attributes)
+
+    def async_all(self, domain: Optional[str] = None):
+        return [state for entity_id, state in self._states.items() if domain is None or entity_id.startswith(f"{domain}.")]
+
+
+class FakeEntityRegistry:
+    """Registre vide : les entités sont retrouvées par leur identifiant de repli."""
+
+    def async_get_entity_id(self, domain: str, platform: str, unique_id: str) -> Optional[str]:
+        return None
+
+
+class FakeLoop:
+    """Boucle qui ignore les rappels différés : les benchmarks restent synchrones."""
+
+    def call_soon(self, callback, *args):
+        return None
+
+    def call_later(self, delay, callback, *args):
+        return SimpleNamespace(cancel=lambda: None)
+
+    def time(self) -> float:
+        return 0.0
+
+
+class FakeStore:
+    """Stockage sans écriture disque."""
+
+    def async_delay_save(self, data_func, delay=0):
+        return None
+
+    async def async_load(self):
+        return None
+
+
+class FakeHass:
+    def __init__(self):
+        self.states = FakeStates()
+        self.data: Dict[str, Any] = {er.DATA_REGISTRY: FakeEntityRegistry()}
+        self.loop = FakeLoop()
+        self.config = SimpleNamespace(currency="EUR", time_zone="Europe/Paris", config_dir="/tmp", language="fr")
+
+    def async_create_task(self, coroutine, *args, **kwargs):
+        coroutine.close()
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+def make_hass() -> FakeHass:
+    """Faux hass peuplé d'une entrée et des entités sources."""
+    hass = FakeHass()
+    entry = SimpleNamespace(entry_id="bench_entry", data=dict(ENTRY_DATA), options=dict(ENTRY_OPTIONS), title=NAME)
+    for entity_id, (state, attributes) in SOURCE_STATES.items():
+        hass.states.async_set(entity_id, state, attributes)
+    dispatcher = PiscinexaDispatcher(hass, NAME, source_entity_ids(entry))
+    scheduler = PiscinexaFiltrationScheduler(hass, entry, dispatcher)
+    inventory = PiscinexaInventory(hass)
+    inventory._store = FakeStore()
+    temperature_model = PiscinexaWaterTemperatureModel(hass, entry, dispatcher, scheduler)
+    temperature_model._store = FakeStore()
+    hass.data[DOMAIN] = {
+        "translations": {},
+        "fleet": PiscinexaFleet(hass),
+        "inventory": inventory,
+        entry.entry_id: {
+            "config": PoolConfig(entry.data),
+            "temperature": 26.5,
+            "ph_current": 7.1,
+            "chlore_current": 0.8,
+            "volume": 48.0,
+            "dispatcher": dispatcher,
+            "scheduler": scheduler,
+            "pump_controller": PiscinexaPumpController(hass, entry, dispatcher, scheduler),
+            "temperature_model": temperature_model,
+        },
+    }
+    hass.entry = entry
+    return hass
+
+
+def measure_allocation(func, calls: int = 20) -> int:
+    """Pic de mémoire allouée par appel (octets), sur le meilleur de plusieurs appels."""
+    func()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def run_async(coroutine):
+    return asyncio.run(coroutine)
@@ -0,0 +1,188 @@
+"""Benchmark de bout en bout : rafales d'états sur N piscines dans un vrai Home Assistant.
+
+Chaque piscine a sa propre entrée de configuration et ses sources : un
+compteur de puissance publié à 10 Hz et des sondes (température, pH, chlore)
+à 1 Hz. Sont mesurés la latence de la boucle d'événements, le nombre
+d'écritures d'état des entités Piscinexa par seconde et le temps CPU de
+l'intégration, obtenu par différence avec les mêmes rafales sans entrée.
+
+Lancement :
+    pytest benchmarks/test_event_storm.py --storm-pools=1,10,50 --storm-seconds=10
+"""
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.piscinexa.const import DOMAIN
+from custom_components.piscinexa.diagnostics import async_get_config_entry_diagnostics
+from custom_components.piscinexa.fleet import METRIC_CHLORE_OUT_OF_RANGE, METRIC_PH_OUT_OF_RANGE
+
+POWER_RATE = 10
+PROBE_RATE = 1
+# Période de la sonde de latence de la boucle d'événements (s)
+LAG_PROBE_INTERVAL = 0.01
+
+
+def pytest_generate_tests(metafunc):
+    if "pools" in metafunc.fixturenames:
+        counts = [int(value) for value in metafunc.config.getoption("--storm-pools").split(",") if value]
+        metafunc.parametrize("pools", counts, ids=[f"{count}_piscines" for count in counts])
+
+
+def _sources(index: int) -> Dict[str, str]:
+    prefix = f"sensor.storm{index}"
+    return {
+        "power_sensor_entity_id": f"{prefix}_pump_power",
+        "temperature_sensor": f"{prefix}_water_temperature",
+        "ph_sensor": f"{prefix}_ph_probe",
+        "chlore_sensor": f"{prefix}_chlore_probe",
+    }
+
+
+def _entry_data(index: int) -> Dict[str, Any]:
+    return {
+        "name": f"storm{index}",
+        "pool_type": "square",
+        "length": 8.0,
+        "width": 4.0,
+        "depth": 1.5,
+        "ph_current": 7.0,
+        "ph_target": 7.4,
+        "chlore_current": 1.0,
+        "chlore_target": 2.0,
+        "temperature": 24.0,
+        "ph_plus_treatment": "Liquide",
+        "ph_minus_treatment": "Liquide",
+        "chlore_treatment": "Chlore choc (poudre)",
+        **_sources(index),
+    }
+
+
+class _Streams:
+    """Valeurs synthétiques des sources : marche aléatoire autour d'une valeur réaliste."""
+
+    def __init__(self, pools: int, seed: int = 42):
+        self._random = random.Random(seed)
+        self._probes = [{"temperature": 26.0, "ph": 7.2, "chlore": 1.0} for _ in range(pools)]
+
+    def power(self) -> str:
+        return str(round(650 + self._random.uniform(-40, 40), 1))
+
+    def probes(self, index: int) -> Dict[str, str]:
+        values = self._probes[index]
+        values["temperature"] = min(max(values["temperature"] + self._random.uniform(-0.05, 0.05), 20), 32)
+        values["ph"] = min(max(values["ph"] + self._random.uniform(-0.01, 0.01), 6.8), 7.8)
+        values["chlore"] = min(max(values["chlore"] + self._random.uniform(-0.02, 0.02), 0.2), 3.0)
+        return {
+            "temperature_sensor": str(round(values["temperature"], 1)),
+            "ph_sensor": str(round(values["ph"], 2)),
+            "chlore_sensor": str(round(values["chlore"], 2)),
+        }
+
+
+async def _measure_lag(hass: HomeAssistant, stop: asyncio.Event, lags: List[float]) -> None:
+    """Retard de réveil d'un sommeil court : la boucle ne peut pas répondre plus vite."""
+    while not stop.is_set():
+        expected = hass.loop.time() + LAG_PROBE_INTERVAL
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(max(hass.loop.time() - expected, 0.0))
+
+
+async def _storm(hass: HomeAssistant, pools: int, seconds: float, watched: set) -> Dict[str, Any]:
+    """Envoie les rafales pendant seconds et retourne les mesures."""
+    streams = _Streams(pools)
+    writes = 0
+
+    @callback
+    def _count(event: Event) -> None:
+        nonlocal writes
+        if event.data["entity_id"] in watched:
+            writes += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count)
+    lags: List[float] = []
+    stop = asyncio.Event()
+    # Tâche hors de celles suivies par hass, que async_block_till_done n'attend pas
+    probe = hass.loop.create_task(_measure_lag(hass, stop, lags))
+    sources = [_sources(index) for index in range(pools)]
+    ticks = int(seconds * POWER_RATE)
+    source_events = 0
+    cpu_start = time.process_time()
+    started = hass.loop.time()
+    for tick in range(ticks):
+        for index, source in enumerate(sources):
+            hass.states.async_set(source["power_sensor_entity_id"], streams.power(), {"unit_of_measurement": "W"})
+            source_events += 1
+            if tick % (POWER_RATE // PROBE_RATE) == 0:
+                for key, value in streams.probes(index).items():
+                    hass.states.async_set(source[key], value)
+                    source_events += 1
+        delay = started + (tick + 1) / POWER_RATE - hass.loop.time()
+        await asyncio.sleep(max(delay, 0))
+    await hass.async_block_till_done()
+    elapsed = hass.loop.time() - started
+    cpu = time.process_time() - cpu_start
+    stop.set()
+    await probe
+    unsub()
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "cpu": cpu,
+        "source_events": source_events,
+        "writes": writes,
+        "lag_mean_ms": statistics.fmean(lags) * 1000 if lags else 0.0,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        "lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+async def test_event_storm(hass, enable_custom_integrations, storm_report, pools):
+    seconds = storm_report.seconds
+    for index in range(pools):
+        for entity_id in _sources(index).values():
+            hass.states.async_set(entity_id, "0")
+
+    # Référence : mêmes rafales sans l'intégration, pour isoler son coût CPU
+    reference = await _storm(hass, pools, seconds, set())
+
+    entries = []
+    for index in range(pools):
+        entry = MockConfigEntry(domain=DOMAIN, data=_entry_data(index), title=f"Piscinexa storm{index}")
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+    sources = {entity_id for index in range(pools) for entity_id in _sources(index).values()}
+    watched = {state.entity_id for state in hass.states.async_all()} - sources
+
+    result = await _storm(hass, pools, seconds, watched)
+    result.update(
+        pools=pools,
+        entities=len(watched),
+        integration_cpu=max(result["cpu"] - reference["cpu"], 0.0),
+        reference_lag_p99_ms=reference["lag_p99_ms"],
+    )
+    storm_report.add(result)
+
+    # Les relevés de pH et de chlore de chaque piscine alimentent la flotte par leurs abonnements
+    fleet = hass.data[DOMAIN]["fleet"]
+    assert fleet.pool_count(METRIC_PH_OUT_OF_RANGE) == pools
+    assert fleet.pool_count(METRIC_CHLORE_OUT_OF_RANGE) == pools
+
+    # Les diagnostics, compteurs remplis par la rafale, ne doivent pas révéler le nom de la piscine
+    for entry in entries:
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        assert entry.data["name"] not in json.dumps(diagnostics, default=str).lower()
+
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert result["writes"] > 0
@@ -0,0 +1,128 @@
+"""Micro-benchmarks de native_value et extra_state_attributes de chaque capteur.
+
+Lancement :
+    pytest benchmarks/test_sensor_formulas.py
+    pytest benchmarks/test_sensor_formulas.py --update-baselines
+"""
+from datetime import timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.piscinexa import sensor as sensors
+from custom_components.piscinexa.const import DOMAIN
+from custom_components.piscinexa.fleet import METRIC_ENERGY_KWH, METRIC_FILTRATION_HOURS
+
+from fake_hass import NAME, make_hass, measure_allocation, run_async
+
+POOL_SENSORS = [
+    sensors.PiscinexaVolumeSensor,
+    sensors.PiscinexaTempsFiltrationRecommandeSensor,
+    sensors.PiscinexaTempsFiltrationEffectueSensor,
+    sensors.PiscinexaFiltrationPlanSensor,
+    sensors.PiscinexaWaterTemperatureForecastSensor,
+    sensors.PiscinexaTemperatureSensor,
+    sensors.PiscinexaPhSensor,
+    sensors.PiscinexaPhPlusAjouterSensor,
+    sensors.PiscinexaPhMinusAjouterSensor,
+    sensors.PiscinexaPhTargetSensor,
+    sensors.PiscinexaChloreSensor,
+    sensors.PiscinexaChloreTargetSensor,
+    sensors.PiscinexaChloreAjouterSensor,
+    sensors.PiscinexaChloreDifferenceSensor,
+    sensors.PiscinexaPowerSensor,
+    sensors.PiscinexaPoolStateSensor,
+    sensors.PiscinexaLsiSensor,
+    sensors.PiscinexaHeatingSensor,
+    sensors.PiscinexaPhDifferenceSensor,
+    sensors.PiscinexaPhTreatmentSensor,
+    sensors.PiscinexaChloreTreatmentSensor,
+    sensors.PiscinexaTreatmentPlanSensor,
+    sensors.PiscinexaChloreStateSensor,
+    sensors.PiscinexaPhStateSensor,
+    sensors.PiscinexaTemperatureStateSensor,
+    sensors.PiscinexaPoolTypeSensor,
+]
+
+PROPERTIES = ("native_value", "extra_state_attributes")
+
+
+def _prepare(hass):
+    """Donne aux objets d'exécution un état réaliste : plan, prévision, stocks."""
+    runtime = hass.data[DOMAIN][hass.entry.entry_id]
+    scheduler = runtime["scheduler"]
+    scheduler.async_set_required_hours(13.0)
+    run_async(scheduler._async_solve())
+    model = runtime["temperature_model"]
+    tomorrow = dt_util.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    model._forecast = [
+        {"datetime": (tomorrow + timedelta(hours=hour)).isoformat(), "temperature": 28 + hour, "cloud_coverage": 10, "wind_speed": 6}
+        for hour in range(6)
+    ]
+    model._async_predict()
+    inventory = hass.data[DOMAIN]["inventory"]
+    inventory.async_restock(NAME, "chlore", "Chlore choc (poudre)", 5000)
+    for product, form, quantity in (("ph_plus", "Liquide", 20), ("ph_minus", "Liquide", 20), ("chlore", "Liquide", 10000)):
+        inventory.async_restock("shared", product, form, quantity)
+    fleet = hass.data[DOMAIN]["fleet"]
+    fleet.async_update(hass.entry.entry_id, METRIC_FILTRATION_HOURS, 6.5)
+    fleet.async_update(hass.entry.entry_id, METRIC_ENERGY_KWH, 4.2)
+
+
+def _build(factory):
+    hass = make_hass()
+    _prepare(hass)
+    sensor = factory(hass)
+    # Les capteurs calculés hors propriétés (async_update, abonnements) sont amorcés une fois
+    if hasattr(sensor, "_async_recompute"):
+        sensor._async_recompute()
+    elif hasattr(sensor, "async_update"):
+        run_async(sensor.async_update())
+    return sensor
+
+
+def _cases():
+    for cls in POOL_SENSORS:
+        yield cls.__name__, lambda hass, cls=cls: cls(hass, hass.entry, NAME)
+    for key, label, metric, unit, icon, extra in sensors.FLEET_SENSOR_DESCRIPTIONS:
+        yield f"PiscinexaFleetSensor[{key}]", (
+            lambda hass, description=(key, label, metric, unit, icon, extra): sensors.PiscinexaFleetSensor(
+                hass, hass.data[DOMAIN]["fleet"], *description
+            )
+        )
+    for product, label in sensors.STOCK_LABELS.items():
+        yield f"PiscinexaStockSensor[{product}]", (
+            lambda hass, product=product, label=label: sensors.PiscinexaStockSensor(
+                hass, product, label, entry=hass.entry, pool=NAME
+            )
+        )
+
+
+CASES = dict(_cases())
+
+
+def _defined_in_sensor_module(case: str, prop: str) -> bool:
+    """Vrai si la propriété est écrite dans sensor.py et non héritée de Home Assistant."""
+    cls = type(CASES[case](make_hass()))
+    owner = next(klass for klass in cls.__mro__ if prop in vars(klass))
+    return owner.__module__ == sensors.__name__
+
+
+PARAMS = [(case, prop) for case in CASES for prop in PROPERTIES if _defined_in_sensor_module(case, prop)]
+
+
+@pytest.mark.parametrize(("case", "prop"), PARAMS)
+def test_sensor_property(benchmark, baseline, case, prop):
+    sensor = _build(CASES[case])
+
+    def call():
+        return getattr(sensor, prop)
+
+    benchmark.group = prop
+    benchmark(call)
+    peak_bytes = measure_allocation(call)
+    benchmark.extra_info["peak_bytes"] = peak_bytes
+    # La baseline est comparée à une mesure propre, identique que pytest-benchmark soit
+    # actif ou non (--benchmark-disable)
+    baseline(f"{case}.{prop}", call, peak_bytes)
@@ -3,22 +3,59 @@ import json
 import logging
 import os
 from functools import partial
+from typing import Any, Dict, Set
 
+from homeassistant.components.number import ATTR_VALUE, DOMAIN as NUMBER_DOMAIN, SERVICE_SET_VALUE
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import ATTR_ENTITY_ID, Platform
 from homeassistant.core import HomeAssistant
 
+from .const import (
+    CONF_FILTRATION_MIN_BLOCK,
+    CONF_FILTRATION_WINDOWS,
+    CONF_PRODUCT_PRICES,
+    CONF_PROFILING,
+    CONF_SIMULATOR,
+    CONF_TARIFF_SCHEDULE,
+    CONF_TARIFF_SENSOR,
+    DATA_OPTION_KEYS,
+    OPTION_DEFAULTS,
+)
+from .dispatcher import PiscinexaDispatcher
+from .fleet import PiscinexaFleet
+from .helpers import entry_entity_id, source_entity_ids
+from .inventory import PiscinexaInventory
+from .pool_config import CONFIG_VERSION, PoolConfig, normalize_pool_data
+from .profiling import PiscinexaProfiler, PiscinexaWriteCounter
+from .pump_controller import PiscinexaPumpController
+from .scheduler import PiscinexaFiltrationScheduler
+from .simulator import PiscinexaSimulator
+from .temperature_forecast import PiscinexaWaterTemperatureModel
+from .services import async_setup_services
+
 DOMAIN = "piscinexa"
 VERSION = "1.0.0"
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR, Platform.BUTTON]
+PLATFORMS = [Platform.NUMBER, Platform.SELECT, Platform.SENSOR, Platform.BUTTON, Platform.CALENDAR]
+# Une entrée simulateur n'expose que ses capteurs synthétiques
+SIMULATOR_PLATFORMS = [Platform.SENSOR]
+
+# Options appliquées sans rechargement : les autres recréent des entités ou
+# des modules qui lisent leurs options au démarrage, et rechargent l'entrée.
+TARGET_KEYS = ("ph_target", "chlore_target")
+SCHEDULE_KEYS = {CONF_TARIFF_SCHEDULE, CONF_FILTRATION_WINDOWS, CONF_FILTRATION_MIN_BLOCK}
+HOT_KEYS = {*DATA_OPTION_KEYS, *SCHEDULE_KEYS, CONF_TARIFF_SENSOR, CONF_PRODUCT_PRICES}
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Configure l'intégration Piscinexa."""
     hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN]["fleet"] = PiscinexaFleet(hass)
+    inventory = PiscinexaInventory(hass)
+    await inventory.async_load()
+    hass.data[DOMAIN]["inventory"] = inventory
 
     # Charger les traductions de manière asynchrone
     lang = hass.config.language
@@ -41,134 +78,41 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         _LOGGER.error(f"Échec du chargement des traductions depuis {translation_file}: {e}")
         hass.data[DOMAIN]["translations"] = {}
 
-    # Créer les entités input_number et input_select si elles n'existent pas
-    input_numbers = [
-        ("input_number.piscine_ph_current", {
-            "name": "pH Actuel Piscine",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.0
-        }),
-        ("input_number.piscine_ph_target", {
-            "name": "pH Cible Piscine",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.4
-        }),
-        ("input_number.piscine_chlore_current", {
-            "name": "Chlore Actuel Piscine",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 1.0
-        }),
-        ("input_number.piscine_chlore_target", {
-            "name": "Chlore Cible Piscine",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 2.0
-        }),
-        ("input_number.spa_ph_current", {
-            "name": "pH Actuel Spa",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.0
-        }),
-        ("input_number.spa_ph_target", {
-            "name": "pH Cible Spa",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.4
-        }),
-        ("input_number.spa_chlore_current", {
-            "name": "Chlore Actuel Spa",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 1.0
-        }),
-        ("input_number.spa_chlore_target", {
-            "name": "Chlore Cible Spa",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 2.0
-        }),
-        ("input_number.piscine_test_ph_current", {
-            "name": "pH Actuel Piscine Test",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.0
-        }),
-        ("input_number.piscine_test_ph_target", {
-            "name": "pH Cible Piscine Test",
-            "min": 0,
-            "max": 14,
-            "step": 0.1,
-            "initial": 7.4
-        }),
-        ("input_number.piscine_test_chlore_current", {
-            "name": "Chlore Actuel Piscine Test",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 1.0
-        }),
-        ("input_number.piscine_test_chlore_target", {
-            "name": "Chlore Cible Piscine Test",
-            "min": 0,
-            "max": 10,
-            "step": 0.1,
-            "unit_of_measurement": "mg/L",
-            "initial": 2.0
-        }),
-    ]
-
-    input_selects = [
-        ("input_select.piscine_ph_plus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.piscine_ph_minus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.piscine_chlore_treatment", ["Liquide", "Pastille lente", "Chlore choc (poudre)"]),
-        ("input_select.spa_ph_plus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.spa_ph_minus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.spa_chlore_treatment", ["Liquide", "Pastille lente", "Chlore choc (poudre)"]),
-        ("input_select.piscine_test_ph_plus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.piscine_test_ph_minus_treatment", ["Liquide", "Poudre"]),
-        ("input_select.piscine_test_chlore_treatment", ["Liquide", "Pastille lente", "Chlore choc (poudre)"]),
-    ]
-
-    for entity_id, attributes in input_numbers:
-        if not hass.states.get(entity_id):
-            hass.states.async_set(entity_id, attributes.get("initial", 0), attributes)
-            _LOGGER.debug(f"Création de l'entité {entity_id} avec les attributs {attributes}")
-
-    for entity_id, options in input_selects:
-        if not hass.states.get(entity_id):
-            hass.states.async_set(entity_id, options[0], {
-                "options": options,
-                "name": entity_id.split(".")[1].replace("_", " ").title()
-            })
-            _LOGGER.debug(f"Création de l'entité {entity_id} avec les options {options}")
-
+    await async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Configure une entrée Piscinexa."""
-    hass.data[DOMAIN][entry.entry_id] = {"temperature": entry.data.get("temperature", 20.0)}
+    if entry.data.get(CONF_SIMULATOR):
+        return await _async_setup_simulator(hass, entry)
+    dispatcher = PiscinexaDispatcher(hass, entry.data["name"], source_entity_ids(entry))
+    scheduler = PiscinexaFiltrationScheduler(hass, entry, dispatcher)
+    scheduler.async_start()
+    pump_controller = PiscinexaPumpController(hass, entry, dispatcher, scheduler)
+    pump_controller.async_start()
+    temperature_model = PiscinexaWaterTemperatureModel(hass, entry, dispatcher, scheduler)
+    await temperature_model.async_load()
+    write_counter = PiscinexaWriteCounter(hass, entry)
+    config = PoolConfig(entry.data)
+    hass.data[DOMAIN][entry.entry_id] = {
+        "config": config,
+        "temperature": config.temperature,
+        "dispatcher": dispatcher,
+        "scheduler": scheduler,
+        "pump_controller": pump_controller,
+        "temperature_model": temperature_model,
+        "profiler": PiscinexaProfiler(entry.data["name"], bool(entry.options.get(CONF_PROFILING, False))),
+        "write_counter": write_counter,
+        "applied_config": _config_snapshot(entry),
+    }
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     try:
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        # Démarré après les capteurs, pour partir de la température de l'eau mesurée
+        temperature_model.async_start()
+        write_counter.async_start()
         return True
     except Exception as e:
         _LOGGER.error(
@@ -181,9 +125,112 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migre une entrée vers la version courante de entry.data."""
+    if entry.version > CONFIG_VERSION:
+        # Entrée créée par une version plus récente de l'intégration
+        return False
+    if entry.version == 1:
+        data = dict(entry.data)
+        options = dict(entry.options)
+        if not data.get(CONF_SIMULATOR):
+            # Les options de la version 1 recopiaient entry.data : les cibles et sources
+            # qui y furent saisies, jamais appliquées, deviennent la configuration de l'entrée
+            data.update({key: options[key] for key in DATA_OPTION_KEYS if options.get(key) is not None})
+            data = normalize_pool_data(data)
+            options = {
+                key: value for key, value in options.items()
+                if key not in entry.data and key not in data and key not in DATA_OPTION_KEYS
+            }
+        hass.config_entries.async_update_entry(entry, data=data, options=options, version=2)
+        _LOGGER.info(f"Entrée {entry.title} migrée vers la version 2")
+    return True
+
+
+async def _async_setup_simulator(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Configure une entrée simulateur : ni planification ni pilotage, seulement les mesures."""
+    simulator = PiscinexaSimulator(hass, entry)
+    hass.data[DOMAIN][entry.entry_id] = {"simulator": simulator, "applied_config": _config_snapshot(entry)}
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    await hass.config_entries.async_forward_entry_setups(entry, SIMULATOR_PLATFORMS)
+    simulator.async_start()
+    return True
+
+
+def _config_snapshot(entry: ConfigEntry) -> Dict[str, Any]:
+    """Configuration appliquée à l'entrée, à comparer lors de la prochaine mise à jour."""
+    if entry.data.get(CONF_SIMULATOR):
+        # Les options d'un simulateur remplacent ses réglages initiaux
+        return {**entry.data, **entry.options}
+    # Les options enregistrées par les anciennes versions recopiaient entry.data : seules comptent les autres clés
+    options = {key: value for key, value in entry.options.items() if key not in entry.data}
+    # Une option absente vaut sa valeur par défaut : l'enregistrer telle quelle ne change rien
+    return {**OPTION_DEFAULTS, **options, **entry.data}
+
+
+def _changed_keys(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Applique une modification des options en ne touchant qu'à ce qui a changé."""
+    runtime = hass.data[DOMAIN].get(entry.entry_id)
+    if runtime is None:
+        return
+    if not entry.data.get(CONF_SIMULATOR):
+        runtime["config"].load(entry.data)
+    config = _config_snapshot(entry)
+    changed = _changed_keys(runtime["applied_config"], config)
+    if not changed:
+        return
+    runtime["applied_config"] = config
+    if entry.data.get(CONF_SIMULATOR) or changed - HOT_KEYS:
+        _LOGGER.debug(f"Options modifiées pour {entry.title} ({sorted(changed)}), rechargement de l'entrée")
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+        return
+
+    _LOGGER.debug(f"Options modifiées pour {entry.title} ({sorted(changed)}), appliquées sans rechargement")
+    # Seuls les abonnements des sources modifiées sont repointés, et leurs capteurs recalculés
+    runtime["dispatcher"].async_set_sources(source_entity_ids(entry))
+    # Les capteurs suivent les entités number des cibles, directement ou par les capteurs de cible :
+    # leur changement suffit à propager la valeur
+    for key in changed.intersection(TARGET_KEYS):
+        await hass.services.async_call(
+            NUMBER_DOMAIN,
+            SERVICE_SET_VALUE,
+            {ATTR_ENTITY_ID: entry_entity_id(hass, entry, "number", key), ATTR_VALUE: float(config[key])},
+            blocking=True,
+        )
+    if changed & SCHEDULE_KEYS:
+        runtime["scheduler"].async_request_solve()
+    if CONF_PRODUCT_PRICES in changed and "refresh_treatment_plan" in runtime:
+        runtime["refresh_treatment_plan"]()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Décharge une entrée Piscinexa."""
+    if entry.data.get(CONF_SIMULATOR):
+        unload_ok = await hass.config_entries.async_unload_platforms(entry, SIMULATOR_PLATFORMS)
+        if unload_ok:
+            hass.data[DOMAIN].pop(entry.entry_id)["simulator"].async_stop()
+        return unload_ok
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        runtime = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if runtime:
+            runtime["write_counter"].async_stop()
+            runtime["temperature_model"].async_stop()
+            runtime["pump_controller"].async_stop()
+            runtime["scheduler"].async_stop()
+            runtime["dispatcher"].async_stop()
+        fleet = hass.data[DOMAIN]["fleet"]
+        was_owner = fleet.owner_entry_id == entry.entry_id
+        fleet.async_remove_entry(entry.entry_id)
+        if was_owner:
+            # Les capteurs de flotte passent à une autre piscine chargée, sans la recharger
+            for other in hass.config_entries.async_entries(DOMAIN):
+                other_runtime = hass.data[DOMAIN].get(other.entry_id) or {}
+                add_fleet_sensors = other_runtime.get("add_fleet_sensors")
+                if add_fleet_sensors and add_fleet_sensors():
+                    break
     return unload_ok
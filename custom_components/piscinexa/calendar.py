@@ -0,0 +1,72 @@
+import logging
+from datetime import datetime
+from typing import List, Optional
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN, VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Configurez le calendrier de filtration pour Piscinexa."""
+    name = entry.data["name"]
+    async_add_entities([PiscinexaFiltrationCalendar(hass, entry, name)])
+
+class PiscinexaFiltrationCalendar(CalendarEntity):
+    """Blocs de marche de la pompe prévus par le plan de filtration du jour."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_friendly_name = f"{name.capitalize()} Filtration"
+        self._attr_unique_id = f"{entry.entry_id}_calendar_filtration"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:pump"
+        self._attr_should_poll = False
+        self._scheduler = hass.data[DOMAIN][entry.entry_id]["scheduler"]
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._scheduler.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    def _events(self) -> List[CalendarEvent]:
+        plan = self._scheduler.plan
+        if not plan:
+            return []
+        return [
+            CalendarEvent(start=block["start"], end=block["end"], summary=f"Filtration {self._name}")
+            for block in plan["blocks"]
+        ]
+
+    @property
+    def event(self) -> Optional[CalendarEvent]:
+        """Bloc en cours, ou à défaut le prochain bloc prévu."""
+        now = dt_util.now()
+        upcoming = [event for event in self._events() if event.end > now]
+        return upcoming[0] if upcoming else None
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> List[CalendarEvent]:
+        return [
+            event for event in self._events()
+            if event.start < end_date and event.end > start_date
+        ]
@@ -0,0 +1,74 @@
+"""Cibles de chlore libre tenant compte de l'acide cyanurique (stabilisant)."""
+from typing import Dict, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CHLORE_MIN_IDEAL, CHLORE_MAX_IDEAL
+from .helpers import number_value
+
+# Rapports chlore libre / acide cyanurique
+FC_MIN_CYA_RATIO = 0.075
+FC_SHOCK_CYA_RATIO = 0.40
+
+DEFAULT_CYA = 0.0
+
+# Attributs publiés par as_dict sur les capteurs
+TARGET_ATTRIBUTES = ("cya", "fc_minimum", "fc_target", "fc_shock", "fc_maximum")
+
+
+class ChlorineTargets:
+    """Seuils de chlore libre d'une piscine, recalculés seulement si le CYA ou la cible change.
+
+    Sans stabilisant, la plage idéale historique (1 à 3 mg/L) s'applique. Avec
+    stabilisant, le minimum vaut 7,5 % du CYA et le niveau de choc 40 % du CYA ;
+    la cible effective n'est jamais inférieure au minimum.
+    """
+
+    def __init__(self):
+        self._inputs: Optional[Tuple[float, float]] = None
+        self.cya = DEFAULT_CYA
+        self.minimum = CHLORE_MIN_IDEAL
+        self.maximum = CHLORE_MAX_IDEAL
+        self.shock = None
+        self.target = 2.0
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, cya: float, chlore_target: float) -> "ChlorineTargets":
+        """Recalcule les seuils si le CYA ou la cible configurée ont changé."""
+        inputs = (cya, chlore_target)
+        if inputs == self._inputs:
+            self.hits += 1
+            return self
+        self.misses += 1
+        self._inputs = inputs
+        self.cya = cya
+        if cya > 0:
+            self.minimum = max(CHLORE_MIN_IDEAL, round(cya * FC_MIN_CYA_RATIO, 2))
+            self.shock = round(cya * FC_SHOCK_CYA_RATIO, 2)
+            self.maximum = max(CHLORE_MAX_IDEAL, self.shock)
+        else:
+            self.minimum = CHLORE_MIN_IDEAL
+            self.shock = None
+            self.maximum = CHLORE_MAX_IDEAL
+        self.target = max(chlore_target, self.minimum)
+        return self
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "cya": self.cya,
+            "fc_minimum": self.minimum,
+            "fc_target": self.target,
+            "fc_shock": self.shock,
+            "fc_maximum": self.maximum,
+        }
+
+
+def chlorine_targets(hass: HomeAssistant, entry: ConfigEntry) -> ChlorineTargets:
+    """Seuils de chlore courants d'une piscine, mis en cache dans ses données d'exécution."""
+    targets = hass.data[DOMAIN][entry.entry_id].setdefault("chlorine_targets", ChlorineTargets())
+    return targets.update(
+        number_value(hass, entry, "cya", DEFAULT_CYA),
+        number_value(hass, entry, "chlore_target", 2.0),
+    )
@@ -1,4 +1,5 @@
 """Flux de configuration pour Piscinexa."""
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 import voluptuous as vol
@@ -16,10 +17,49 @@ from .const import (
     CONF_WIDTH,
     CONF_DEPTH,
     CONF_DIAMETER,
+    CONF_PRODUCT_PRICES,
+    DEFAULT_PRODUCT_PRICES,
+    CONF_TARIFF_SCHEDULE,
+    CONF_TARIFF_SENSOR,
+    CONF_FILTRATION_MIN_BLOCK,
+    CONF_FILTRATION_WINDOWS,
+    CONF_PUMP_POWER,
+    CONF_PUMP_SWITCH,
+    CONF_SURPLUS_SENSOR,
+    CONF_SURPLUS_DEBOUNCE,
+    CONF_SURPLUS_MIN_CYCLE,
+    CONF_WEATHER_ENTITY,
+    CONF_COVER_ENTITY,
+    CONF_HEAT_PUMP_POWER,
+    CONF_HEAT_PUMP_COP,
+    DEFAULT_HEAT_PUMP_COP,
+    CONF_PROFILING,
+    DATA_OPTION_KEYS,
+    DATA_SOURCE_KEYS,
+    OPTION_SOURCE_KEYS,
+    DEFAULT_TARIFF_SCHEDULE,
+    DEFAULT_FILTRATION_MIN_BLOCK,
+    DEFAULT_PUMP_POWER,
+    DEFAULT_SURPLUS_DEBOUNCE,
+    DEFAULT_SURPLUS_MIN_CYCLE,
+    CONF_SIMULATOR,
+    CONF_SIM_POWER_INTERVAL,
+    CONF_SIM_PROBE_INTERVAL,
+    CONF_SIM_TIME_SCALE,
+    DEFAULT_SIM_POWER_INTERVAL,
+    DEFAULT_SIM_PROBE_INTERVAL,
 )
+from .discovery import KIND_CHLORE, KIND_PH, KIND_POWER, KIND_TEMPERATURE, ProbeIndex, async_index_probes
+from .planner import PRODUCT_PRICES_SCHEMA
+from .pool_config import CONFIG_VERSION, normalize_pool_data
+from .scheduler import FILTRATION_WINDOWS_SCHEMA, TARIFF_SCHEDULE_SCHEMA
+from .validation import SAMPLING_SECONDS, SOURCE_KINDS, async_sample_probes, check_probe, preview_values
 
 _LOGGER = logging.getLogger(__name__)
 
+# Case des étapes de sonde qui remplace les candidats découverts par tous les capteurs
+SHOW_ALL_SENSORS = "show_all_sensors"
+
 def get_translation(hass: HomeAssistant, key: str, default: str = None) -> str:
     """Récupère une traduction depuis le cache, gérant les clés imbriquées."""
     try:
@@ -48,41 +88,98 @@ def get_translation(hass: HomeAssistant, key: str, default: str = None) -> str:
         _LOGGER.error(f"Erreur lors de la récupération de la traduction pour la clé {key}: {e}")
         return default or key
 
+def _simulator_rates_schema(current: Dict[str, Any]) -> Dict[Any, Any]:
+    """Périodes de mise à jour et accélération du temps d'un simulateur."""
+    return {
+        vol.Required(
+            CONF_SIM_POWER_INTERVAL, default=current.get(CONF_SIM_POWER_INTERVAL, DEFAULT_SIM_POWER_INTERVAL)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=3600)),
+        vol.Required(
+            CONF_SIM_PROBE_INTERVAL, default=current.get(CONF_SIM_PROBE_INTERVAL, DEFAULT_SIM_PROBE_INTERVAL)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=3600)),
+        vol.Required(
+            CONF_SIM_TIME_SCALE, default=current.get(CONF_SIM_TIME_SCALE, 1.0)
+        ): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+    }
+
 class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Gérer le flux de configuration pour Piscinexa."""
 
-    VERSION = 1
+    VERSION = CONFIG_VERSION
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
     def __init__(self):
         self._data: Dict[str, Any] = {}
         self._errors: Dict[str, str] = {}
+        self._probe_index: Optional[ProbeIndex] = None
+        self._show_all: set = set()
+        self._sampling_task: Optional[asyncio.Task] = None
+        self._source_report: Dict[str, Dict[str, Any]] = {}
+
+    def _probe_fields(self, key: str, kind: str) -> Dict[Any, Any]:
+        """Sélecteur d'une sonde, limité aux candidats découverts et prérempli avec le plus probable."""
+        if self._probe_index is None:
+            # Un seul parcours des capteurs pour les quatre étapes de sonde
+            self._probe_index = async_index_probes(self.hass)
+        candidates = self._probe_index.candidates(kind)
+        if not candidates or kind in self._show_all:
+            return {
+                vol.Optional(key): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
+            }
+        return {
+            vol.Optional(key, description={"suggested_value": candidates[0]}): selector.EntitySelector(
+                selector.EntitySelectorConfig(domain="sensor", include_entities=candidates)
+            ),
+            vol.Optional(SHOW_ALL_SENSORS, default=False): selector.BooleanSelector(),
+        }
+
+    def _check_probe(self, key: str) -> None:
+        """Refuse une sonde choisie dont la valeur ne pourrait pas être exploitée."""
+        entity_id = self._data.get(key)
+        if entity_id:
+            error = check_probe(self.hass, entity_id, SOURCE_KINDS[key])
+            if error:
+                self._errors[key] = error
+
+    def _wants_all_sensors(self, user_input: Dict[str, Any], kind: str) -> bool:
+        """Vrai si l'utilisateur a demandé la liste complète : le formulaire est alors réaffiché."""
+        if user_input.pop(SHOW_ALL_SENSORS, False):
+            self._show_all.add(kind)
+            return True
+        return False
 
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
-        """Gérer l'étape initiale."""
+        """Gérer l'étape initiale : une piscine ou un simulateur."""
+        return self.async_show_menu(step_id="user", menu_options=["pool", "simulator"])
+
+    def _validate_name(self, name: Optional[str]) -> None:
+        """Le nom doit être non vide et unique parmi les piscines et les simulateurs."""
+        if not name:
+            self._errors["base"] = "name_invalid"
+            return
+        for entry in self._async_current_entries():
+            if entry.data.get(CONF_NAME) == name:
+                self._errors["base"] = "name_duplicate"
+                break
+
+    async def async_step_pool(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Gérer le nom et le type de la piscine."""
         self._errors = {}
         if user_input is not None:
             self._data.update(user_input)
-            if not user_input.get(CONF_NAME):
-                self._errors["base"] = "name_invalid"
-            else:
-                # Vérifier si le nom est unique
-                for entry in self._async_current_entries():
-                    if entry.data.get(CONF_NAME) == user_input[CONF_NAME]:
-                        self._errors["base"] = "name_duplicate"
-                        break
-                if not self._errors:
-                    return await self.async_step_dimensions()
+            self._validate_name(user_input.get(CONF_NAME))
+            if not self._errors:
+                return await self.async_step_dimensions()
 
         # Utiliser les traductions pour les types de piscine
         pool_type_options = {
-            POOL_TYPE_SQUARE: get_translation(self.hass, "config.step.user.pool_types.square", "Square"),
-            POOL_TYPE_ROUND: get_translation(self.hass, "config.step.user.pool_types.round", "Round"),
+            POOL_TYPE_SQUARE: get_translation(self.hass, "config.step.pool.pool_types.square", "Square"),
+            POOL_TYPE_ROUND: get_translation(self.hass, "config.step.pool.pool_types.round", "Round"),
         }
         _LOGGER.debug(f"Options de type de piscine: {pool_type_options}")
 
         return self.async_show_form(
-            step_id="user",
+            step_id="pool",
             data_schema=vol.Schema({
                 vol.Required(CONF_NAME): str,
                 vol.Required(CONF_POOL_TYPE): vol.In(pool_type_options),
@@ -90,6 +187,37 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=self._errors,
         )
 
+    async def async_step_import(self, import_data: Dict[str, Any]) -> FlowResult:
+        """Créer une piscine décrite par un fichier d'import, déjà validé par pool_import."""
+        self._errors = {}
+        self._validate_name(import_data.get(CONF_NAME))
+        if self._errors:
+            return self.async_abort(reason="already_configured")
+        return self.async_create_entry(
+            title=f"Piscinexa {import_data[CONF_NAME]}", data=normalize_pool_data(import_data)
+        )
+
+    async def async_step_simulator(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Créer une piscine simulée, dont les capteurs pourront servir de sources."""
+        self._errors = {}
+        if user_input is not None:
+            self._validate_name(user_input.get(CONF_NAME))
+            if not self._errors:
+                return self.async_create_entry(
+                    title=f"Piscinexa Simulateur {user_input[CONF_NAME]}",
+                    data={CONF_SIMULATOR: True, **user_input},
+                )
+        return self.async_show_form(
+            step_id="simulator",
+            data_schema=vol.Schema({
+                vol.Required(CONF_NAME): str,
+                vol.Required("temperature", default=26.0): vol.All(vol.Coerce(float), vol.Range(min=0, max=40)),
+                vol.Required(CONF_PUMP_POWER, default=DEFAULT_PUMP_POWER): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                **_simulator_rates_schema({}),
+            }),
+            errors=self._errors,
+        )
+
     async def async_step_dimensions(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer l'étape des dimensions."""
         self._errors = {}
@@ -178,11 +306,12 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_ph_sensor(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer la sélection d'un capteur pH."""
         self._errors = {}
-        if user_input is not None:
+        if user_input is not None and not self._wants_all_sensors(user_input, KIND_PH):
             self._data.update(user_input)
             ph_target = user_input.get("ph_target")
             if ph_target <= 0 or ph_target >= 14:
                 self._errors["ph_target"] = "ph_invalid"
+            self._check_probe("ph_sensor")
             ph_sensor = user_input.get("ph_sensor")
             if not ph_sensor and not self._data.get("ph_current"):
                 return await self.async_step_confirm_ph_sensor()
@@ -191,9 +320,7 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="ph_sensor",
             data_schema=vol.Schema({
-                vol.Optional("ph_sensor"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(domain="sensor")
-                ),
+                **self._probe_fields("ph_sensor", KIND_PH),
                 vol.Required("ph_target", default=7.4): vol.Coerce(float),
             }),
             errors=self._errors,
@@ -271,11 +398,12 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_chlore_sensor(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer la sélection d'un capteur chlore."""
         self._errors = {}
-        if user_input is not None:
+        if user_input is not None and not self._wants_all_sensors(user_input, KIND_CHLORE):
             self._data.update(user_input)
             chlore_target = user_input.get("chlore_target")
             if chlore_target < 0:
                 self._errors["chlore_target"] = "chlore_invalid"
+            self._check_probe("chlore_sensor")
             chlore_sensor = user_input.get("chlore_sensor")
             if not chlore_sensor and not self._data.get("chlore_current"):
                 return await self.async_step_confirm_chlore_sensor()
@@ -284,9 +412,7 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="chlore_sensor",
             data_schema=vol.Schema({
-                vol.Optional("chlore_sensor"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(domain="sensor")
-                ),
+                **self._probe_fields("chlore_sensor", KIND_CHLORE),
                 vol.Required("chlore_target", default=2.0): vol.Coerce(float),
             }),
             errors=self._errors,
@@ -360,8 +486,9 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_temperature_sensor(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer la sélection d'un capteur température."""
         self._errors = {}
-        if user_input is not None:
+        if user_input is not None and not self._wants_all_sensors(user_input, KIND_TEMPERATURE):
             self._data.update(user_input)
+            self._check_probe("temperature_sensor")
             temperature_sensor = user_input.get("temperature_sensor")
             if not temperature_sensor and not self._data.get("temperature"):
                 return await self.async_step_confirm_temperature_sensor()
@@ -370,9 +497,7 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="temperature_sensor",
             data_schema=vol.Schema({
-                vol.Optional("temperature_sensor"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(domain="sensor")
-                ),
+                **self._probe_fields("temperature_sensor", KIND_TEMPERATURE),
             }),
             errors=self._errors,
         )
@@ -439,8 +564,9 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_power_sensor(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer la sélection d'un capteur de puissance."""
         self._errors = {}
-        if user_input is not None:
+        if user_input is not None and not self._wants_all_sensors(user_input, KIND_POWER):
             self._data.update(user_input)
+            self._check_probe("power_sensor_entity_id")
             power_sensor_entity_id = user_input.get("power_sensor_entity_id")
             if not power_sensor_entity_id:
                 return await self.async_step_confirm_power_sensor()
@@ -449,9 +575,7 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(
             step_id="power_sensor",
             data_schema=vol.Schema({
-                vol.Optional("power_sensor_entity_id"): selector.EntitySelector(
-                    selector.EntitySelectorConfig(domain="sensor")
-                ),
+                **self._probe_fields("power_sensor_entity_id", KIND_POWER),
             }),
             errors=self._errors,
         )
@@ -484,6 +608,8 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._errors = {}
         if user_input is not None:
             self._data.update(user_input)
+            if any(self._data.get(key) for key in SOURCE_KINDS):
+                return await self.async_step_sample_sources()
             return await self.async_step_summary()
 
         # Utiliser les traductions pour les options de traitement
@@ -507,12 +633,29 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=self._errors,
         )
 
+    async def async_step_sample_sources(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Observer les sources choisies quelques secondes avant le récapitulatif."""
+        if self._sampling_task is None:
+            sources = {key: self._data[key] for key in SOURCE_KINDS if self._data.get(key)}
+            self._sampling_task = self.hass.async_create_task(
+                async_sample_probes(self.hass, sources, SAMPLING_SECONDS)
+            )
+        if not self._sampling_task.done():
+            return self.async_show_progress(
+                step_id="sample_sources",
+                progress_action="sample_sources",
+                progress_task=self._sampling_task,
+            )
+        self._source_report = self._sampling_task.result()
+        self._sampling_task = None
+        return self.async_show_progress_done(next_step_id="summary")
+
     async def async_step_summary(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Afficher un récapitulatif de la configuration."""
         if user_input is not None:
             return self.async_create_entry(
                 title=f"Piscinexa {self._data[CONF_NAME]}",
-                data=self._data
+                data=normalize_pool_data(self._data)
             )
 
         summary = (
@@ -545,6 +688,17 @@ class PiscinexaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             f"Temperature source: {self._data.get('temperature_sensor', 'Manual')}\n"
             f"Power source: {self._data.get('power_sensor_entity_id', 'Not defined')}\n"
         )
+        if self._source_report:
+            summary += f"Sources over {SAMPLING_SECONDS} s:\n"
+            for key, source in self._source_report.items():
+                summary += (
+                    f"  {source['entity_id']}: {source['value']} {source['unit'] or ''}, "
+                    f"{source['updates']} update(s), last {source['age_seconds']} s ago"
+                    f"{' - ' + source['problem'].upper() if source['problem'] else ''}\n"
+                )
+        summary += "Preview:\n"
+        for key, (value, unit) in preview_values(self._data, self._source_report).items():
+            summary += f"  {key}: {value} {unit}\n"
 
         return self.async_show_form(
             step_id="summary",
@@ -564,10 +718,23 @@ class PiscinexaOptionsFlow(config_entries.OptionsFlow):
 
     def __init__(self, config_entry: config_entries.ConfigEntry):
         self._data: Dict[str, Any] = dict(config_entry.data)
+        self._options: Dict[str, Any] = dict(config_entry.options)
         self._errors: Dict[str, str] = {}
 
+    def _validate_object(self, user_input: Dict[str, Any], key: str, schema: vol.Schema, error: str) -> None:
+        """Valide et normalise une option saisie en objet libre."""
+        if key not in user_input:
+            return
+        try:
+            user_input[key] = schema(user_input[key])
+        except vol.Invalid as e:
+            _LOGGER.debug(f"Option {key} invalide : {e}")
+            self._errors[key] = error
+
     async def async_step_init(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
         """Gérer l'étape des options."""
+        if self._data.get(CONF_SIMULATOR):
+            return await self.async_step_simulator(user_input)
         self._errors = {}
         if user_input is not None:
             self._data.update(user_input)
@@ -577,28 +744,118 @@ class PiscinexaOptionsFlow(config_entries.OptionsFlow):
                 self._errors["ph_target"] = "ph_invalid"
             if chlore_target < 0:
                 self._errors["chlore_target"] = "chlore_invalid"
+            self._validate_object(user_input, CONF_PRODUCT_PRICES, PRODUCT_PRICES_SCHEMA, "invalid_prices")
+            self._validate_object(
+                user_input, CONF_TARIFF_SCHEDULE, TARIFF_SCHEDULE_SCHEMA, "invalid_tariff_schedule"
+            )
+            self._validate_object(
+                user_input, CONF_FILTRATION_WINDOWS, FILTRATION_WINDOWS_SCHEMA, "invalid_filtration_windows"
+            )
             if not self._errors:
-                return self.async_create_entry(
-                    title="",
-                    data=self._data
+                # Cibles et sources restent dans entry.data, où les lisent les capteurs ;
+                # l'écouteur de mise à jour les applique sans recharger l'entrée.
+                # Un champ de source laissé vide retire la source
+                data = {
+                    key: value for key, value in self.config_entry.data.items() if key not in DATA_SOURCE_KEYS
+                }
+                data.update({key: user_input[key] for key in DATA_OPTION_KEYS if user_input.get(key) is not None})
+                options = {
+                    key: value for key, value in {**self._options, **user_input}.items()
+                    if key not in data and key not in DATA_OPTION_KEYS
+                    and (key in user_input or key not in OPTION_SOURCE_KEYS)
+                }
+                # Données et options en une seule mise à jour : l'écouteur ne voit jamais
+                # l'une appliquée sans l'autre. Les options étant déjà enregistrées, la
+                # fin du flux ne modifie plus l'entrée et ne le relance pas.
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry, data=normalize_pool_data(data), options=options
                 )
+                return self.async_create_entry(title="", data=options)
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Required("ph_target", default=self._data.get("ph_target", 7.4)): vol.Coerce(float),
                 vol.Required("chlore_target", default=self._data.get("chlore_target", 2.0)): vol.Coerce(float),
-                vol.Optional("temperature_sensor", default=self._data.get("temperature_sensor", "")): selector.EntitySelector(
+                vol.Optional("temperature_sensor", description={"suggested_value": self._data.get("temperature_sensor")}): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor")
+                ),
+                vol.Optional("chlore_sensor", description={"suggested_value": self._data.get("chlore_sensor")}): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="sensor")
                 ),
-                vol.Optional("chlore_sensor", default=self._data.get("chlore_sensor", "")): selector.EntitySelector(
+                vol.Optional("ph_sensor", description={"suggested_value": self._data.get("ph_sensor")}): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="sensor")
                 ),
-                vol.Optional("ph_sensor", default=self._data.get("ph_sensor", "")): selector.EntitySelector(
+                vol.Optional("power_sensor_entity_id", description={"suggested_value": self._data.get("power_sensor_entity_id")}): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="sensor")
                 ),
-                vol.Optional("power_sensor_entity_id", default=self._data.get("power_sensor_entity_id", "")): selector.EntitySelector(
+                vol.Optional(
+                    CONF_PRODUCT_PRICES, default=self._options.get(CONF_PRODUCT_PRICES, DEFAULT_PRODUCT_PRICES)
+                ): selector.ObjectSelector(),
+                vol.Optional(
+                    CONF_TARIFF_SCHEDULE, default=self._options.get(CONF_TARIFF_SCHEDULE, DEFAULT_TARIFF_SCHEDULE)
+                ): selector.ObjectSelector(),
+                vol.Optional(
+                    CONF_TARIFF_SENSOR, description={"suggested_value": self._options.get(CONF_TARIFF_SENSOR)}
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor")
+                ),
+                vol.Optional(
+                    CONF_FILTRATION_MIN_BLOCK,
+                    default=self._options.get(CONF_FILTRATION_MIN_BLOCK, DEFAULT_FILTRATION_MIN_BLOCK),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=24)),
+                vol.Optional(
+                    CONF_FILTRATION_WINDOWS, default=self._options.get(CONF_FILTRATION_WINDOWS, [])
+                ): selector.ObjectSelector(),
+                vol.Optional(
+                    CONF_PUMP_POWER, default=self._options.get(CONF_PUMP_POWER, DEFAULT_PUMP_POWER)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_PUMP_SWITCH, description={"suggested_value": self._options.get(CONF_PUMP_SWITCH)}
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="switch")
+                ),
+                vol.Optional(
+                    CONF_SURPLUS_SENSOR, description={"suggested_value": self._options.get(CONF_SURPLUS_SENSOR)}
+                ): selector.EntitySelector(
                     selector.EntitySelectorConfig(domain="sensor")
                 ),
+                vol.Optional(
+                    CONF_SURPLUS_DEBOUNCE,
+                    default=self._options.get(CONF_SURPLUS_DEBOUNCE, DEFAULT_SURPLUS_DEBOUNCE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_SURPLUS_MIN_CYCLE,
+                    default=self._options.get(CONF_SURPLUS_MIN_CYCLE, DEFAULT_SURPLUS_MIN_CYCLE),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=120)),
+                vol.Optional(
+                    CONF_WEATHER_ENTITY, description={"suggested_value": self._options.get(CONF_WEATHER_ENTITY)}
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="weather")
+                ),
+                vol.Optional(
+                    CONF_COVER_ENTITY, description={"suggested_value": self._options.get(CONF_COVER_ENTITY)}
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain=["cover", "binary_sensor", "switch"])
+                ),
+                vol.Optional(
+                    CONF_HEAT_PUMP_POWER, default=self._options.get(CONF_HEAT_PUMP_POWER, 0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_HEAT_PUMP_COP, default=self._options.get(CONF_HEAT_PUMP_COP, DEFAULT_HEAT_PUMP_COP)
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=10)),
+                vol.Optional(
+                    CONF_PROFILING, default=self._options.get(CONF_PROFILING, False)
+                ): selector.BooleanSelector(),
             }),
             errors=self._errors,
         )
+
+    async def async_step_simulator(self, user_input: Optional[Dict[str, Any]] = None) -> FlowResult:
+        """Options d'un simulateur : périodes de mise à jour et accélération du temps."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return self.async_create_entry(title="", data=self._options)
+        return self.async_show_form(
+            step_id="simulator",
+            data_schema=vol.Schema(_simulator_rates_schema({**self._data, **self._options})),
+        )
@@ -25,3 +25,99 @@ CONF_LENGTH = "length"
 CONF_WIDTH = "width"
 CONF_DEPTH = "depth"
 CONF_DIAMETER = "diameter"
+
+# Formes de traitement proposées par les entités select
+PH_TREATMENT_OPTIONS = ["Liquide", "Poudre"]
+CHLORE_TREATMENT_OPTIONS = ["Liquide", "Pastille lente", "Chlore choc (poudre)"]
+
+# Correspondance entre les choix du config flow et les formes de traitement
+TREATMENT_FORM_FROM_CONFIG = {
+    "Liquid": "Liquide",
+    "Granules": "Poudre",
+    "Shock chlorine (powder)": "Chlore choc (poudre)",
+    "Slow-dissolving tablet": "Pastille lente",
+}
+
+# Plages idéales utilisées pour l'évaluation de l'eau
+PH_MIN_IDEAL = 7.2
+PH_MAX_IDEAL = 7.6
+CHLORE_MIN_IDEAL = 1.0
+CHLORE_MAX_IDEAL = 3.0
+
+# Puissance au-delà de laquelle la pompe est considérée en marche (W)
+POWER_ACTIVE_THRESHOLD = 10
+
+# Catalogue de prix par défaut des produits (€ par unité de dose : L, g ou unité),
+# remplaçable par l'option product_prices d'une entrée
+CONF_PRODUCT_PRICES = "product_prices"
+DEFAULT_PRODUCT_PRICES = {
+    "ph_plus": {"Liquide": 3.5, "Poudre": 0.006},
+    "ph_minus": {"Liquide": 2.5, "Poudre": 0.005},
+    "chlore": {"Liquide": 0.004, "Pastille lente": 1.2, "Chlore choc (poudre)": 0.012},
+}
+
+UNIT_DAYS = "jours"
+
+# Options de planification de la filtration
+CONF_TARIFF_SCHEDULE = "tariff_schedule"
+CONF_TARIFF_SENSOR = "tariff_sensor"
+CONF_FILTRATION_MIN_BLOCK = "filtration_min_block"
+CONF_FILTRATION_WINDOWS = "filtration_windows"
+CONF_PUMP_POWER = "pump_power"
+CONF_PUMP_SWITCH = "pump_switch"
+CONF_SURPLUS_SENSOR = "surplus_sensor"
+CONF_SURPLUS_DEBOUNCE = "surplus_debounce"
+CONF_SURPLUS_MIN_CYCLE = "surplus_min_cycle"
+DEFAULT_TARIFF_SCHEDULE = [{"start": "00:00", "price": 0.25}]
+DEFAULT_FILTRATION_MIN_BLOCK = 1.0
+DEFAULT_PUMP_POWER = 750
+DEFAULT_SURPLUS_DEBOUNCE = 60
+# Durée minimale de marche ou d'arrêt en mode surplus (minutes), contre les cycles courts
+DEFAULT_SURPLUS_MIN_CYCLE = 10
+
+# Prévision de la température de l'eau
+CONF_WEATHER_ENTITY = "weather_entity"
+CONF_COVER_ENTITY = "cover_entity"
+
+# Pompe à chaleur : puissance électrique (W) et coefficient de performance
+CONF_HEAT_PUMP_POWER = "heat_pump_power"
+CONF_HEAT_PUMP_COP = "heat_pump_cop"
+DEFAULT_HEAT_PUMP_COP = 5.0
+
+# Entités sources : lues par les capteurs (entry.data) ou par les modules optionnels (entry.options)
+DATA_SOURCE_KEYS = ("temperature_sensor", "ph_sensor", "chlore_sensor", "power_sensor_entity_id")
+OPTION_SOURCE_KEYS = (
+    CONF_TARIFF_SENSOR,
+    CONF_PUMP_SWITCH,
+    CONF_SURPLUS_SENSOR,
+    CONF_WEATHER_ENTITY,
+    CONF_COVER_ENTITY,
+)
+
+# Clés de entry.data modifiables depuis les options
+DATA_OPTION_KEYS = ("ph_target", "chlore_target", *DATA_SOURCE_KEYS)
+
+# Mesure du temps de calcul des capteurs, exposée en diagnostic
+CONF_PROFILING = "profiling"
+
+# Valeur des options jamais enregistrées, telle que la lisent les modules
+OPTION_DEFAULTS = {
+    CONF_PRODUCT_PRICES: DEFAULT_PRODUCT_PRICES,
+    CONF_TARIFF_SCHEDULE: DEFAULT_TARIFF_SCHEDULE,
+    CONF_FILTRATION_MIN_BLOCK: DEFAULT_FILTRATION_MIN_BLOCK,
+    CONF_FILTRATION_WINDOWS: [],
+    CONF_PUMP_POWER: DEFAULT_PUMP_POWER,
+    CONF_SURPLUS_DEBOUNCE: DEFAULT_SURPLUS_DEBOUNCE,
+    CONF_SURPLUS_MIN_CYCLE: DEFAULT_SURPLUS_MIN_CYCLE,
+    CONF_HEAT_PUMP_POWER: 0,
+    CONF_HEAT_PUMP_COP: DEFAULT_HEAT_PUMP_COP,
+    CONF_PROFILING: False,
+}
+
+# Entrée simulateur : sondes et puissance synthétiques, pour les démonstrations et les tests de charge
+CONF_SIMULATOR = "simulator"
+CONF_SIM_POWER_INTERVAL = "power_interval"
+CONF_SIM_PROBE_INTERVAL = "probe_interval"
+CONF_SIM_TIME_SCALE = "time_scale"
+DEFAULT_SIM_POWER_INTERVAL = 10
+DEFAULT_SIM_PROBE_INTERVAL = 60
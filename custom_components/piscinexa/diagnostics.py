@@ -0,0 +1,116 @@
+"""Diagnostics pour l'intégration Piscinexa."""
+import re
+from typing import Any, Dict, Optional
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .helpers import source_entity_ids
+
+# Le nom de la piscine désigne souvent son propriétaire
+TO_REDACT = {CONF_NAME}
+
+
+def _anonymize(data: Any, pattern: re.Pattern) -> Any:
+    """Remplace le nom de la piscine dans toutes les clés et valeurs texte."""
+    if isinstance(data, dict):
+        return {_anonymize(key, pattern): _anonymize(value, pattern) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_anonymize(item, pattern) for item in data]
+    if isinstance(data, str):
+        return pattern.sub(REDACTED, data)
+    return data
+
+
+def _name_pattern(name: str) -> re.Pattern:
+    """Nom de la piscine tel qu'il apparaît dans les textes et les entity_id."""
+    variants = sorted({variant for variant in (name, slugify(name)) if variant}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(variant) for variant in variants), re.IGNORECASE)
+
+
+def _ratio(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 3) if total else None
+
+
+def _sources(hass: HomeAssistant, entry: ConfigEntry, subscription_counts: Dict[str, int]) -> Dict[str, Any]:
+    """Entités sources résolues, avec leur état courant et leurs abonnés."""
+    sources = {}
+    for key, entity_id in source_entity_ids(entry).items():
+        state = hass.states.get(entity_id)
+        sources[key] = {
+            "entity_id": entity_id,
+            "state": state.state if state else None,
+            "unit_of_measurement": state.attributes.get("unit_of_measurement") if state else None,
+            "last_updated": state.last_updated.isoformat() if state else None,
+            "subscribers": subscription_counts.get(entity_id, 0),
+        }
+    return sources
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Retourne les diagnostics d'une entrée Piscinexa."""
+    runtime = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    dispatcher = runtime.get("dispatcher")
+    scheduler = runtime.get("scheduler")
+    pump_controller = runtime.get("pump_controller")
+    temperature_model = runtime.get("temperature_model")
+    profiler = runtime.get("profiler")
+    write_counter = runtime.get("write_counter")
+    targets = runtime.get("chlorine_targets")
+    simulator = runtime.get("simulator")
+    dispatcher_data = dispatcher.as_dict() if dispatcher else None
+    scheduler_data = scheduler.as_dict() if scheduler else None
+    model_data = temperature_model.as_dict() if temperature_model else None
+    pump_data = pump_controller.as_dict() if pump_controller else None
+    diagnostics = {
+        "entry": {
+            "title": REDACTED,
+            "version": entry.version,
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "sources": _sources(hass, entry, dispatcher_data["subscription_counts"] if dispatcher_data else {}),
+        "dispatcher": dispatcher_data,
+        "scheduler": scheduler_data,
+        "pump_controller": pump_data,
+        "temperature_model": model_data,
+        "recompute": {
+            "filtration_plan_ms": scheduler_data["last_solve_ms"] if scheduler_data else None,
+            # Durées par entité seulement avec l'option profiling
+            "entities": {
+                entity_id: {prop: stats["last_ms"] for prop, stats in props.items()}
+                for entity_id, props in profiler.by_entity()
+            } if profiler else {},
+        },
+        "writes": write_counter.as_dict() if write_counter else None,
+        "queues": {
+            "dispatcher_refresh": int(dispatcher_data["refresh_pending"]) if dispatcher_data else 0,
+            "filtration_solve": (
+                int(scheduler_data["solving"]) + int(scheduler_data["pending"]) if scheduler_data else 0
+            ),
+            "surplus_debounce": int(pump_data["surplus_pending"] is not None) if pump_data else 0,
+        },
+        "caches": {
+            "chlorine_targets": {
+                "hits": targets.hits,
+                "misses": targets.misses,
+                "hit_ratio": _ratio(targets.hits, targets.misses),
+            } if targets else None,
+            "weather_forecast": {
+                "hits": model_data["forecast_cache_hits"],
+                "misses": model_data["forecast_fetches"],
+                "hit_ratio": _ratio(model_data["forecast_cache_hits"], model_data["forecast_fetches"]),
+            } if model_data else None,
+        },
+        "profiling": profiler.as_dict() if profiler else None,
+        "simulator": simulator.as_dict() if simulator else None,
+    }
+    # Le nom figure aussi dans les entity_id des sources, abonnements, écritures et profils
+    return _anonymize(diagnostics, _name_pattern(entry.data[CONF_NAME]))
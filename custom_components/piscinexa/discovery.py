@@ -0,0 +1,105 @@
+"""Découverte des sondes candidates pour le flux de configuration.
+
+Les capteurs de la maison sont parcourus une seule fois et rangés par type
+de sonde d'après leur unité (à défaut leur device_class) : les étapes de
+sélection ne proposent alors que les candidats plausibles, même avec des
+milliers d'entités.
+"""
+import logging
+from typing import Dict, List, Optional, Set
+
+from homeassistant.const import ATTR_DEVICE_CLASS, ATTR_FRIENDLY_NAME, ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import CONF_SIMULATOR, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+KIND_PH = "ph"
+KIND_CHLORE = "chlore"
+KIND_TEMPERATURE = "temperature"
+KIND_POWER = "power"
+
+# Unités lues telles quelles par les capteurs Piscinexa, en minuscules. Les sondes
+# redox (mV) et les puissances en kW ne sont pas converties : elles ne sont pas proposées.
+UNIT_KINDS = {
+    "ph": KIND_PH,
+    "mg/l": KIND_CHLORE,
+    "ppm": KIND_CHLORE,
+    "°c": KIND_TEMPERATURE,
+    "°f": KIND_TEMPERATURE,
+    "w": KIND_POWER,
+}
+
+# device_class attendue pour chaque type, qui départage les candidats
+DEVICE_CLASS_KINDS = {"ph": KIND_PH, "temperature": KIND_TEMPERATURE, "power": KIND_POWER}
+
+# Mots désignant une piscine dans l'identifiant ou le nom d'une entité
+POOL_KEYWORDS = ("pool", "piscine", "bassin", "spa", "swim")
+
+
+class ProbeIndex:
+    """Capteurs candidats par type de sonde, du plus au moins probable."""
+
+    def __init__(self, candidates: Dict[str, List[str]]):
+        self._candidates = candidates
+
+    def candidates(self, kind: str) -> List[str]:
+        return self._candidates.get(kind, [])
+
+    def best(self, kind: str) -> Optional[str]:
+        candidates = self.candidates(kind)
+        return candidates[0] if candidates else None
+
+
+def _own_entities(hass: HomeAssistant) -> Set[str]:
+    """Capteurs calculés par les piscines Piscinexa, à ne pas reprendre comme sources.
+
+    Les capteurs d'un simulateur sont au contraire faits pour servir de sources.
+    """
+    registry = er.async_get(hass)
+    own = set()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if not entry.data.get(CONF_SIMULATOR):
+            own.update(entity.entity_id for entity in er.async_entries_for_config_entry(registry, entry.entry_id))
+    return own
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+@callback
+def async_index_probes(hass: HomeAssistant) -> ProbeIndex:
+    """Parcourt une fois les capteurs et les classe par type de sonde."""
+    own = _own_entities(hass)
+    scored: Dict[str, List[tuple]] = {}
+    for state in hass.states.async_all("sensor"):
+        if state.entity_id in own:
+            continue
+        attributes = state.attributes
+        unit = (attributes.get(ATTR_UNIT_OF_MEASUREMENT) or "").strip().lower()
+        device_class = attributes.get(ATTR_DEVICE_CLASS)
+        if unit:
+            kind = UNIT_KINDS.get(unit)
+        else:
+            # Une sonde de pH n'a souvent pas d'unité
+            kind = KIND_PH if device_class == "ph" else None
+        if kind is None:
+            continue
+        label = f"{state.entity_id} {attributes.get(ATTR_FRIENDLY_NAME, '')}".lower()
+        score = (
+            2 * any(keyword in label for keyword in POOL_KEYWORDS)
+            + (DEVICE_CLASS_KINDS.get(device_class) == kind)
+            + _is_number(state.state)
+        )
+        scored.setdefault(kind, []).append((-score, state.entity_id))
+    candidates = {kind: [entity_id for _, entity_id in sorted(items)] for kind, items in scored.items()}
+    counts = {kind: len(items) for kind, items in candidates.items()}
+    _LOGGER.debug(f"Sondes candidates par type : {counts}")
+    return ProbeIndex(candidates)
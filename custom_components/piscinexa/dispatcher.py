@@ -0,0 +1,171 @@
+"""Répartiteur des changements d'état pour une entrée Piscinexa."""
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PiscinexaDispatcher:
+    """Regroupe les abonnements d'une entrée sur un unique écouteur d'état.
+
+    Les capteurs s'abonnent ici au lieu d'appeler directement
+    async_track_state_change_event : un seul écouteur est enregistré sur
+    l'union des entités suivies et chaque événement est redistribué aux
+    gestionnaires concernés à partir d'un index précalculé.
+
+    Les sources configurables (sondes, capteur de tarif) sont suivies par
+    leur clé de configuration : lorsqu'une option change de source, seuls
+    leurs abonnements sont repointés.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str, sources: Optional[Mapping[str, str]] = None):
+        self._hass = hass
+        self._name = name
+        self._sources: Dict[str, str] = dict(sources or {})
+        self._subscriptions: Dict[int, Tuple[Tuple[str, ...], Callable[[Event], Any]]] = {}
+        self._source_subscriptions: Dict[int, Tuple[str, Callable[[Optional[Event]], Any]]] = {}
+        self._next_id = 0
+        self._index: Dict[str, Tuple[Callable[[Event], Any], ...]] = {}
+        self._tracked: frozenset = frozenset()
+        self._unsub_track: Optional[CALLBACK_TYPE] = None
+        self._refresh_scheduled = False
+        self._stopped = False
+        self._events = 0
+        self._handler_calls = 0
+        self._handler_errors = 0
+
+    @callback
+    def async_subscribe(
+        self, entity_ids: Iterable[str], handler: Callable[[Event], Any]
+    ) -> CALLBACK_TYPE:
+        """Abonne un gestionnaire aux changements d'état des entités données."""
+        sub_id = self._next_id
+        self._next_id += 1
+        self._subscriptions[sub_id] = (tuple(entity_ids), handler)
+        self._rebuild_index()
+
+        @callback
+        def _unsubscribe() -> None:
+            if self._subscriptions.pop(sub_id, None) is not None:
+                self._rebuild_index()
+
+        return _unsubscribe
+
+    @callback
+    def async_subscribe_source(
+        self, key: str, handler: Callable[[Optional[Event]], Any]
+    ) -> CALLBACK_TYPE:
+        """Abonne un gestionnaire à la source configurée sous key, même si elle change ensuite.
+
+        Le gestionnaire est appelé sans événement lorsque la source elle-même change.
+        """
+        sub_id = self._next_id
+        self._next_id += 1
+        self._source_subscriptions[sub_id] = (key, handler)
+        self._rebuild_index()
+
+        @callback
+        def _unsubscribe() -> None:
+            if self._source_subscriptions.pop(sub_id, None) is not None:
+                self._rebuild_index()
+
+        return _unsubscribe
+
+    @callback
+    def async_set_sources(self, sources: Mapping[str, str]) -> Set[str]:
+        """Repointe les abonnements des sources modifiées ; retourne leurs clés."""
+        changed = {
+            key for key in self._sources.keys() | sources.keys()
+            if self._sources.get(key) != sources.get(key)
+        }
+        if not changed:
+            return changed
+        self._sources = dict(sources)
+        self._rebuild_index()
+        for key, handler in list(self._source_subscriptions.values()):
+            if key in changed:
+                handler(None)
+        _LOGGER.debug(f"Répartiteur {self._name}: sources modifiées {sorted(changed)}")
+        return changed
+
+    @callback
+    def async_stop(self) -> None:
+        """Retire l'écouteur et oublie tous les abonnements."""
+        self._stopped = True
+        self._subscriptions.clear()
+        self._source_subscriptions.clear()
+        self._index = {}
+        self._tracked = frozenset()
+        if self._unsub_track:
+            self._unsub_track()
+            self._unsub_track = None
+
+    def _rebuild_index(self) -> None:
+        index = defaultdict(list)
+        for entity_ids, handler in self._subscriptions.values():
+            for entity_id in entity_ids:
+                index[entity_id].append(handler)
+        for key, handler in self._source_subscriptions.values():
+            entity_id = self._sources.get(key)
+            if entity_id:
+                index[entity_id].append(handler)
+        self._index = {entity_id: tuple(handlers) for entity_id, handlers in index.items()}
+        # Les abonnements arrivent par rafales à l'installation des plateformes :
+        # l'écouteur n'est recréé qu'une fois par tour de boucle.
+        if frozenset(self._index) != self._tracked and not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            self._hass.loop.call_soon(self._async_refresh_listener)
+
+    @callback
+    def _async_refresh_listener(self) -> None:
+        self._refresh_scheduled = False
+        if self._stopped:
+            return
+        tracked = frozenset(self._index)
+        if tracked == self._tracked:
+            return
+        if self._unsub_track:
+            self._unsub_track()
+            self._unsub_track = None
+        self._tracked = tracked
+        if tracked:
+            self._unsub_track = async_track_state_change_event(
+                self._hass, list(tracked), self._async_dispatch
+            )
+        _LOGGER.debug(
+            f"Répartiteur {self._name}: {len(tracked)} entités suivies, "
+            f"{len(self._subscriptions) + len(self._source_subscriptions)} abonnements"
+        )
+
+    @callback
+    def _async_dispatch(self, event: Event) -> None:
+        self._events += 1
+        for handler in self._index.get(event.data["entity_id"], ()):
+            self._handler_calls += 1
+            # Un abonné en erreur ne doit pas priver les suivants de l'événement
+            try:
+                handler(event)
+            except Exception:
+                self._handler_errors += 1
+                _LOGGER.exception(
+                    f"Répartiteur {self._name}: erreur d'un abonné de {event.data['entity_id']}"
+                )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Retourne les compteurs d'abonnement pour les diagnostics."""
+        return {
+            "listeners": 1 if self._unsub_track else 0,
+            "subscriptions": len(self._subscriptions) + len(self._source_subscriptions),
+            "tracked_entities": len(self._index),
+            "subscription_counts": {
+                entity_id: len(handlers) for entity_id, handlers in sorted(self._index.items())
+            },
+            "refresh_pending": self._refresh_scheduled,
+            "events_dispatched": self._events,
+            "handler_calls": self._handler_calls,
+            "handler_errors": self._handler_errors,
+        }
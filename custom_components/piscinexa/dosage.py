@@ -0,0 +1,94 @@
+"""Formules de dosage partagées par les capteurs et les services Piscinexa."""
+import math
+from itertools import product
+from typing import Dict, List, Sequence, Tuple
+
+from .const import UNIT_GRAMS, UNIT_LITERS
+
+UNIT_UNITS = "unités"
+
+# Tolérance d'arrondi flottant : 0,3 / 0,1 vaut 2,9999999999999996
+RANGE_EPSILON = 1e-9
+
+# Forme de traitement -> (coefficient par unité d'écart et par m³, unité)
+PH_DOSE_COEFFICIENTS: Dict[str, Tuple[float, str]] = {
+    "Liquide": (0.012, UNIT_LITERS),
+    "Poudre": (1.2, UNIT_GRAMS),
+}
+CHLORE_DOSE_COEFFICIENTS: Dict[str, Tuple[float, str]] = {
+    "Liquide": (10, UNIT_GRAMS),
+    "Pastille lente": (1 / 20, UNIT_UNITS),
+    "Chlore choc (poudre)": (10, UNIT_GRAMS),
+}
+
+
+def ph_coefficient(form: str) -> Tuple[float, str]:
+    """Coefficient pH+/pH- d'une forme, la poudre servant de repli."""
+    return PH_DOSE_COEFFICIENTS.get(form, PH_DOSE_COEFFICIENTS["Poudre"])
+
+
+def chlore_coefficient(form: str) -> Tuple[float, str]:
+    """Coefficient chlore d'une forme, le chlore choc servant de repli."""
+    return CHLORE_DOSE_COEFFICIENTS.get(form, CHLORE_DOSE_COEFFICIENTS["Chlore choc (poudre)"])
+
+
+def ph_dose(difference: float, volume: float, form: str) -> float:
+    """Quantité de pH+ ou pH- pour corriger un écart de pH donné."""
+    return difference * volume * ph_coefficient(form)[0]
+
+
+def chlore_dose(difference: float, volume: float, form: str) -> float:
+    """Quantité de chlore pour combler un écart de chlore donné (mg/L)."""
+    return difference * volume * chlore_coefficient(form)[0]
+
+
+def value_count(start: float, stop: float, step: float) -> int:
+    """Nombre de valeurs de start à stop inclus, par pas de step, sans les construire.
+
+    Un pas qui ne tombe pas juste s'arrête avant stop, sans le dépasser.
+    """
+    return math.floor(abs(stop - start) / step + RANGE_EPSILON) + 1
+
+
+def value_range(start: float, stop: float, step: float) -> List[float]:
+    """Liste des valeurs de start à stop inclus, par pas de step."""
+    count = value_count(start, stop, step)
+    start = min(start, stop)
+    return [round(start + index * step, 3) for index in range(count)]
+
+
+def dose_grid(
+    currents: Sequence[float],
+    targets: Sequence[float],
+    volumes: Sequence[float],
+    forms: Sequence[str],
+    coefficients: Dict[str, Tuple[float, str]],
+    raise_value: bool = True,
+) -> List[dict]:
+    """Calcule en une passe toutes les doses d'une grille de simulation.
+
+    Les écarts (cible - actuel) et les facteurs (volume x coefficient) sont
+    calculés une seule fois chacun, puis combinés par produit cartésien :
+    dose = max(écart, 0) x facteur. raise_value=False inverse le sens de
+    l'écart pour les produits qui font baisser la valeur (pH-).
+    """
+    sign = 1 if raise_value else -1
+    differences = [
+        (current, target, max(sign * (target - current), 0.0))
+        for current, target in product(currents, targets)
+    ]
+    factors = [
+        (volume, form, volume * coefficients[form][0], coefficients[form][1])
+        for volume, form in product(volumes, forms)
+    ]
+    return [
+        {
+            "volume": volume,
+            "current": current,
+            "target": target,
+            "form": form,
+            "dose": round(difference * factor, 2),
+            "unit": unit,
+        }
+        for (volume, form, factor, unit), (current, target, difference) in product(factors, differences)
+    ]
@@ -0,0 +1,113 @@
+"""Agrégats globaux de la flotte de piscines Piscinexa."""
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+METRIC_PH_OUT_OF_RANGE = "ph_out_of_range"
+METRIC_CHLORE_OUT_OF_RANGE = "chlore_out_of_range"
+METRIC_PH_PLUS = "ph_plus"
+METRIC_PH_MINUS = "ph_minus"
+METRIC_CHLORE = "chlore"
+METRIC_FILTRATION_HOURS = "filtration_hours"
+METRIC_ENERGY_KWH = "energy_kwh"
+
+
+def unit_metric(metric: str, unit: str) -> str:
+    """Clé d'agrégat d'un produit exprimé dans une unité donnée."""
+    return f"{metric}_{unit}"
+
+
+class PiscinexaFleet:
+    """Maintient les totaux de toutes les piscines par application de deltas.
+
+    Chaque piscine publie sa contribution à un agrégat ; seule la différence
+    avec la contribution précédente est appliquée au total, sans jamais
+    resommer l'ensemble des piscines. Les capteurs de flotte sont notifiés
+    une seule fois par tour de boucle pour les agrégats modifiés.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._values: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._totals: Dict[str, float] = defaultdict(int)
+        self._listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+        self._dirty: Set[str] = set()
+        self._notify_scheduled = False
+        self.owner_entry_id: Optional[str] = None
+
+    @callback
+    def async_claim(self, entry_id: str) -> bool:
+        """Désigne l'entrée qui porte les capteurs de flotte, si aucune ne le fait."""
+        if self.owner_entry_id is None:
+            self.owner_entry_id = entry_id
+            return True
+        return False
+
+    @callback
+    def async_update(self, entry_id: str, metric: str, value: Optional[float]) -> None:
+        """Met à jour la contribution d'une piscine à un agrégat."""
+        value = value or 0
+        contributions = self._values[metric]
+        old = contributions.get(entry_id, 0)
+        if value == old and entry_id in contributions:
+            return
+        contributions[entry_id] = value
+        self._totals[metric] += value - old
+        self._mark_dirty(metric)
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Retire toutes les contributions d'une piscine déchargée."""
+        for metric, contributions in self._values.items():
+            old = contributions.pop(entry_id, None)
+            if old is not None:
+                self._totals[metric] -= old
+                self._mark_dirty(metric)
+        if self.owner_entry_id == entry_id:
+            self.owner_entry_id = None
+
+    def total(self, metric: str) -> float:
+        """Retourne le total courant d'un agrégat."""
+        return round(self._totals.get(metric, 0), 2)
+
+    def pool_count(self, metric: str) -> int:
+        """Nombre de piscines ayant publié une valeur pour cet agrégat."""
+        return len(self._values.get(metric, {}))
+
+    @callback
+    def async_add_listener(
+        self, metrics: Iterable[str], listener: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Appelle listener lorsque l'un des agrégats donnés change."""
+        metrics = tuple(metrics)
+        for metric in metrics:
+            self._listeners[metric].append(listener)
+
+        @callback
+        def _remove() -> None:
+            for metric in metrics:
+                if listener in self._listeners[metric]:
+                    self._listeners[metric].remove(listener)
+
+        return _remove
+
+    def _mark_dirty(self, metric: str) -> None:
+        self._dirty.add(metric)
+        if not self._notify_scheduled:
+            self._notify_scheduled = True
+            self._hass.loop.call_soon(self._async_notify)
+
+    @callback
+    def _async_notify(self) -> None:
+        self._notify_scheduled = False
+        dirty, self._dirty = self._dirty, set()
+        notified = set()
+        for metric in dirty:
+            for listener in self._listeners.get(metric, ()):
+                if listener not in notified:
+                    notified.add(listener)
+                    listener()
@@ -0,0 +1,116 @@
+"""Énergie et durée de chauffe d'une piscine par pompe à chaleur."""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Capacité thermique de l'eau : énergie pour chauffer 1 m³ de 1 °C (kWh)
+WATER_HEAT_CAPACITY = 1.163
+
+# Coefficient de déperdition initial (°C perdus par heure et par °C d'écart eau - air)
+DEFAULT_HEAT_LOSS = 0.004
+# Poids d'une nouvelle observation dans la moyenne du coefficient
+HEAT_LOSS_ALPHA = 0.1
+# Durée minimale entre deux relevés comparés, pour lisser le bruit du capteur
+MIN_SAMPLE_INTERVAL = timedelta(minutes=30)
+# Écart eau - air minimal pour qu'un refroidissement soit exploitable (°C)
+MIN_TEMPERATURE_GAP = 2.0
+
+# Température de l'air retenue sans entité météo (°C)
+DEFAULT_AIR_TEMPERATURE = 15.0
+
+
+class HeatLossEstimator:
+    """Apprend la déperdition thermique effective à partir des relevés de température.
+
+    Chaque relevé est comparé au précédent point d'ancrage, au plus tôt
+    MIN_SAMPLE_INTERVAL plus tard. Une baisse de température fournit une
+    observation du coefficient (vitesse de refroidissement / écart à l'air),
+    intégrée par moyenne exponentielle ; une hausse (chauffe ou soleil)
+    déplace seulement l'ancrage. Le coût par relevé est constant.
+    """
+
+    def __init__(self, coefficient: float = DEFAULT_HEAT_LOSS, samples: int = 0):
+        self.coefficient = coefficient
+        self.samples = samples
+        self._anchor: Optional[Tuple[datetime, float]] = None
+
+    def add_reading(self, when: datetime, temperature: float, air_temperature: float) -> bool:
+        """Intègre un relevé ; retourne True si le coefficient a été mis à jour."""
+        if self._anchor is None:
+            self._anchor = (when, temperature)
+            return False
+        anchor_time, anchor_temperature = self._anchor
+        elapsed = when - anchor_time
+        if elapsed < MIN_SAMPLE_INTERVAL:
+            return False
+        self._anchor = (when, temperature)
+        cooling_rate = (anchor_temperature - temperature) / (elapsed.total_seconds() / 3600)
+        gap = (anchor_temperature + temperature) / 2 - air_temperature
+        if cooling_rate <= 0 or gap < MIN_TEMPERATURE_GAP:
+            return False
+        observed = cooling_rate / gap
+        self.coefficient += HEAT_LOSS_ALPHA * (observed - self.coefficient)
+        self.samples += 1
+        return True
+
+
+def heating_estimate(
+    volume: float,
+    temperature: float,
+    target: float,
+    pump_power: float,
+    cop: float,
+    heat_loss: float,
+    air_temperature: float,
+) -> Dict[str, Any]:
+    """Énergie et durée pour porter l'eau de temperature à target.
+
+    La chauffe suit dT/dt = H - k (T - Tair), où H = P x COP / C est la
+    vitesse de chauffe sans pertes et k le coefficient de déperdition. Au-delà
+    de la température d'équilibre Tair + H / k, la cible n'est pas atteignable.
+    """
+    capacity = WATER_HEAT_CAPACITY * volume
+    delta = max(target - temperature, 0.0)
+    thermal_kwh = capacity * delta
+    heating_rate = pump_power / 1000 * cop / capacity if capacity > 0 else 0.0
+    equilibrium = air_temperature + heating_rate / heat_loss if heat_loss > 0 else math.inf
+    result = {
+        "delta": round(delta, 2),
+        "thermal_kwh": round(thermal_kwh, 2),
+        "heating_rate": round(heating_rate, 3),
+        "equilibrium_temperature": round(equilibrium, 1) if equilibrium != math.inf else None,
+        "reachable": True,
+        "hours": 0.0,
+        "electric_kwh": 0.0,
+    }
+    if delta == 0:
+        return result
+    if heating_rate <= 0 or target >= equilibrium:
+        result.update(reachable=False, hours=None, electric_kwh=None)
+        return result
+    if heat_loss > 0:
+        hours = math.log(
+            (heating_rate - heat_loss * (temperature - air_temperature))
+            / (heating_rate - heat_loss * (target - air_temperature))
+        ) / heat_loss
+    else:
+        hours = delta / heating_rate
+    result["hours"] = round(hours, 2)
+    result["electric_kwh"] = round(pump_power / 1000 * hours, 2)
+    return result
+
+
+def cheapest_window(prices: Sequence[float], first_slot: int, slots: int) -> Optional[Tuple[int, float]]:
+    """Début et somme des prix de la fenêtre contiguë la moins chère, à partir de first_slot.
+
+    Somme glissante : chaque décalage ne coûte qu'une addition et une soustraction.
+    """
+    if slots <= 0 or first_slot + slots > len(prices):
+        return None
+    window = sum(prices[first_slot:first_slot + slots])
+    best = (first_slot, window)
+    for start in range(first_slot + 1, len(prices) - slots + 1):
+        window += prices[start + slots - 1] - prices[start - 1]
+        if window < best[1] - 1e-9:
+            best = (start, window)
+    return best
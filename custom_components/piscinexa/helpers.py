@@ -0,0 +1,52 @@
+"""Fonctions utilitaires partagées par les modules Piscinexa."""
+from functools import lru_cache
+from typing import Any, Dict, Mapping
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import slugify
+
+from .const import DATA_SOURCE_KEYS, DOMAIN, OPTION_SOURCE_KEYS, POOL_TYPE_SQUARE
+
+
+@lru_cache(maxsize=None)
+def _object_prefix(name: str) -> str:
+    """Nom de piscine slugifié, calculé une fois par nom : les getters relisent les cibles."""
+    return slugify(name)
+
+
+def entry_entity_id(hass: HomeAssistant, entry: ConfigEntry, domain: str, key: str) -> str:
+    """entity_id d'une entité number ou select de l'entrée, retrouvée par son unique_id.
+
+    Le nom de la piscine n'est pas un identifiant valide tel quel ; l'identifiant
+    slugifié sert de repli tant que l'entité n'est pas encore dans le registre.
+    """
+    unique_id = f"{entry.entry_id}_{domain}_{key}"
+    return (
+        er.async_get(hass).async_get_entity_id(domain, DOMAIN, unique_id)
+        or f"{domain}.{_object_prefix(entry.data['name'])}_{key}"
+    )
+
+
+def number_value(hass: HomeAssistant, entry: ConfigEntry, key: str, default: float) -> float:
+    """Valeur de l'entité number de key, ou à défaut celle de la configuration."""
+    state = hass.states.get(entry_entity_id(hass, entry, "number", key))
+    try:
+        return float(state.state)
+    except (AttributeError, ValueError, TypeError):
+        return float(entry.data.get(key, default))
+
+
+def pool_dimensions(data: Mapping[str, Any]) -> str:
+    """Forme et dimensions d'une piscine, en une ligne lisible."""
+    if data.get("pool_type") == POOL_TYPE_SQUARE:
+        return f"{data.get('length')} × {data.get('width')} × {data.get('depth')} m"
+    return f"Ø {data.get('diameter')} × {data.get('depth')} m"
+
+
+def source_entity_ids(entry: ConfigEntry) -> Dict[str, str]:
+    """Entités sources configurées pour une entrée, par clé de configuration."""
+    sources = {key: entry.data.get(key) for key in DATA_SOURCE_KEYS}
+    sources.update({key: entry.options.get(key) for key in OPTION_SOURCE_KEYS})
+    return {key: entity_id for key, entity_id in sources.items() if entity_id}
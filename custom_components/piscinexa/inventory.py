@@ -0,0 +1,153 @@
+"""Stocks de produits et prévision de consommation pour Piscinexa."""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .dosage import PH_DOSE_COEFFICIENTS, CHLORE_DOSE_COEFFICIENTS
+from .planner import PRODUCT_PH_PLUS, PRODUCT_PH_MINUS, PRODUCT_CHLORE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.inventory"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+SHARED_SCOPE = "shared"
+
+# Forme de produit -> unité de stock, par produit
+PRODUCT_UNITS = {
+    PRODUCT_PH_PLUS: {form: unit for form, (_, unit) in PH_DOSE_COEFFICIENTS.items()},
+    PRODUCT_PH_MINUS: {form: unit for form, (_, unit) in PH_DOSE_COEFFICIENTS.items()},
+    PRODUCT_CHLORE: {form: unit for form, (_, unit) in CHLORE_DOSE_COEFFICIENTS.items()},
+}
+
+# Noms acceptés par apply_treatment pour chaque produit
+PRODUCT_ALIASES = {
+    PRODUCT_PH_PLUS: PRODUCT_PH_PLUS,
+    PRODUCT_PH_MINUS: PRODUCT_PH_MINUS,
+    PRODUCT_CHLORE: PRODUCT_CHLORE,
+    "pH+": PRODUCT_PH_PLUS,
+    "pH-": PRODUCT_PH_MINUS,
+    "Chlore": PRODUCT_CHLORE,
+}
+
+# Poids de la dernière observation dans la moyenne de consommation
+CONSUMPTION_ALPHA = 0.3
+# Intervalle minimal entre deux applications pris en compte (jours)
+MIN_INTERVAL_DAYS = 1.0
+
+
+class PiscinexaInventory:
+    """Stocks par piscine ou partagés, persistés dans le stockage de Home Assistant.
+
+    Chaque application décrémente le stock de la piscine s'il est suivi,
+    sinon le stock partagé. La consommation journalière de chaque stock est
+    une moyenne exponentielle mise à jour à chaque application, sans
+    conserver l'historique des doses.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._stocks: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+        self._consumption: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = defaultdict(lambda: defaultdict(dict))
+        self._listeners: List[Callable[[], None]] = []
+
+    async def async_load(self) -> None:
+        """Charge les stocks enregistrés."""
+        data = await self._store.async_load() or {}
+        for scope, products in data.get("stocks", {}).items():
+            for product, forms in products.items():
+                self._stocks[scope][product].update(forms)
+        for scope, products in data.get("consumption", {}).items():
+            for product, forms in products.items():
+                self._consumption[scope][product].update(forms)
+        _LOGGER.debug(f"Stocks Piscinexa chargés : {len(self._stocks)} périmètre(s)")
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {
+            "stocks": {scope: {product: dict(forms) for product, forms in products.items()} for scope, products in self._stocks.items()},
+            "consumption": {scope: {product: dict(forms) for product, forms in products.items()} for scope, products in self._consumption.items()},
+        }
+
+    def scope_for(self, pool: str, product: str, form: str) -> str:
+        """Périmètre dont une piscine consomme le produit : le sien s'il est suivi."""
+        if form in self._stocks.get(pool, {}).get(product, {}):
+            return pool
+        return SHARED_SCOPE
+
+    def stock(self, scope: str, product: str, form: str) -> Optional[float]:
+        """Stock courant, ou None s'il n'est pas suivi."""
+        value = self._stocks.get(scope, {}).get(product, {}).get(form)
+        return None if value is None else round(value, 2)
+
+    def daily_consumption(self, scope: str, product: str, form: str) -> Optional[float]:
+        """Consommation journalière moyenne d'un stock."""
+        rate = self._consumption.get(scope, {}).get(product, {}).get(form, {}).get("rate")
+        return None if rate is None else round(rate, 3)
+
+    def days_remaining(self, scope: str, product: str, form: str) -> Optional[float]:
+        """Jours de stock restants au rythme de consommation actuel."""
+        stock = self.stock(scope, product, form)
+        rate = self.daily_consumption(scope, product, form)
+        if stock is None or not rate:
+            return None
+        return round(max(stock, 0) / rate, 1)
+
+    @callback
+    def async_restock(self, scope: str, product: str, form: str, quantity: float, replace: bool = False) -> float:
+        """Ajoute (ou fixe) la quantité en stock d'un produit."""
+        forms = self._stocks[scope][product]
+        forms[form] = quantity if replace else forms.get(form, 0) + quantity
+        self._changed()
+        return forms[form]
+
+    @callback
+    def async_consume(
+        self, pool: str, product: str, form: str, quantity: float, when: Optional[datetime] = None
+    ) -> Tuple[str, Optional[float]]:
+        """Enregistre une application : décrémente le stock et met à jour la consommation."""
+        scope = self.scope_for(pool, product, form)
+        forms = self._stocks[scope][product]
+        if form in forms:
+            forms[form] = max(forms[form] - quantity, 0)
+
+        when = when or dt_util.utcnow()
+        history = self._consumption[scope][product].setdefault(form, {})
+        last = dt_util.parse_datetime(history["last"]) if history.get("last") else None
+        if last is not None:
+            days = max((when - last).total_seconds() / 86400, MIN_INTERVAL_DAYS)
+            observed = quantity / days
+            rate = history.get("rate")
+            history["rate"] = observed if rate is None else CONSUMPTION_ALPHA * observed + (1 - CONSUMPTION_ALPHA) * rate
+        history["last"] = when.isoformat()
+
+        self._changed()
+        return scope, forms.get(form)
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Appelle listener à chaque modification des stocks."""
+        self._listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def as_dict(self) -> Dict[str, Any]:
+        """État complet des stocks, pour les diagnostics et les réponses de service."""
+        return self._data_to_save()
+
+    def _changed(self) -> None:
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        for listener in list(self._listeners):
+            listener()
@@ -0,0 +1,96 @@
+import logging
+from homeassistant.components.number import NumberMode, RestoreNumber
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.util import slugify
+from .const import DOMAIN, UNIT_MG_PER_LITER, VERSION
+from .chlorine_targets import DEFAULT_CYA
+from .water_balance import DEFAULT_ALKALINITY, DEFAULT_CALCIUM_HARDNESS, DEFAULT_TDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# (clé, libellé, min, max, pas, unité, valeur initiale)
+NUMBER_DESCRIPTIONS = [
+    ("ph_current", "pH Actuel", 0, 14, 0.1, None, 7.0),
+    ("ph_target", "pH Cible", 0, 14, 0.1, None, 7.4),
+    ("chlore_current", "Chlore Actuel", 0, 10, 0.1, UNIT_MG_PER_LITER, 1.0),
+    ("chlore_target", "Chlore Cible", 0, 10, 0.1, UNIT_MG_PER_LITER, 2.0),
+    ("alkalinity", "Alcalinité (TAC)", 0, 500, 1, UNIT_MG_PER_LITER, DEFAULT_ALKALINITY),
+    ("calcium_hardness", "Dureté calcique", 0, 1000, 1, UNIT_MG_PER_LITER, DEFAULT_CALCIUM_HARDNESS),
+    ("tds", "TDS", 0, 10000, 10, UNIT_MG_PER_LITER, DEFAULT_TDS),
+    ("cya", "Acide cyanurique (CYA)", 0, 200, 1, UNIT_MG_PER_LITER, DEFAULT_CYA),
+    ("temperature_target", "Température cible", 10, 40, 0.5, "°C", 28.0),
+]
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Configurez les entrées numériques pour Piscinexa."""
+    name = entry.data["name"]
+    async_add_entities(
+        PiscinexaNumber(hass, entry, name, *description)
+        for description in NUMBER_DESCRIPTIONS
+    )
+
+class PiscinexaNumber(RestoreNumber):
+    """Entrée numérique ajustable d'une piscine, restaurée au redémarrage."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        name: str,
+        key: str,
+        label: str,
+        min_value: float,
+        max_value: float,
+        step: float,
+        unit: str,
+        initial: float,
+    ):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._key = key
+        self.entity_id = f"number.{slugify(name)}_{key}"
+        self._attr_friendly_name = f"{name.capitalize()} {label}"
+        self._attr_unique_id = f"{entry.entry_id}_number_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:target" if key.endswith("_target") else "mdi:water"
+        self._attr_mode = NumberMode.BOX
+        self._attr_should_poll = False
+        self._attr_native_min_value = min_value
+        self._attr_native_max_value = max_value
+        self._attr_native_step = step
+        self._attr_native_unit_of_measurement = unit
+        try:
+            self._attr_native_value = float(entry.data.get(key, initial))
+        except (ValueError, TypeError):
+            self._attr_native_value = initial
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    async def async_added_to_hass(self):
+        """Restaure la dernière valeur connue après un redémarrage."""
+        await super().async_added_to_hass()
+        last_data = await self.async_get_last_number_data()
+        if last_data is not None and last_data.native_value is not None:
+            self._attr_native_value = last_data.native_value
+            _LOGGER.debug(f"Valeur restaurée pour {self.entity_id}: {self._attr_native_value}")
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Met à jour la valeur saisie par l'utilisateur."""
+        self._attr_native_value = value
+        self.async_write_ha_state()
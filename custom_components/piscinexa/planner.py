@@ -0,0 +1,197 @@
+"""Planification ordonnée des traitements d'une piscine Piscinexa."""
+import heapq
+import logging
+from itertools import count
+from typing import Any, Dict, List, Optional
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    PH_MIN_IDEAL,
+    PH_MAX_IDEAL,
+    CONF_PRODUCT_PRICES,
+    DEFAULT_PRODUCT_PRICES,
+    PH_TREATMENT_OPTIONS,
+    CHLORE_TREATMENT_OPTIONS,
+)
+from .chlorine_targets import chlorine_targets
+from .dosage import PH_DOSE_COEFFICIENTS, CHLORE_DOSE_COEFFICIENTS
+from .helpers import number_value
+
+_LOGGER = logging.getLogger(__name__)
+
+PRODUCT_PH_PLUS = "ph_plus"
+PRODUCT_PH_MINUS = "ph_minus"
+PRODUCT_CHLORE = "chlore"
+
+# Limites de sécurité d'une application unique
+MAX_PH_STEP = 0.2
+MAX_CHLORE_STEP = 3.0
+PH_TOLERANCE = 0.05
+CHLORE_TOLERANCE = 0.1
+
+# Heures de filtration à attendre après une application, par produit et forme
+WAIT_HOURS = {
+    PRODUCT_PH_PLUS: {"Liquide": 4, "Poudre": 6},
+    PRODUCT_PH_MINUS: {"Liquide": 4, "Poudre": 6},
+    PRODUCT_CHLORE: {"Liquide": 4, "Pastille lente": 24, "Chlore choc (poudre)": 8},
+}
+
+# Dérive du pH provoquée par 1 mg/L de chlore ajouté, selon la forme
+CHLORE_PH_DRIFT = {"Liquide": 0.01, "Pastille lente": -0.01, "Chlore choc (poudre)": 0.015}
+
+# Nombre maximal d'états explorés par la recherche
+MAX_EXPANSIONS = 5000
+
+# Formes de traitement possibles pour chaque produit
+PRODUCT_FORMS = {
+    PRODUCT_PH_PLUS: PH_TREATMENT_OPTIONS,
+    PRODUCT_PH_MINUS: PH_TREATMENT_OPTIONS,
+    PRODUCT_CHLORE: CHLORE_TREATMENT_OPTIONS,
+}
+
+PRICE_SCHEMA = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+# Catalogue de prix saisi dans les options ou passé au service plan_treatment
+PRODUCT_PRICES_SCHEMA = vol.Schema({
+    vol.Optional(product): vol.Schema({vol.Optional(form): PRICE_SCHEMA for form in forms})
+    for product, forms in PRODUCT_FORMS.items()
+})
+
+
+def product_prices(entry: ConfigEntry, overrides: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, Dict[str, float]]:
+    """Catalogue de prix effectif : défauts, options de l'entrée puis surcharges."""
+    prices = {product: dict(forms) for product, forms in DEFAULT_PRODUCT_PRICES.items()}
+    for source in (entry.options.get(CONF_PRODUCT_PRICES) or {}, overrides or {}):
+        # Les options enregistrées avant d'être validées par le flux peuvent contenir
+        # n'importe quoi : seuls les prix d'une forme connue, convertibles, sont retenus
+        for product, forms in source.items():
+            if product not in prices or not isinstance(forms, dict):
+                continue
+            for form, price in forms.items():
+                if form not in PRODUCT_FORMS[product]:
+                    continue
+                try:
+                    prices[product][form] = PRICE_SCHEMA(price)
+                except vol.Invalid:
+                    _LOGGER.debug(f"Prix ignoré pour {product} ({form}) : {price!r}")
+    return prices
+
+
+def build_snapshot(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, float]:
+    """Valeurs courantes d'une piscine utilisées par le planificateur."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "ph_current": runtime.get("ph_current", runtime["config"].ph_current),
+        "ph_target": number_value(hass, entry, "ph_target", 7.4),
+        "chlore_current": runtime.get("chlore_current", runtime["config"].chlore_current),
+        "chlore_target": chlorine_targets(hass, entry).target,
+        "volume": float(runtime.get("volume", 30.0)),
+    }
+
+
+def plan_treatment(snapshot: Dict[str, float], prices: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Cherche la suite de traitements la moins chère, puis la plus courte.
+
+    Recherche à coût uniforme sur les états (pH, chlore) : chaque transition
+    applique une forme de produit du catalogue sur au plus MAX_PH_STEP ou
+    MAX_CHLORE_STEP, suivie de son temps de filtration. Le chlore n'est
+    ajouté que lorsque le pH est dans la plage idéale (ou à sa cible), et la
+    dérive de pH qu'il provoque est prise en compte. Fonction bloquante,
+    destinée à l'exécuteur.
+    """
+    volume = snapshot["volume"]
+    ph_target = snapshot["ph_target"]
+    chlore_target = snapshot["chlore_target"]
+
+    def actions(ph: float, chlore: float):
+        if ph < ph_target - PH_TOLERANCE:
+            delta = min(ph_target - ph, MAX_PH_STEP)
+            for form, price in prices.get(PRODUCT_PH_PLUS, {}).items():
+                if form in PH_DOSE_COEFFICIENTS:
+                    yield PRODUCT_PH_PLUS, form, price, PH_DOSE_COEFFICIENTS[form], delta, ph + delta, chlore
+        elif ph > ph_target + PH_TOLERANCE:
+            delta = min(ph - ph_target, MAX_PH_STEP)
+            for form, price in prices.get(PRODUCT_PH_MINUS, {}).items():
+                if form in PH_DOSE_COEFFICIENTS:
+                    yield PRODUCT_PH_MINUS, form, price, PH_DOSE_COEFFICIENTS[form], delta, ph - delta, chlore
+        ph_safe = PH_MIN_IDEAL <= ph <= PH_MAX_IDEAL or abs(ph - ph_target) <= PH_TOLERANCE
+        if chlore < chlore_target - CHLORE_TOLERANCE and ph_safe:
+            delta = min(chlore_target - chlore, MAX_CHLORE_STEP)
+            for form, price in prices.get(PRODUCT_CHLORE, {}).items():
+                if form in CHLORE_DOSE_COEFFICIENTS:
+                    drift = CHLORE_PH_DRIFT.get(form, 0) * delta
+                    yield PRODUCT_CHLORE, form, price, CHLORE_DOSE_COEFFICIENTS[form], delta, ph + drift, chlore + delta
+
+    def is_goal(ph: float, chlore: float) -> bool:
+        return abs(ph - ph_target) <= PH_TOLERANCE and chlore >= chlore_target - CHLORE_TOLERANCE
+
+    start = (round(snapshot["ph_current"], 2), round(snapshot["chlore_current"], 2))
+    tie = count()
+    queue = [(0.0, 0, next(tie), start, [])]
+    settled = set()
+    expansions = 0
+    while queue and expansions < MAX_EXPANSIONS:
+        cost, hours, _, state, steps = heapq.heappop(queue)
+        if state in settled:
+            continue
+        settled.add(state)
+        expansions += 1
+        if is_goal(*state):
+            return {
+                "feasible": True,
+                "steps": steps,
+                "total_cost": round(cost, 2),
+                "total_hours": hours,
+                "final_ph": state[0],
+                "final_chlore": state[1],
+                "expansions": expansions,
+            }
+        for product, form, price, (coefficient, unit), delta, ph, chlore in actions(*state):
+            next_state = (round(ph, 2), round(chlore, 2))
+            if next_state in settled:
+                continue
+            dose = round(delta * volume * coefficient, 2)
+            step_cost = round(dose * price, 2)
+            wait = WAIT_HOURS.get(product, {}).get(form, 4)
+            step = {
+                "order": len(steps) + 1,
+                "product": product,
+                "form": form,
+                "dose": dose,
+                "unit": unit,
+                "ph_after": next_state[0],
+                "chlore_after": next_state[1],
+                "cost": step_cost,
+                "wait_hours": wait,
+            }
+            heapq.heappush(queue, (round(cost + step_cost, 2), hours + wait, next(tie), next_state, steps + [step]))
+
+    _LOGGER.debug(f"Aucun plan de traitement trouvé après {expansions} états explorés")
+    return {
+        "feasible": False,
+        "steps": [],
+        "total_cost": None,
+        "total_hours": None,
+        "final_ph": None,
+        "final_chlore": None,
+        "expansions": expansions,
+    }
+
+
+async def async_plan_treatment(
+    hass: HomeAssistant, snapshot: Dict[str, float], prices: Dict[str, Dict[str, float]]
+) -> Dict[str, Any]:
+    """Exécute plan_treatment dans l'exécuteur."""
+    return await hass.async_add_executor_job(plan_treatment, snapshot, prices)
+
+
+def plan_summary(plan: Dict[str, Any]) -> List[str]:
+    """Description courte de chaque étape, pour les tableaux de bord."""
+    return [
+        f"{step['order']}. {step['product']} {step['form']} : {step['dose']} {step['unit']}, attendre {step['wait_hours']} h"
+        for step in plan["steps"]
+    ]
@@ -0,0 +1,147 @@
+"""Configuration normalisée d'une piscine.
+
+Depuis la version 2 des entrées, entry.data ne contient que des valeurs
+validées : dimensions, mesures et cibles en float, clés toutes présentes,
+sans les choix intermédiaires du flux de configuration. PoolConfig en donne
+une vue typée, construite une fois par entrée et relue en place quand les
+options changent : les capteurs lisent des floats, sans conversion ni repli
+à chaque calcul.
+"""
+from typing import Any, Dict, Mapping, Optional
+
+from homeassistant.const import CONF_NAME
+
+from .const import (
+    CONF_DEPTH,
+    CONF_DIAMETER,
+    CONF_LENGTH,
+    CONF_POOL_TYPE,
+    CONF_WIDTH,
+    DATA_SOURCE_KEYS,
+    PI,
+    POOL_TYPE_ROUND,
+    POOL_TYPE_SQUARE,
+)
+
+# Version du schéma de entry.data, incrémentée à chaque migration
+CONFIG_VERSION = 2
+
+# Valeurs par défaut, identiques à celles du flux de configuration
+POOL_DEFAULTS = {
+    CONF_DEPTH: 1.5,
+    CONF_LENGTH: 5.0,
+    CONF_WIDTH: 4.0,
+    CONF_DIAMETER: 4.0,
+    "temperature": 20.0,
+    "ph_current": 7.0,
+    "ph_target": 7.4,
+    "chlore_current": 1.0,
+    "chlore_target": 2.0,
+    "ph_plus_treatment": "Liquid",
+    "ph_minus_treatment": "Liquid",
+    "chlore_treatment": "Shock chlorine (powder)",
+}
+SHAPE_KEYS = {
+    POOL_TYPE_SQUARE: (CONF_LENGTH, CONF_WIDTH),
+    POOL_TYPE_ROUND: (CONF_DIAMETER,),
+}
+DIMENSION_KEYS = (CONF_DEPTH, CONF_LENGTH, CONF_WIDTH, CONF_DIAMETER)
+MEASURE_KEYS = ("temperature", "ph_current", "ph_target", "chlore_current", "chlore_target")
+TREATMENT_KEYS = ("ph_plus_treatment", "ph_minus_treatment", "chlore_treatment")
+
+# Choix intermédiaires du flux, enregistrés dans entry.data par la version 1
+FLOW_KEYS = (
+    "ph_config_choice",
+    "chlore_config_choice",
+    "temperature_config_choice",
+    "power_config_choice",
+    "confirm_choice",
+    "show_all_sensors",
+)
+
+
+def _float(value: Any, default: float, positive: bool = False) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if positive and number <= 0 else number
+
+
+def normalize_pool_data(data: Mapping[str, Any]) -> Dict[str, Any]:
+    """entry.data d'une piscine au format courant : types, valeurs par défaut et clés utiles seulement."""
+    pool = {key: value for key, value in data.items() if key not in FLOW_KEYS}
+    if pool.get(CONF_POOL_TYPE) not in SHAPE_KEYS:
+        pool[CONF_POOL_TYPE] = POOL_TYPE_SQUARE
+    dimensions = (CONF_DEPTH, *SHAPE_KEYS[pool[CONF_POOL_TYPE]])
+    for key in DIMENSION_KEYS:
+        if key in dimensions:
+            pool[key] = _float(pool.get(key), POOL_DEFAULTS[key], positive=True)
+        else:
+            pool.pop(key, None)
+    for key in MEASURE_KEYS:
+        pool[key] = _float(pool.get(key), POOL_DEFAULTS[key])
+    for key in TREATMENT_KEYS:
+        pool[key] = pool.get(key) or POOL_DEFAULTS[key]
+    for key in DATA_SOURCE_KEYS:
+        if not pool.get(key):
+            pool.pop(key, None)
+    return pool
+
+
+def pool_volume(data: Mapping[str, Any]) -> float:
+    """Volume d'eau (m³) de dimensions déjà validées."""
+    if data[CONF_POOL_TYPE] == POOL_TYPE_SQUARE:
+        return float(data[CONF_LENGTH]) * float(data[CONF_WIDTH]) * float(data[CONF_DEPTH])
+    return PI * (float(data[CONF_DIAMETER]) / 2) ** 2 * float(data[CONF_DEPTH])
+
+
+class PoolConfig:
+    """Vue typée de entry.data d'une piscine, partagée par ses capteurs."""
+
+    __slots__ = (
+        "name",
+        "pool_type",
+        "depth",
+        "length",
+        "width",
+        "diameter",
+        "volume",
+        "temperature",
+        "ph_current",
+        "ph_target",
+        "chlore_current",
+        "chlore_target",
+        "ph_plus_treatment",
+        "ph_minus_treatment",
+        "chlore_treatment",
+        "temperature_sensor",
+        "ph_sensor",
+        "chlore_sensor",
+        "power_sensor",
+    )
+
+    def __init__(self, data: Mapping[str, Any]):
+        self.load(data)
+
+    def load(self, data: Mapping[str, Any]) -> None:
+        """Relit entry.data, normalisé par la migration et le flux de configuration."""
+        self.name: str = data[CONF_NAME]
+        self.pool_type: str = data[CONF_POOL_TYPE]
+        self.depth: float = data[CONF_DEPTH]
+        self.length: Optional[float] = data.get(CONF_LENGTH)
+        self.width: Optional[float] = data.get(CONF_WIDTH)
+        self.diameter: Optional[float] = data.get(CONF_DIAMETER)
+        self.volume: float = pool_volume(data)
+        self.temperature: float = data["temperature"]
+        self.ph_current: float = data["ph_current"]
+        self.ph_target: float = data["ph_target"]
+        self.chlore_current: float = data["chlore_current"]
+        self.chlore_target: float = data["chlore_target"]
+        self.ph_plus_treatment: str = data["ph_plus_treatment"]
+        self.ph_minus_treatment: str = data["ph_minus_treatment"]
+        self.chlore_treatment: str = data["chlore_treatment"]
+        self.temperature_sensor: Optional[str] = data.get("temperature_sensor")
+        self.ph_sensor: Optional[str] = data.get("ph_sensor")
+        self.chlore_sensor: Optional[str] = data.get("chlore_sensor")
+        self.power_sensor: Optional[str] = data.get("power_sensor_entity_id")
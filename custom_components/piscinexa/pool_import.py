@@ -0,0 +1,162 @@
+"""Import groupé de piscines depuis un fichier YAML ou JSON.
+
+Le fichier décrit une liste de piscines (directement ou sous la clé pools),
+avec les mêmes champs que le flux de configuration. Toutes les piscines sont
+validées avant la création de la première entrée : un fichier comportant
+une erreur ne crée rien. Les piscines dont le nom est déjà configuré sont
+ignorées, ce qui permet de relancer un import interrompu.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+import voluptuous as vol
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util.yaml import load_yaml
+
+from .const import (
+    CONF_DEPTH,
+    CONF_DIAMETER,
+    CONF_LENGTH,
+    CONF_POOL_TYPE,
+    CONF_WIDTH,
+    DOMAIN,
+    POOL_TYPE_ROUND,
+    POOL_TYPE_SQUARE,
+    TREATMENT_FORM_FROM_CONFIG,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Formes acceptées : choix du flux de configuration ou nom de la forme, ramené au choix du flux
+CONFIG_FORM_FROM_TREATMENT = {form: choice for choice, form in TREATMENT_FORM_FROM_CONFIG.items()}
+PH_FORMS = ("Liquid", "Granules")
+CHLORE_FORMS = ("Liquid", "Shock chlorine (powder)", "Slow-dissolving tablet")
+
+_POSITIVE = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+_PH = vol.All(vol.Coerce(float), vol.Range(min=0, max=14, min_included=False, max_included=False))
+_CHLORE = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+
+def _treatment_form(choices: Tuple[str, ...]):
+    def validate(value: Any) -> str:
+        value = CONFIG_FORM_FROM_TREATMENT.get(value, value)
+        if value not in choices:
+            raise vol.Invalid(f"forme inconnue {value} (formes possibles : {', '.join(choices)})")
+        return value
+
+    return validate
+
+
+def _dimensions(pool: Dict[str, Any]) -> Dict[str, Any]:
+    """Exige les dimensions propres à la forme et écarte les autres."""
+    required = (CONF_LENGTH, CONF_WIDTH) if pool[CONF_POOL_TYPE] == POOL_TYPE_SQUARE else (CONF_DIAMETER,)
+    missing = [key for key in required if key not in pool]
+    if missing:
+        raise vol.Invalid(f"dimensions manquantes pour une piscine {pool[CONF_POOL_TYPE]} : {', '.join(missing)}")
+    for key in {CONF_LENGTH, CONF_WIDTH, CONF_DIAMETER} - set(required):
+        pool.pop(key, None)
+    return pool
+
+
+# Valeurs par défaut identiques à celles des étapes de saisie manuelle du flux
+POOL_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Required(CONF_NAME): vol.All(cv.string, vol.Length(min=1)),
+        vol.Required(CONF_POOL_TYPE): vol.In((POOL_TYPE_SQUARE, POOL_TYPE_ROUND)),
+        vol.Required(CONF_DEPTH): _POSITIVE,
+        vol.Optional(CONF_LENGTH): _POSITIVE,
+        vol.Optional(CONF_WIDTH): _POSITIVE,
+        vol.Optional(CONF_DIAMETER): _POSITIVE,
+        vol.Optional("ph_current", default=7.0): _PH,
+        vol.Optional("ph_target", default=7.4): _PH,
+        vol.Optional("chlore_current", default=1.0): _CHLORE,
+        vol.Optional("chlore_target", default=2.0): _CHLORE,
+        vol.Optional("temperature", default=20.0): vol.All(vol.Coerce(float), vol.Range(min=0, max=50)),
+        vol.Optional("ph_sensor"): cv.entity_id,
+        vol.Optional("chlore_sensor"): cv.entity_id,
+        vol.Optional("temperature_sensor"): cv.entity_id,
+        vol.Optional("power_sensor_entity_id"): cv.entity_id,
+        vol.Optional("ph_plus_treatment", default="Liquid"): _treatment_form(PH_FORMS),
+        vol.Optional("ph_minus_treatment", default="Liquid"): _treatment_form(PH_FORMS),
+        vol.Optional("chlore_treatment", default="Shock chlorine (powder)"): _treatment_form(CHLORE_FORMS),
+    }),
+    _dimensions,
+)
+
+
+def _read_file(path: str) -> Any:
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    return load_yaml(path)
+
+
+async def async_read_pools_file(hass: HomeAssistant, path: str) -> List[Any]:
+    """Lit le fichier, relatif au dossier de configuration, et retourne la liste brute des piscines."""
+    path = os.path.realpath(hass.config.path(path))
+    config_dir = os.path.realpath(hass.config.config_dir)
+    # Le dossier de configuration est toujours lisible, les autres dossiers seulement s'ils sont autorisés
+    if os.path.commonpath((path, config_dir)) != config_dir and not hass.config.is_allowed_path(path):
+        raise ServiceValidationError(f"Accès refusé au fichier {path} (voir allowlist_external_dirs)")
+    try:
+        content = await hass.async_add_executor_job(_read_file, path)
+    except (OSError, ValueError, HomeAssistantError) as e:
+        raise ServiceValidationError(f"Lecture impossible du fichier {path} : {e}") from e
+    if isinstance(content, dict):
+        content = content.get("pools")
+    if not isinstance(content, list):
+        raise ServiceValidationError(f"Le fichier {path} doit contenir une liste de piscines (ou une clé pools)")
+    return content
+
+
+def validate_pools(hass: HomeAssistant, raw: List[Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Valide toutes les piscines ; retourne celles à créer et les noms déjà configurés.
+
+    Lève ServiceValidationError avec l'ensemble des erreurs, piscine par
+    piscine, si une seule est invalide.
+    """
+    existing = {entry.data.get(CONF_NAME) for entry in hass.config_entries.async_entries(DOMAIN)}
+    pools: List[Dict[str, Any]] = []
+    skipped: List[str] = []
+    seen = set()
+    errors = []
+    for index, item in enumerate(raw):
+        try:
+            pool = POOL_SCHEMA(item)
+        except vol.Invalid as e:
+            label = item.get(CONF_NAME) if isinstance(item, dict) else None
+            errors.append(f"piscine {index + 1}{f' ({label})' if label else ''} : {e}")
+            continue
+        name = pool[CONF_NAME]
+        if name in seen:
+            errors.append(f"piscine {index + 1} ({name}) : nom en double dans le fichier")
+        elif name in existing:
+            skipped.append(name)
+        else:
+            pools.append(pool)
+        seen.add(name)
+    if errors:
+        raise ServiceValidationError(f"{len(errors)} piscine(s) invalide(s) : " + " ; ".join(errors))
+    return pools, skipped
+
+
+async def async_import_pools(hass: HomeAssistant, pools: List[Dict[str, Any]]) -> List[str]:
+    """Crée les entrées des piscines validées, toutes en parallèle ; retourne les noms créés."""
+    results = await asyncio.gather(*(
+        hass.config_entries.flow.async_init(DOMAIN, context={"source": SOURCE_IMPORT}, data=pool)
+        for pool in pools
+    ))
+    created = [
+        pool[CONF_NAME] for pool, result in zip(pools, results)
+        if result["type"] == FlowResultType.CREATE_ENTRY
+    ]
+    _LOGGER.info(f"Import de piscines : {len(created)} entrée(s) créée(s) sur {len(pools)}")
+    return created
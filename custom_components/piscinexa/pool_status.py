@@ -0,0 +1,159 @@
+"""État global d'une piscine, indépendant de la langue.
+
+L'état est évalué une fois par relevé des capteurs : un code (PoolStatus) et
+un masque des problèmes constatés (PoolIssue). Le texte affiché n'en est
+qu'un rendu traduit ; les automatisations déclenchent sur le code, publié en
+attribut, sans dépendre de la langue de l'instance.
+"""
+from enum import Enum, IntFlag
+from typing import List, Optional
+
+from .const import PH_MAX_IDEAL, PH_MIN_IDEAL
+from .water_balance import LSI_MAX_BALANCED, LSI_MIN_BALANCED
+
+# Plage de température confortable pour la baignade (°C)
+TEMPERATURE_MIN_COMFORT = 22.0
+TEMPERATURE_MAX_COMFORT = 28.0
+
+
+class PoolStatus(str, Enum):
+    """Code de l'état global d'une piscine."""
+
+    OK = "ok"
+    WARNING = "warning"
+    ALERT = "alert"
+    UNKNOWN = "unknown"
+
+
+class PoolIssue(IntFlag):
+    """Problèmes constatés, combinables en un seul entier."""
+
+    NONE = 0
+    TEMPERATURE_COLD = 1
+    TEMPERATURE_HOT = 2
+    TEMPERATURE_UNAVAILABLE = 4
+    CHLORE_LOW = 8
+    CHLORE_HIGH = 16
+    CHLORE_UNAVAILABLE = 32
+    PH_LOW = 64
+    PH_HIGH = 128
+    PH_UNAVAILABLE = 256
+    FILTRATION_INSUFFICIENT = 512
+    FILTRATION_UNAVAILABLE = 1024
+    WATER_CORROSIVE = 2048
+    WATER_SCALING = 4096
+
+
+# pH ou chlore hors plage : la qualité de l'eau interdit la baignade
+ALERT_ISSUES = PoolIssue.CHLORE_LOW | PoolIssue.CHLORE_HIGH | PoolIssue.PH_LOW | PoolIssue.PH_HIGH
+UNAVAILABLE_ISSUES = (
+    PoolIssue.TEMPERATURE_UNAVAILABLE
+    | PoolIssue.CHLORE_UNAVAILABLE
+    | PoolIssue.PH_UNAVAILABLE
+    | PoolIssue.FILTRATION_UNAVAILABLE
+)
+
+# Clés de traduction par aspect, dans l'ordre d'affichage : problèmes possibles, puis état idéal
+ASPECT_TRANSLATIONS = (
+    (
+        (
+            (PoolIssue.TEMPERATURE_COLD, "temperature_too_cold"),
+            (PoolIssue.TEMPERATURE_HOT, "temperature_too_hot"),
+            (PoolIssue.TEMPERATURE_UNAVAILABLE, "temperature_unavailable"),
+        ),
+        "temperature_ideal",
+    ),
+    (
+        (
+            (PoolIssue.CHLORE_LOW, "chlore_too_low"),
+            (PoolIssue.CHLORE_HIGH, "chlore_too_high"),
+            (PoolIssue.CHLORE_UNAVAILABLE, "chlore_unavailable"),
+        ),
+        "chlore_ideal",
+    ),
+    (
+        (
+            (PoolIssue.PH_LOW, "ph_too_low"),
+            (PoolIssue.PH_HIGH, "ph_too_high"),
+            (PoolIssue.PH_UNAVAILABLE, "ph_unavailable"),
+        ),
+        "ph_ideal",
+    ),
+    (
+        (
+            (PoolIssue.FILTRATION_INSUFFICIENT, "filtration_insufficient"),
+            (PoolIssue.FILTRATION_UNAVAILABLE, "filtration_unavailable"),
+        ),
+        "filtration_ideal",
+    ),
+    (
+        (
+            (PoolIssue.WATER_CORROSIVE, "water_corrosive"),
+            (PoolIssue.WATER_SCALING, "water_scaling"),
+        ),
+        "water_balanced",
+    ),
+)
+
+
+def pool_issues(
+    temperature: Optional[float],
+    chlore: Optional[float],
+    ph: Optional[float],
+    filtration_hours: Optional[float],
+    lsi: Optional[float],
+    chlore_minimum: float,
+    chlore_maximum: float,
+) -> PoolIssue:
+    """Problèmes constatés sur un relevé ; None signale une mesure indisponible."""
+    issues = PoolIssue.NONE
+    if temperature is None:
+        issues |= PoolIssue.TEMPERATURE_UNAVAILABLE
+    elif temperature < TEMPERATURE_MIN_COMFORT:
+        issues |= PoolIssue.TEMPERATURE_COLD
+    elif temperature > TEMPERATURE_MAX_COMFORT:
+        issues |= PoolIssue.TEMPERATURE_HOT
+    if chlore is None:
+        issues |= PoolIssue.CHLORE_UNAVAILABLE
+    elif chlore < chlore_minimum:
+        issues |= PoolIssue.CHLORE_LOW
+    elif chlore > chlore_maximum:
+        issues |= PoolIssue.CHLORE_HIGH
+    if ph is None:
+        issues |= PoolIssue.PH_UNAVAILABLE
+    elif ph < PH_MIN_IDEAL:
+        issues |= PoolIssue.PH_LOW
+    elif ph > PH_MAX_IDEAL:
+        issues |= PoolIssue.PH_HIGH
+    # La durée requise dépend de la température
+    if filtration_hours is None or temperature is None:
+        issues |= PoolIssue.FILTRATION_UNAVAILABLE
+    elif filtration_hours < temperature / 2:
+        issues |= PoolIssue.FILTRATION_INSUFFICIENT
+    # L'équilibre n'est évalué que sur un pH mesuré
+    if ph is None or lsi is None:
+        pass
+    elif lsi < LSI_MIN_BALANCED:
+        issues |= PoolIssue.WATER_CORROSIVE
+    elif lsi > LSI_MAX_BALANCED:
+        issues |= PoolIssue.WATER_SCALING
+    return issues
+
+
+def pool_status(issues: PoolIssue) -> PoolStatus:
+    """Code de l'état global : une alerte de qualité d'eau prime sur une mesure manquante."""
+    if issues & ALERT_ISSUES:
+        return PoolStatus.ALERT
+    if issues & UNAVAILABLE_ISSUES:
+        return PoolStatus.UNKNOWN
+    if issues:
+        return PoolStatus.WARNING
+    return PoolStatus.OK
+
+
+def issue_translation_keys(issues: PoolIssue) -> List[str]:
+    """Clés de traduction décrivant chaque aspect, pour le texte affiché."""
+    keys = []
+    for problems, ideal in ASPECT_TRANSLATIONS:
+        keys.append(next((key for issue, key in problems if issue in issues), ideal))
+    return keys
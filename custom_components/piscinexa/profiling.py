@@ -0,0 +1,259 @@
+"""Mesures de performance des capteurs Piscinexa.
+
+Le temps de calcul n'est mesuré qu'avec l'option profiling ; le décompte
+des écritures d'état et de leur volume enregistré est toujours actif, pour
+les diagnostics.
+"""
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_ATTRIBUTION, ATTR_RESTORED, ATTR_SUPPORTED_FEATURES
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event, async_track_state_report_event
+from homeassistant.helpers.json import json_bytes
+
+# Propriétés recalculées à chaque écriture d'état
+PROFILED_PROPERTIES = ("native_value", "extra_state_attributes")
+
+# Histogramme logarithmique : de 1 µs à 10 s, 10 seaux par décade (précision ~26 %)
+HISTOGRAM_MIN = 1e-6
+BUCKETS_PER_DECADE = 10
+HISTOGRAM_DECADES = 7
+HISTOGRAM_BUCKETS = HISTOGRAM_DECADES * BUCKETS_PER_DECADE + 1
+
+# Nombre d'entités détaillées dans les attributs du capteur de diagnostic
+TOP_ENTITIES = 10
+
+# Attributs que le recorder n'enregistre pour aucun domaine
+RECORDER_EXCLUDED_ATTRIBUTES = frozenset({ATTR_ATTRIBUTION, ATTR_RESTORED, ATTR_SUPPORTED_FEATURES})
+
+# Sous-classes instrumentées, créées une fois par classe de capteur
+_PROFILED_CLASSES: Dict[type, type] = {}
+
+
+class LatencyHistogram:
+    """Distribution des durées d'appel en mémoire constante.
+
+    Les durées sont rangées dans des seaux de largeur logarithmique : les
+    percentiles sont la borne haute du seau atteint, plafonnée par le maximum
+    observé.
+    """
+
+    __slots__ = ("counts", "count", "total", "max", "last")
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds <= HISTOGRAM_MIN:
+            bucket = 0
+        else:
+            bucket = min(
+                math.ceil(math.log10(seconds / HISTOGRAM_MIN) * BUCKETS_PER_DECADE), HISTOGRAM_BUCKETS - 1
+            )
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulated = 0
+        for bucket, count in enumerate(self.counts):
+            cumulated += count
+            if cumulated >= rank:
+                return min(HISTOGRAM_MIN * 10 ** (bucket / BUCKETS_PER_DECADE), self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "p50_ms": round(self.percentile(0.5) * 1000, 4),
+            "p95_ms": round(self.percentile(0.95) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+            "last_ms": round(self.last * 1000, 4),
+        }
+
+
+def _timed(prop: str, getter: Callable[[Any], Any]) -> property:
+    def timed(entity):
+        started = time.perf_counter()
+        try:
+            return getter(entity)
+        finally:
+            entity._profiler.record(entity.entity_id, prop, time.perf_counter() - started)
+
+    return property(timed)
+
+
+def _profiled_class(cls: type) -> type:
+    """Sous-classe de cls dont les propriétés calculées sont chronométrées."""
+    profiled = _PROFILED_CLASSES.get(cls)
+    if profiled is None:
+        namespace = {}
+        for prop in PROFILED_PROPERTIES:
+            owner = next(klass for klass in cls.__mro__ if prop in vars(klass))
+            # Seules les propriétés écrites pour Piscinexa sont mesurées, pas celles de Home Assistant
+            attribute = vars(owner)[prop]
+            if owner.__module__.startswith(__package__) and isinstance(attribute, property):
+                namespace[prop] = _timed(prop, attribute.fget)
+        profiled = type(cls)(cls.__name__, (cls,), namespace)
+        _PROFILED_CLASSES[cls] = profiled
+    return profiled
+
+
+class PiscinexaProfiler:
+    """Temps de calcul des capteurs d'une entrée, par entité et par propriété."""
+
+    def __init__(self, name: str, enabled: bool):
+        self._name = name
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[Optional[str], str], LatencyHistogram] = {}
+
+    @callback
+    def async_instrument(self, entity) -> None:
+        """Chronomètre les propriétés calculées d'un capteur, avant son ajout à Home Assistant."""
+        if not self.enabled:
+            return
+        entity._profiler = self
+        entity.__class__ = _profiled_class(type(entity))
+
+    def record(self, entity_id: Optional[str], prop: str, seconds: float) -> None:
+        histogram = self._histograms.get((entity_id, prop))
+        if histogram is None:
+            histogram = self._histograms[(entity_id, prop)] = LatencyHistogram()
+        histogram.add(seconds)
+
+    @property
+    def calls(self) -> int:
+        return sum(histogram.count for histogram in self._histograms.values())
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(histogram.total for histogram in self._histograms.values())
+
+    def by_entity(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Statistiques par entité, de la plus coûteuse à la moins coûteuse."""
+        entities: Dict[str, Dict[str, LatencyHistogram]] = {}
+        for (entity_id, prop), histogram in self._histograms.items():
+            entities.setdefault(entity_id or "", {})[prop] = histogram
+        ranked = sorted(
+            entities.items(), key=lambda item: sum(histogram.total for histogram in item[1].values()), reverse=True
+        )
+        return [
+            (entity_id, {prop: histogram.as_dict() for prop, histogram in props.items()})
+            for entity_id, props in ranked
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Histogrammes résumés, pour les diagnostics."""
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "entities": dict(self.by_entity()),
+        }
+
+
+def recorded_attributes(state: State) -> bytes:
+    """Attributs d'un état sérialisés comme par le recorder, sans les attributs non enregistrés."""
+    excluded = RECORDER_EXCLUDED_ATTRIBUTES
+    if state.state_info:
+        excluded = excluded | state.state_info["unrecorded_attributes"]
+    return json_bytes({key: value for key, value in state.attributes.items() if key not in excluded})
+
+
+class PiscinexaWriteCounter:
+    """Compte les écritures d'état des entités d'une entrée.
+
+    Une écriture identique à l'état courant n'est pas enregistrée par Home
+    Assistant (événement state_reported au lieu de state_changed) : elle est
+    comptée comme supprimée. Les deux suivis sont indexés par entité.
+
+    Le volume enregistré est estimé comme le fait le recorder : la valeur de
+    l'état à chaque écriture, et les attributs enregistrés seulement lorsqu'ils
+    changent, puisque des attributs identiques partagent la même ligne. Les
+    index et colonnes fixes de la base ne sont pas comptés.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._hass = hass
+        self._entry = entry
+        self._written: Dict[str, int] = {}
+        self._suppressed: Dict[str, int] = {}
+        self._state_bytes: Dict[str, int] = {}
+        self._attribute_bytes: Dict[str, int] = {}
+        self._last_attributes: Dict[str, bytes] = {}
+        self._unsubs: List[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Suit les entités enregistrées pour l'entrée, une fois ses plateformes chargées."""
+        entity_ids = [
+            entity.entity_id
+            for entity in er.async_entries_for_config_entry(er.async_get(self._hass), self._entry.entry_id)
+        ]
+        if not entity_ids:
+            return
+        self._unsubs.append(async_track_state_change_event(self._hass, entity_ids, self._async_written))
+        self._unsubs.append(async_track_state_report_event(self._hass, entity_ids, self._async_suppressed))
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+
+    @callback
+    def _async_written(self, event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        self._written[entity_id] = self._written.get(entity_id, 0) + 1
+        new_state = event.data["new_state"]
+        if new_state is None:
+            self._last_attributes.pop(entity_id, None)
+            return
+        self._state_bytes[entity_id] = self._state_bytes.get(entity_id, 0) + len(new_state.state.encode())
+        attributes = recorded_attributes(new_state)
+        if attributes != self._last_attributes.get(entity_id):
+            self._last_attributes[entity_id] = attributes
+            self._attribute_bytes[entity_id] = self._attribute_bytes.get(entity_id, 0) + len(attributes)
+
+    @callback
+    def _async_suppressed(self, event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        self._suppressed[entity_id] = self._suppressed.get(entity_id, 0) + 1
+
+    def recorded_bytes(self, entity_id: str) -> int:
+        return self._state_bytes.get(entity_id, 0) + self._attribute_bytes.get(entity_id, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Écritures enregistrées et supprimées et volume enregistré, au total et par entité."""
+        entities = sorted(
+            set(self._written) | set(self._suppressed), key=lambda entity_id: -self.recorded_bytes(entity_id)
+        )
+        return {
+            "written": sum(self._written.values()),
+            "suppressed": sum(self._suppressed.values()),
+            "recorded_bytes": sum(self._state_bytes.values()) + sum(self._attribute_bytes.values()),
+            "entities": {
+                entity_id: {
+                    "written": self._written.get(entity_id, 0),
+                    "suppressed": self._suppressed.get(entity_id, 0),
+                    "state_bytes": self._state_bytes.get(entity_id, 0),
+                    "attribute_bytes": self._attribute_bytes.get(entity_id, 0),
+                }
+                for entity_id in entities
+            },
+        }
@@ -0,0 +1,324 @@
+"""Pilotage de la pompe de filtration d'après le plan du jour ou le surplus solaire."""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_ON
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_PUMP_POWER,
+    CONF_PUMP_SWITCH,
+    CONF_SURPLUS_DEBOUNCE,
+    CONF_SURPLUS_MIN_CYCLE,
+    CONF_SURPLUS_SENSOR,
+    DEFAULT_PUMP_POWER,
+    DEFAULT_SURPLUS_DEBOUNCE,
+    DEFAULT_SURPLUS_MIN_CYCLE,
+    POWER_ACTIVE_THRESHOLD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Délai avant de renvoyer une commande restée sans effet
+COMMAND_RETRY_DELAY = timedelta(seconds=60)
+
+# Écart en deçà duquel le rappel programmé est conservé tel quel
+WAKE_UP_TOLERANCE = timedelta(seconds=1)
+
+
+class PiscinexaPumpController:
+    """Allume et éteint la pompe selon le plan de filtration.
+
+    Aucune vérification périodique : un seul rappel est programmé à la
+    prochaine transition du plan, et l'état réel est réconcilié dès qu'un
+    événement du switch ou du capteur de puissance arrive. La puissance
+    mesurée, lorsqu'elle est disponible, prime sur l'état du switch.
+
+    Avec un capteur de surplus (puissance injectée sur le réseau, en W), la
+    pompe tourne de préférence lorsque le surplus couvre sa puissance. Un
+    changement de surplus doit durer le délai d'anti-rebond avant d'être pris
+    en compte, et chaque marche ou arrêt dure au moins surplus_min_cycle. Les
+    heures encore dues sont garanties par une échéance : passé le dernier
+    instant permettant de les effectuer avant minuit, la pompe tourne sans
+    attendre le surplus.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, dispatcher, scheduler):
+        self._hass = hass
+        self._entry = entry
+        self._dispatcher = dispatcher
+        self._scheduler = scheduler
+        self._switch_id: Optional[str] = entry.options.get(CONF_PUMP_SWITCH) or None
+        self._surplus_id: Optional[str] = entry.options.get(CONF_SURPLUS_SENSOR) or None
+        self._pump_power = float(entry.options.get(CONF_PUMP_POWER, DEFAULT_PUMP_POWER))
+        self._debounce = float(entry.options.get(CONF_SURPLUS_DEBOUNCE, DEFAULT_SURPLUS_DEBOUNCE))
+        self._min_cycle = timedelta(
+            minutes=float(entry.options.get(CONF_SURPLUS_MIN_CYCLE, DEFAULT_SURPLUS_MIN_CYCLE))
+        )
+        self._unsubs = []
+        self._unsub_timer: Optional[CALLBACK_TYPE] = None
+        self._wake_up: Optional[datetime] = None
+        self._unsub_debounce: Optional[CALLBACK_TYPE] = None
+        self._next_transition: Optional[datetime] = None
+        self._last_command: Optional[str] = None
+        self._last_command_time: Optional[datetime] = None
+        self._commands_sent = 0
+        self._mismatches = 0
+        self._surplus = False
+        self._surplus_pending: Optional[bool] = None
+        self._running: Optional[bool] = None
+        self._state_since: Optional[datetime] = None
+        self._run_day: Optional[str] = None
+        self._run_seconds = 0.0
+        self._accounted_at: Optional[datetime] = None
+
+    @property
+    def _power_id(self) -> Optional[str]:
+        # Lu à chaque fois : la source peut changer par les options sans rechargement
+        return self._entry.data.get("power_sensor_entity_id") or None
+
+    @property
+    def enabled(self) -> bool:
+        return self._switch_id is not None
+
+    @property
+    def surplus_mode(self) -> bool:
+        return self.enabled and self._surplus_id is not None
+
+    @callback
+    def async_start(self) -> None:
+        """Commence à piloter la pompe si un switch est configuré."""
+        if not self.enabled:
+            return
+        self._unsubs.append(self._dispatcher.async_subscribe([self._switch_id], self._async_state_changed))
+        self._unsubs.append(
+            self._dispatcher.async_subscribe_source("power_sensor_entity_id", self._async_state_changed)
+        )
+        self._unsubs.append(self._scheduler.async_add_listener(self.async_reconcile))
+        if self._surplus_id:
+            self._unsubs.append(self._dispatcher.async_subscribe([self._surplus_id], self._async_surplus_changed))
+            self._surplus = bool(self._surplus_available())
+        self.async_reconcile()
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        self._cancel_timer()
+        self._cancel_debounce()
+
+    def _cancel_timer(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._wake_up = None
+
+    def _cancel_debounce(self) -> None:
+        if self._unsub_debounce is not None:
+            self._unsub_debounce()
+            self._unsub_debounce = None
+        self._surplus_pending = None
+
+    @callback
+    def _async_state_changed(self, event: Optional[Event]) -> None:
+        self.async_reconcile()
+
+    @callback
+    def _async_transition(self, now: datetime) -> None:
+        self._unsub_timer = None
+        self._wake_up = None
+        self.async_reconcile()
+
+    def _surplus_available(self) -> Optional[bool]:
+        """Surplus suffisant pour la pompe ; sa propre consommation est réintégrée lorsqu'elle tourne."""
+        state = self._hass.states.get(self._surplus_id)
+        if state is None:
+            return None
+        try:
+            exported = float(state.state)
+        except (ValueError, TypeError):
+            return None
+        if self.measured_state():
+            exported += self._pump_power
+        return exported >= self._pump_power
+
+    @callback
+    def _async_surplus_changed(self, event: Event) -> None:
+        available = self._surplus_available()
+        if available is None or available == self._surplus:
+            self._cancel_debounce()
+            return
+        if self._surplus_pending == available:
+            return
+        self._cancel_debounce()
+        self._surplus_pending = available
+        self._unsub_debounce = async_call_later(self._hass, self._debounce, self._async_surplus_confirmed)
+
+    @callback
+    def _async_surplus_confirmed(self, now: datetime) -> None:
+        self._unsub_debounce = None
+        if self._surplus_pending is None:
+            return
+        self._surplus = self._surplus_pending
+        self._surplus_pending = None
+        _LOGGER.debug(f"Surplus solaire {'disponible' if self._surplus else 'insuffisant'} pour {self._switch_id}")
+        self.async_reconcile()
+
+    def _account(self, now: datetime, running: Optional[bool]) -> None:
+        """Cumule le temps de marche mesuré de la journée."""
+        day = dt_util.as_local(now).date().isoformat()
+        if self._run_day != day:
+            self._run_day = day
+            self._run_seconds = 0.0
+            if self._running and self._accounted_at is not None:
+                self._accounted_at = max(self._accounted_at, dt_util.start_of_local_day(now))
+        if self._running and self._accounted_at is not None:
+            self._run_seconds += max((now - self._accounted_at).total_seconds(), 0.0)
+        if self._running is not None and running != self._running:
+            self._state_since = now
+        self._running = running
+        self._accounted_at = now
+
+    def _remaining_seconds(self) -> Optional[float]:
+        required = self._scheduler.required_hours
+        if required is None:
+            return None
+        return max(required * 3600 - self._run_seconds, 0.0)
+
+    def _deadline(self, now: datetime, remaining: float) -> datetime:
+        """Dernier instant de démarrage permettant d'effectuer les heures restantes avant minuit."""
+        return dt_util.start_of_local_day(now) + timedelta(days=1) - timedelta(seconds=remaining)
+
+    def _cycle_end(self) -> Optional[datetime]:
+        if self._state_since is None:
+            return None
+        return self._state_since + self._min_cycle
+
+    def desired_state(self, now: datetime) -> Optional[bool]:
+        """État voulu pour la pompe, ou None si aucun plan n'est disponible."""
+        if self.surplus_mode:
+            remaining = self._remaining_seconds()
+            if remaining is not None:
+                if remaining <= 0:
+                    return False
+                if now >= self._deadline(now, remaining):
+                    return True
+                cycle_end = self._cycle_end()
+                if self._running is not None and cycle_end is not None and now < cycle_end:
+                    return self._running
+                return self._surplus
+        if self._scheduler.plan is None:
+            return None
+        return self._scheduler.is_running_at(now)
+
+    def next_change(self, now: datetime) -> Optional[datetime]:
+        """Prochain instant où l'état voulu peut changer."""
+        if self.surplus_mode:
+            remaining = self._remaining_seconds()
+            if remaining is not None:
+                moments = [dt_util.start_of_local_day(now) + timedelta(days=1)]
+                if remaining > 0:
+                    if self._running:
+                        moments.append(now + timedelta(seconds=remaining))
+                    else:
+                        moments.append(self._deadline(now, remaining))
+                cycle_end = self._cycle_end()
+                if cycle_end is not None:
+                    moments.append(cycle_end)
+                moments = [moment for moment in moments if moment > now]
+                return min(moments) if moments else None
+        return self._scheduler.next_transition(now)
+
+    def measured_state(self) -> Optional[bool]:
+        """État réel de la pompe : puissance mesurée, à défaut état du switch."""
+        if self._power_id:
+            state = self._hass.states.get(self._power_id)
+            if state is not None:
+                try:
+                    return float(state.state) > POWER_ACTIVE_THRESHOLD
+                except (ValueError, TypeError):
+                    pass
+        state = self._hass.states.get(self._switch_id)
+        if state is None or state.state not in ("on", "off"):
+            return None
+        return state.state == STATE_ON
+
+    @callback
+    def async_reconcile(self) -> None:
+        """Aligne la pompe sur l'état voulu et programme la prochaine transition."""
+        if not self.enabled:
+            return
+        now = dt_util.now()
+        measured = self.measured_state()
+        self._account(now, measured)
+        desired = self.desired_state(now)
+        retry_at = None
+        if desired is not None and measured != desired:
+            retry_at = self._async_command(desired, now)
+        self._next_transition = self.next_change(now)
+        wake_up = min((moment for moment in (self._next_transition, retry_at) if moment), default=None)
+        # Les mesures de puissance arrivent en rafales : le rappel n'est reprogrammé que s'il a changé
+        if (
+            self._unsub_timer is not None
+            and wake_up is not None
+            and abs(wake_up - self._wake_up) < WAKE_UP_TOLERANCE
+        ):
+            return
+        self._cancel_timer()
+        if wake_up is not None:
+            self._wake_up = wake_up
+            self._unsub_timer = async_track_point_in_time(self._hass, self._async_transition, wake_up)
+
+    def _async_command(self, turn_on: bool, now: datetime) -> Optional[datetime]:
+        """Envoie la commande au switch ; retourne l'instant d'une nouvelle tentative si elle est différée."""
+        service = SERVICE_TURN_ON if turn_on else SERVICE_TURN_OFF
+        switch_state = self._hass.states.get(self._switch_id)
+        switch_matches = switch_state is not None and (switch_state.state == STATE_ON) == turn_on
+        if (
+            service == self._last_command
+            and self._last_command_time is not None
+            and now - self._last_command_time < COMMAND_RETRY_DELAY
+        ):
+            return self._last_command_time + COMMAND_RETRY_DELAY
+        if switch_matches:
+            # Le switch est déjà dans l'état voulu mais la puissance ne suit pas
+            self._mismatches += 1
+            _LOGGER.warning(
+                f"La pompe {self._switch_id} est {switch_state.state} mais la puissance mesurée "
+                f"ne correspond pas, nouvelle commande {service}"
+            )
+        self._last_command = service
+        self._last_command_time = now
+        self._commands_sent += 1
+        _LOGGER.debug(f"Commande {service} envoyée à {self._switch_id}")
+        self._hass.async_create_task(
+            self._hass.services.async_call(
+                "switch", service, {"entity_id": self._switch_id}, blocking=False
+            )
+        )
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """État du pilotage, pour les diagnostics."""
+        remaining = self._remaining_seconds()
+        return {
+            "enabled": self.enabled,
+            "switch": self._switch_id,
+            "power_sensor": self._power_id,
+            "surplus_sensor": self._surplus_id,
+            "surplus": self._surplus,
+            "surplus_pending": self._surplus_pending,
+            "run_hours_today": round(self._run_seconds / 3600, 2),
+            "remaining_hours": round(remaining / 3600, 2) if remaining is not None else None,
+            "next_transition": self._next_transition.isoformat() if self._next_transition else None,
+            "wake_up": self._wake_up.isoformat() if self._wake_up else None,
+            "last_command": self._last_command,
+            "last_command_time": self._last_command_time.isoformat() if self._last_command_time else None,
+            "commands_sent": self._commands_sent,
+            "mismatches": self._mismatches,
+        }
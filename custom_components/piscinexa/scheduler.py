@@ -0,0 +1,385 @@
+"""Planification journalière de la filtration selon le tarif de l'électricité."""
+import logging
+import math
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_TARIFF_SCHEDULE,
+    CONF_TARIFF_SENSOR,
+    CONF_FILTRATION_MIN_BLOCK,
+    CONF_FILTRATION_WINDOWS,
+    CONF_PUMP_POWER,
+    DEFAULT_TARIFF_SCHEDULE,
+    DEFAULT_FILTRATION_MIN_BLOCK,
+    DEFAULT_PUMP_POWER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Pénalité par démarrage, pour préférer à coût égal des blocs moins nombreux
+START_PENALTY = 1e-6
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = str(value).split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def time_of_day(value: Any) -> str:
+    """Valide une heure "HH:MM" de la journée ("24:00" désigne minuit en fin de plage)."""
+    try:
+        minutes = _minutes(value)
+        valid = 0 <= int(str(value).split(":")[1]) < 60 and 0 <= minutes <= 24 * 60
+    except (ValueError, IndexError):
+        valid = False
+    if not valid:
+        raise vol.Invalid(f"Heure invalide : {value!r} (format HH:MM attendu)")
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# Grille horaire de l'option tariff_schedule : [{start: "HH:MM", price}]
+TARIFF_SCHEDULE_SCHEMA = vol.Schema([
+    vol.Schema({vol.Required("start"): time_of_day, vol.Required("price"): vol.Coerce(float)})
+])
+# Plages obligatoires de l'option filtration_windows : [{start: "HH:MM", end: "HH:MM"}]
+FILTRATION_WINDOWS_SCHEMA = vol.Schema([
+    vol.Schema({vol.Required("start"): time_of_day, vol.Required("end"): time_of_day})
+])
+
+
+def schedule_prices(schedule: Sequence[Dict[str, Any]], slots: int = SLOTS_PER_DAY) -> List[float]:
+    """Prix de chaque créneau d'après une grille horaire [{start: "HH:MM", price}]."""
+    entries = sorted((_minutes(item["start"]), float(item["price"])) for item in schedule)
+    if not entries:
+        return [0.0] * slots
+    prices = []
+    for slot in range(slots):
+        minute = slot * (24 * 60 // slots)
+        price = entries[-1][1]
+        for start, value in entries:
+            if start <= minute:
+                price = value
+        prices.append(price)
+    return prices
+
+
+def window_slots(windows: Sequence[Dict[str, Any]], slots: int = SLOTS_PER_DAY) -> List[bool]:
+    """Créneaux imposés par les plages obligatoires [{start, end}], éventuellement à cheval sur minuit."""
+    slot_minutes = 24 * 60 // slots
+    forced = [False] * slots
+    for window in windows:
+        start, end = _minutes(window["start"]), _minutes(window["end"])
+        for slot in range(slots):
+            minute = slot * slot_minutes
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            forced[slot] = forced[slot] or inside
+    return forced
+
+
+def solve_schedule(
+    prices: Sequence[float],
+    required_slots: int,
+    min_block_slots: int,
+    locked: Sequence[Optional[bool]],
+) -> Dict[str, Any]:
+    """Choisit les créneaux de marche les moins chers par programmation dynamique.
+
+    L'état après chaque créneau est (créneaux en marche, plafonné au besoin ;
+    longueur du bloc en cours, plafonnée au bloc minimal). Un bloc ne peut
+    s'arrêter qu'après min_block_slots créneaux, sauf si le créneau suivant
+    est imposé à l'arrêt. Les créneaux verrouillés (passé, plages
+    obligatoires) gardent leur valeur. Sans solution, le bloc minimal est
+    relâché avant de faire tourner tous les créneaux libres.
+    """
+    slots = len(prices)
+    required = min(required_slots, slots)
+    block = max(min_block_slots, 1)
+    # cost[(on, run)] = coût minimal ; parents[slot][état] = (état précédent, en marche)
+    cost: Dict[tuple, float] = {(0, 0): 0.0}
+    parents: List[Dict[tuple, tuple]] = []
+    for slot in range(slots):
+        options = (locked[slot],) if locked[slot] is not None else (False, True)
+        price = prices[slot]
+        following: Dict[tuple, float] = {}
+        links: Dict[tuple, tuple] = {}
+        for state, state_cost in cost.items():
+            on, run = state
+            for running in options:
+                if running:
+                    new_state = (on + 1 if on < required else on, run + 1 if run < block else run)
+                    new_cost = state_cost + price + (START_PENALTY if run == 0 else 0)
+                else:
+                    if 0 < run < block and locked[slot] is None:
+                        continue
+                    new_state = (on, 0)
+                    new_cost = state_cost
+                if new_state not in following or new_cost < following[new_state]:
+                    following[new_state] = new_cost
+                    links[new_state] = (state, running)
+        cost = following
+        parents.append(links)
+
+    finals = [
+        (state_cost, state) for state, state_cost in cost.items()
+        if state[0] >= required and (state[1] == 0 or state[1] >= block)
+    ]
+    if finals:
+        total, state = min(finals)
+        chosen = []
+        for links in reversed(parents):
+            state, running = links[state]
+            chosen.append(running)
+        chosen.reverse()
+        return {"feasible": True, "slots": chosen, "price_sum": round(total, 6)}
+    if block > 1:
+        result = solve_schedule(prices, required_slots, 1, locked)
+        result["min_block_relaxed"] = True
+        return result
+    chosen = [locked[slot] if locked[slot] is not None else True for slot in range(slots)]
+    return {"feasible": False, "slots": chosen, "price_sum": sum(p for p, on in zip(prices, chosen) if on)}
+
+
+def slots_to_blocks(slots: Sequence[bool], day_start: datetime) -> List[Dict[str, datetime]]:
+    """Regroupe les créneaux consécutifs en blocs de marche datés."""
+    blocks = []
+    start = None
+    for index, running in enumerate(list(slots) + [False]):
+        if running and start is None:
+            start = index
+        elif not running and start is not None:
+            blocks.append({
+                "start": day_start + timedelta(minutes=start * SLOT_MINUTES),
+                "end": day_start + timedelta(minutes=index * SLOT_MINUTES),
+            })
+            start = None
+    return blocks
+
+
+class PiscinexaFiltrationScheduler:
+    """Maintient le plan de filtration du jour d'une piscine.
+
+    Le plan est recalculé dans l'exécuteur lorsque la durée recommandée ou
+    le tarif change, puis à minuit. Les créneaux déjà écoulés restent figés
+    à leur valeur précédente. Une durée prévue la veille pour la journée
+    (prévision météo) est retenue dès minuit si elle est plus longue.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, dispatcher):
+        self._hass = hass
+        self._entry = entry
+        self._dispatcher = dispatcher
+        self._required_hours: Optional[float] = None
+        self._forecast_hours: Dict[str, float] = {}
+        self._listeners: List[Callable[[], None]] = []
+        self._unsubs: List[CALLBACK_TYPE] = []
+        self._solving = False
+        self._pending = False
+        self._solve_requests = 0
+        self._coalesced = 0
+        self._solve_errors = 0
+        self.plan: Optional[Dict[str, Any]] = None
+
+    @property
+    def _options(self) -> Dict[str, Any]:
+        return self._entry.options
+
+    @property
+    def required_hours(self) -> Optional[float]:
+        """Durée de filtration de la journée : la recommandation, ou la prévision si elle est plus longue."""
+        forecast = self._forecast_hours.get(dt_util.now().date().isoformat())
+        if forecast is None:
+            return self._required_hours
+        return max(self._required_hours or 0.0, forecast)
+
+    @callback
+    def async_start(self) -> None:
+        """Suit le capteur de tarif et replanifie chaque jour à minuit."""
+        self._unsubs.append(self._dispatcher.async_subscribe_source(CONF_TARIFF_SENSOR, self._async_tariff_changed))
+        self._unsubs.append(
+            async_track_time_change(self._hass, self._async_new_day, hour=0, minute=0, second=0)
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        self._listeners.clear()
+
+    @callback
+    def async_set_required_hours(self, hours: Optional[float]) -> None:
+        """Met à jour la durée de filtration recommandée ; replanifie si elle a changé."""
+        if hours is None or hours == self._required_hours:
+            return
+        self._required_hours = hours
+        self.async_request_solve()
+
+    @callback
+    def async_set_forecast_hours(self, day: date, hours: float) -> None:
+        """Enregistre la durée de filtration prévue pour une date, prise en compte dès minuit."""
+        key = day.isoformat()
+        if self._forecast_hours.get(key) == hours:
+            return
+        today = dt_util.now().date().isoformat()
+        self._forecast_hours = {
+            stored: value for stored, value in self._forecast_hours.items() if stored >= today
+        }
+        self._forecast_hours[key] = hours
+        if key == today:
+            self.async_request_solve()
+
+    @callback
+    def _async_tariff_changed(self, event: Optional[Event]) -> None:
+        self.async_request_solve()
+
+    @callback
+    def _async_new_day(self, now: datetime) -> None:
+        self.async_request_solve()
+
+    @callback
+    def async_request_solve(self) -> None:
+        """Demande un recalcul ; les demandes arrivant pendant un calcul sont regroupées."""
+        if self.required_hours is None:
+            return
+        self._solve_requests += 1
+        if self._solving:
+            if self._pending:
+                self._coalesced += 1
+            self._pending = True
+            return
+        self._solving = True
+        self._hass.async_create_task(self._async_solve())
+
+    def _slot_prices(self) -> List[float]:
+        prices = schedule_prices(self._options.get(CONF_TARIFF_SCHEDULE) or DEFAULT_TARIFF_SCHEDULE)
+        tariff_sensor = self._options.get(CONF_TARIFF_SENSOR)
+        state = self._hass.states.get(tariff_sensor) if tariff_sensor else None
+        if state is None:
+            return prices
+        today = state.attributes.get("today")
+        if isinstance(today, (list, tuple)) and today:
+            for slot in range(SLOTS_PER_DAY):
+                # Un prix manquant (None) garde celui de la grille horaire
+                try:
+                    prices[slot] = float(today[slot * len(today) // SLOTS_PER_DAY])
+                except (ValueError, TypeError):
+                    pass
+            return prices
+        try:
+            prices[self._current_slot()] = float(state.state)
+        except (ValueError, TypeError):
+            pass
+        return prices
+
+    def _current_slot(self) -> int:
+        now = dt_util.now()
+        start = dt_util.start_of_local_day(now)
+        return min(int((now - start).total_seconds() // (SLOT_MINUTES * 60)), SLOTS_PER_DAY - 1)
+
+    async def _async_solve(self) -> None:
+        try:
+            while True:
+                self._pending = False
+                day_start = dt_util.start_of_local_day()
+                current = self._current_slot()
+                previous = self.plan["slots"] if self.plan and self.plan["day"] == day_start.date().isoformat() else None
+                forced = window_slots(self._options.get(CONF_FILTRATION_WINDOWS) or [])
+                locked = [
+                    (previous[slot] if previous else False) if slot < current else (True if forced[slot] else None)
+                    for slot in range(SLOTS_PER_DAY)
+                ]
+                prices = self._slot_prices()
+                required_hours = self.required_hours
+                required_slots = math.ceil(required_hours * 60 / SLOT_MINUTES)
+                min_block = math.ceil(
+                    float(self._options.get(CONF_FILTRATION_MIN_BLOCK, DEFAULT_FILTRATION_MIN_BLOCK)) * 60 / SLOT_MINUTES
+                )
+                started = time.perf_counter()
+                result = await self._hass.async_add_executor_job(
+                    solve_schedule, prices, required_slots, min_block, locked
+                )
+                elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+                power_kw = float(self._options.get(CONF_PUMP_POWER, DEFAULT_PUMP_POWER)) / 1000
+                slot_hours = SLOT_MINUTES / 60
+                self.plan = {
+                    "day": day_start.date().isoformat(),
+                    "slots": result["slots"],
+                    "prices": prices,
+                    "blocks": slots_to_blocks(result["slots"], day_start),
+                    "feasible": result["feasible"],
+                    "min_block_relaxed": result.get("min_block_relaxed", False),
+                    "required_hours": required_hours,
+                    "planned_hours": sum(result["slots"]) * slot_hours,
+                    "cost": round(
+                        sum(price for price, on in zip(prices, result["slots"]) if on) * power_kw * slot_hours, 2
+                    ),
+                    "solve_ms": elapsed_ms,
+                }
+                _LOGGER.debug(
+                    f"Plan de filtration pour {self._entry.data['name']} : "
+                    f"{self.plan['planned_hours']} h, {self.plan['cost']} en {elapsed_ms} ms"
+                )
+                for listener in list(self._listeners):
+                    listener()
+                if not self._pending:
+                    break
+        except Exception:
+            # Options ou tarif inexploitables : le dernier plan valide reste en vigueur
+            self._solve_errors += 1
+            _LOGGER.exception(
+                f"Échec du calcul du plan de filtration pour {self._entry.data['name']}, dernier plan conservé"
+            )
+        finally:
+            self._solving = False
+
+    def is_running_at(self, when: datetime) -> bool:
+        """Indique si la pompe doit tourner à l'instant donné d'après le plan."""
+        if not self.plan:
+            return False
+        return any(block["start"] <= when < block["end"] for block in self.plan["blocks"])
+
+    def next_transition(self, after: datetime) -> Optional[datetime]:
+        """Prochain démarrage ou arrêt prévu après l'instant donné."""
+        if not self.plan:
+            return None
+        moments = [
+            moment for block in self.plan["blocks"] for moment in (block["start"], block["end"])
+            if moment > after
+        ]
+        return min(moments) if moments else None
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Appelle listener à chaque nouveau plan."""
+        self._listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def as_dict(self) -> Dict[str, Any]:
+        """File des recalculs et dernier plan, pour les diagnostics."""
+        return {
+            "required_hours": self.required_hours,
+            "solving": self._solving,
+            "pending": self._pending,
+            "solve_requests": self._solve_requests,
+            "coalesced_requests": self._coalesced,
+            "solve_errors": self._solve_errors,
+            "last_solve_ms": self.plan["solve_ms"] if self.plan else None,
+            "plan_day": self.plan["day"] if self.plan else None,
+        }
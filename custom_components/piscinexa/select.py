@@ -0,0 +1,86 @@
+import logging
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import slugify
+from .const import (
+    DOMAIN,
+    VERSION,
+    PH_TREATMENT_OPTIONS,
+    CHLORE_TREATMENT_OPTIONS,
+    TREATMENT_FORM_FROM_CONFIG,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# (clé, libellé, options, option par défaut)
+SELECT_DESCRIPTIONS = [
+    ("ph_plus_treatment", "Traitement pH+", PH_TREATMENT_OPTIONS, "Liquide"),
+    ("ph_minus_treatment", "Traitement pH-", PH_TREATMENT_OPTIONS, "Liquide"),
+    ("chlore_treatment", "Traitement Chlore", CHLORE_TREATMENT_OPTIONS, "Chlore choc (poudre)"),
+]
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Configurez les sélecteurs de traitement pour Piscinexa."""
+    name = entry.data["name"]
+    async_add_entities(
+        PiscinexaTreatmentSelect(hass, entry, name, *description)
+        for description in SELECT_DESCRIPTIONS
+    )
+
+class PiscinexaTreatmentSelect(SelectEntity, RestoreEntity):
+    """Forme de traitement choisie pour une piscine, restaurée au redémarrage."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        name: str,
+        key: str,
+        label: str,
+        options: list,
+        default: str,
+    ):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._key = key
+        self.entity_id = f"select.{slugify(name)}_{key}"
+        self._attr_friendly_name = f"{name.capitalize()} {label}"
+        self._attr_unique_id = f"{entry.entry_id}_select_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:bottle-tonic-outline"
+        self._attr_options = list(options)
+        self._attr_should_poll = False
+        configured = TREATMENT_FORM_FROM_CONFIG.get(entry.data.get(key), entry.data.get(key))
+        self._attr_current_option = configured if configured in self._attr_options else default
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    async def async_added_to_hass(self):
+        """Restaure la dernière forme choisie après un redémarrage."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state in self._attr_options:
+            self._attr_current_option = last_state.state
+            _LOGGER.debug(f"Option restaurée pour {self.entity_id}: {self._attr_current_option}")
+
+    async def async_select_option(self, option: str) -> None:
+        """Change la forme de traitement."""
+        self._attr_current_option = option
+        self.async_write_ha_state()
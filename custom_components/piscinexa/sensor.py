@@ -1,25 +1,59 @@
 import logging
 from datetime import datetime, timedelta
 from collections import deque
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.const import CONF_NAME
-from homeassistant.helpers.event import async_track_state_change_event
-from homeassistant.util import dt as dt_util
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.const import CONF_NAME, EntityCategory, UnitOfPower, UnitOfTemperature
+from homeassistant.util import dt as dt_util, slugify
 from .const import (
     DOMAIN,
     POOL_TYPE_SQUARE,
     POOL_TYPE_ROUND,
-    PI,
     UNIT_CUBIC_METERS,
     UNIT_HOURS,
     UNIT_LITERS,
     UNIT_GRAMS,
     UNIT_MG_PER_LITER,
     VERSION,
+    PH_MIN_IDEAL,
+    PH_MAX_IDEAL,
+    POWER_ACTIVE_THRESHOLD,
+    UNIT_DAYS,
+    CONF_WEATHER_ENTITY,
+    CONF_HEAT_PUMP_POWER,
+    CONF_HEAT_PUMP_COP,
+    DEFAULT_HEAT_PUMP_COP,
+    CONF_SIMULATOR,
+)
+from .chlorine_targets import TARGET_ATTRIBUTES, chlorine_targets
+from .dosage import ph_dose, chlore_dose
+from .heat_pump import DEFAULT_AIR_TEMPERATURE, HeatLossEstimator, cheapest_window, heating_estimate
+from .helpers import entry_entity_id, number_value, pool_dimensions
+from .inventory import PRODUCT_UNITS, SHARED_SCOPE
+from .planner import PRODUCT_PH_PLUS, PRODUCT_PH_MINUS, PRODUCT_CHLORE
+from .profiling import TOP_ENTITIES
+from .planner import async_plan_treatment, build_snapshot, plan_summary, product_prices
+from .pool_status import PoolStatus, issue_translation_keys, pool_issues, pool_status
+from .scheduler import SLOT_MINUTES
+from .simulator import STREAM_POWER, STREAM_PROBES
+from .discovery import KIND_TEMPERATURE
+from .validation import probe_value
+from .water_balance import evaluate_water_balance
+from .fleet import (
+    METRIC_PH_OUT_OF_RANGE,
+    METRIC_CHLORE_OUT_OF_RANGE,
+    METRIC_PH_PLUS,
+    METRIC_PH_MINUS,
+    METRIC_CHLORE,
+    METRIC_FILTRATION_HOURS,
+    METRIC_ENERGY_KWH,
+    unit_metric,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,56 +69,44 @@ def get_translation(hass: HomeAssistant, key: str, placeholders: dict = None, de
         _LOGGER.warning("Erreur lors de la récupération de la traduction pour la clé %s: %s", key, e)
         return default or key
 
+def measurement_entity_id(hass: HomeAssistant, entry: ConfigEntry, key: str, fallback: str) -> str:
+    """entity_id d'un capteur de mesure de la piscine, retrouvé par son unique_id.
+
+    Les entity_id dérivent des noms affichés ; fallback sert de repli tant que
+    le capteur n'est pas encore dans le registre.
+    """
+    return er.async_get(hass).async_get_entity_id("sensor", DOMAIN, f"{entry.entry_id}_{key}") or fallback
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Configurez les capteurs pour Piscinexa."""
-    data = entry.data.copy()
-    # Log pour afficher toutes les données de configuration
-    _LOGGER.debug(f"Données de configuration complètes dans entry.data: {data}")
-    
-    if "temperature" not in data or not isinstance(data["temperature"], (int, float)):
-        _LOGGER.info("Température non définie ou invalide, utilisation de la valeur par défaut: 20.0°C")
-        data["temperature"] = 20.0
-        hass.config_entries.async_update_entry(entry, data=data)
-
-    # Vérification des données de configuration
-    required_keys = ["pool_type", "depth"]
-    if data.get("pool_type") == POOL_TYPE_SQUARE:
-        required_keys.extend(["length", "width"])
-    else:
-        required_keys.append("diameter")
-
-    for key in required_keys:
-        if key not in data or data[key] is None:
-            _LOGGER.warning(f"Clé manquante ou None dans la configuration: {key}. Utilisation de la valeur par défaut.")
-            if key == "pool_type":
-                data["pool_type"] = POOL_TYPE_SQUARE
-            elif key == "depth":
-                data["depth"] = 1.5
-            elif key == "length":
-                data["length"] = 5.0
-            elif key == "width":
-                data["width"] = 4.0
-            elif key == "diameter":
-                data["diameter"] = 4.0
-            hass.config_entries.async_update_entry(entry, data=data)
-
-    # Log après correction des valeurs par défaut
-    _LOGGER.debug(f"Données de configuration après correction: {data}")
+    if entry.data.get(CONF_SIMULATOR):
+        simulator = hass.data[DOMAIN][entry.entry_id]["simulator"]
+        async_add_entities(
+            PiscinexaSimulatorSensor(hass, entry, simulator, *description)
+            for description in SIMULATOR_SENSOR_DESCRIPTIONS
+        )
+        return
+
+    # entry.data est normalisé par async_migrate_entry et le flux de configuration
+    _LOGGER.debug(f"Données de configuration complètes dans entry.data: {entry.data}")
 
     name = entry.data["name"]
+    profiler = hass.data[DOMAIN][entry.entry_id]["profiler"]
     
     # Initialiser d'abord le capteur de volume, car les autres en dépendent
     volume_sensor = PiscinexaVolumeSensor(hass, entry, name)
+    profiler.async_instrument(volume_sensor)
     async_add_entities([volume_sensor], True)
 
     # Puis initialiser les autres capteurs
     sensors = [
         PiscinexaTempsFiltrationRecommandeSensor(hass, entry, name),
         PiscinexaTempsFiltrationEffectueSensor(hass, entry, name),
+        PiscinexaFiltrationPlanSensor(hass, entry, name),
         PiscinexaTemperatureSensor(hass, entry, name),
         PiscinexaPhSensor(hass, entry, name),
         PiscinexaPhPlusAjouterSensor(hass, entry, name),
@@ -96,20 +118,54 @@ async def async_setup_entry(
         PiscinexaChloreDifferenceSensor(hass, entry, name),
         PiscinexaPowerSensor(hass, entry, name),
         PiscinexaPoolStateSensor(hass, entry, name),
+        PiscinexaLsiSensor(hass, entry, name),
         PiscinexaPhDifferenceSensor(hass, entry, name),
         PiscinexaPhTreatmentSensor(hass, entry, name),
         PiscinexaChloreTreatmentSensor(hass, entry, name),
+        PiscinexaTreatmentPlanSensor(hass, entry, name),
         PiscinexaChloreStateSensor(hass, entry, name),
         PiscinexaPhStateSensor(hass, entry, name),
         PiscinexaTemperatureStateSensor(hass, entry, name),
         PiscinexaPoolTypeSensor(hass, entry, name),
     ]
+    sensors.extend(
+        PiscinexaStockSensor(hass, product, STOCK_LABELS[product], entry=entry, pool=name)
+        for product in STOCK_LABELS
+    )
+    if hass.data[DOMAIN][entry.entry_id]["temperature_model"].enabled:
+        sensors.append(PiscinexaWaterTemperatureForecastSensor(hass, entry, name))
+    if float(entry.options.get(CONF_HEAT_PUMP_POWER) or 0) > 0:
+        sensors.append(PiscinexaHeatingSensor(hass, entry, name))
+    for sensor in sensors:
+        profiler.async_instrument(sensor)
+    if profiler.enabled:
+        sensors.append(PiscinexaProfilingSensor(hass, entry, name))
     async_add_entities(sensors, True)
 
+    # Les capteurs de flotte n'existent qu'une fois, portés par la première entrée chargée.
+    # Chaque entrée garde de quoi les reprendre, sans rechargement, si celle-ci est déchargée.
+    @callback
+    def _async_add_fleet_sensors() -> bool:
+        fleet = hass.data[DOMAIN]["fleet"]
+        if not fleet.async_claim(entry.entry_id):
+            return False
+        fleet_sensors = (
+            [PiscinexaFleetSensor(hass, fleet, *description) for description in FLEET_SENSOR_DESCRIPTIONS]
+            + [PiscinexaStockSensor(hass, product, label) for product, label in STOCK_LABELS.items()]
+        )
+        for sensor in fleet_sensors:
+            profiler.async_instrument(sensor)
+        async_add_entities(fleet_sensors)
+        return True
+
+    hass.data[DOMAIN][entry.entry_id]["add_fleet_sensors"] = _async_add_fleet_sensors
+    _async_add_fleet_sensors()
+
 class PiscinexaVolumeSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_volume_eau"
         self._attr_friendly_name = f"{name.capitalize()} Volume d'eau"
@@ -132,52 +188,10 @@ class PiscinexaVolumeSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            pool_type = self._entry.data.get("pool_type")
-            if pool_type not in (POOL_TYPE_SQUARE, POOL_TYPE_ROUND):
-                _LOGGER.error(
-                    get_translation(
-                        self._hass,
-                        "volume_calculation_error",
-                        {"name": self._name, "error": f"Type de piscine invalide: {pool_type}"}
-                    )
-                )
-                return 30.0
-
-            _LOGGER.debug(
-                f"Données de configuration pour {self._name}: "
-                f"pool_type={pool_type}, "
-                f"depth={self._entry.data.get('depth')}, "
-                f"length={self._entry.data.get('length')}, "
-                f"width={self._entry.data.get('width')}, "
-                f"diameter={self._entry.data.get('diameter')}"
-            )
-
-            def safe_float(value, key, default):
-                try:
-                    return float(value)
-                except (ValueError, TypeError, KeyError) as e:
-                    _LOGGER.warning(
-                        get_translation(
-                            self._hass,
-                            "invalid_dimension",
-                            {"key": key, "value": value, "error": str(e)}
-                        )
-                    )
-                    return default
-
-            depth = safe_float(self._entry.data.get("depth"), "depth", 1.5)
-            
-            if pool_type == POOL_TYPE_SQUARE:
-                length = safe_float(self._entry.data.get("length"), "length", 5.0)
-                width = safe_float(self._entry.data.get("width"), "width", 4.0)
-                volume = length * width * depth
-            else:
-                diameter = safe_float(self._entry.data.get("diameter"), "diameter", 4.0)
-                radius = diameter / 2
-                volume = PI * radius * radius * depth
-
+            volume = self._config.volume
             _LOGGER.debug(f"Volume calculé pour {self._name}: {volume} m³")
             new_value = round(volume, 2)
+            self._hass.data[DOMAIN][self._entry.entry_id]["volume"] = new_value
 
             # Log si l'état a changé
             if self._last_state != new_value:
@@ -206,6 +220,7 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_tempsfiltration_recommande"
         self._attr_friendly_name = f"{name.capitalize()} Temps de filtration recommandé"
@@ -219,15 +234,18 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
         )
         self._attr_icon = "mdi:clock"
         self._attr_native_unit_of_measurement = UNIT_HOURS
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._scheduler = hass.data[DOMAIN][entry.entry_id]["scheduler"]
         self._subscriptions = []
         self._last_state = None
-        sensor_id = self._entry.data.get("temperature_sensor")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_sensor
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "temperature_sensor", self._async_update_from_sensor
             )
+        )
+
+    async def async_added_to_hass(self):
+        self._scheduler.async_set_required_hours(self._compute_hours())
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -236,6 +254,8 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
 
     @callback
     def _async_update_from_sensor(self, event):
+        # Le planificateur reçoit la durée depuis le relevé, pas depuis la lecture de l'état
+        self._scheduler.async_set_required_hours(self._compute_hours())
         self.async_schedule_update_ha_state(True)
 
     @property
@@ -244,6 +264,9 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
 
     @property
     def native_value(self):
+        return self._compute_hours()
+
+    def _compute_hours(self):
         sensor_id = self._entry.data.get("temperature_sensor")
         if sensor_id:
             state = self._hass.states.get(sensor_id)
@@ -281,7 +304,7 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
                 )
                 return None
         try:
-            temperature = float(self._entry.data.get("temperature", 20.0))
+            temperature = self._config.temperature
             new_value = round(temperature / 2, 1)
             # Log si l'état a changé
             if self._last_state != new_value:
@@ -306,6 +329,9 @@ class PiscinexaTempsFiltrationRecommandeSensor(SensorEntity):
             return None
 
 class PiscinexaTempsFiltrationEffectueSensor(SensorEntity):
+    # Horodatage interne, modifié à chaque mesure de puissance
+    _unrecorded_attributes = frozenset({"last_active_time", "power_sensor"})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
@@ -323,36 +349,52 @@ class PiscinexaTempsFiltrationEffectueSensor(SensorEntity):
         self._attr_icon = "mdi:clock-check"
         self._attr_native_unit_of_measurement = UNIT_HOURS
         self._attr_state_class = "total_increasing"
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._filtration_time = 0.0
+        # Part du jour en cours, remise à zéro à minuit pour l'agrégat de flotte
+        self._filtration_today = 0.0
+        self._energy_kwh = 0.0
         self._last_active_time = None
         self._last_state = None
-        sensor_id = self._entry.data.get("power_sensor_entity_id")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_power_sensor
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "power_sensor_entity_id", self._async_update_from_power_sensor
             )
+        )
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(
+            async_track_time_change(self._hass, self._async_new_day, hour=0, minute=0, second=0)
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
             subscription()
         self._subscriptions.clear()
 
+    @callback
+    def _async_new_day(self, now):
+        self._filtration_today = 0.0
+        self._fleet.async_update(self._entry.entry_id, METRIC_FILTRATION_HOURS, 0.0)
+        self.async_write_ha_state()
+
     @callback
     def _async_update_from_power_sensor(self, event):
         sensor_id = self._entry.data.get("power_sensor_entity_id")
-        state = self._hass.states.get(sensor_id)
+        state = self._hass.states.get(sensor_id) if sensor_id else None
         current_time = datetime.now()
 
         if state and state.state not in ("unknown", "unavailable"):
             try:
                 power = float(state.state)
-                if power > 10:
+                if power > POWER_ACTIVE_THRESHOLD:
                     if self._last_active_time is not None:
                         time_diff = (current_time - self._last_active_time).total_seconds() / 3600
                         self._filtration_time += time_diff
+                        self._filtration_today += time_diff
+                        self._energy_kwh += power * time_diff / 1000
                     self._last_active_time = current_time
                 else:
                     self._last_active_time = None
@@ -367,6 +409,8 @@ class PiscinexaTempsFiltrationEffectueSensor(SensorEntity):
         else:
             self._last_active_time = None
 
+        self._fleet.async_update(self._entry.entry_id, METRIC_FILTRATION_HOURS, self._filtration_today)
+        self._fleet.async_update(self._entry.entry_id, METRIC_ENERGY_KWH, self._energy_kwh)
         self.async_schedule_update_ha_state(True)
 
     @property
@@ -407,6 +451,8 @@ class PiscinexaTempsFiltrationEffectueSensor(SensorEntity):
                 self._last_active_time.isoformat() if self._last_active_time else None
             )
             attributes["power_sensor"] = self._entry.data.get("power_sensor_entity_id", "N/A")
+            attributes["filtration_today"] = round(self._filtration_today, 2)
+            attributes["energy_kwh"] = round(self._energy_kwh, 3)
         except Exception as e:
             _LOGGER.error(
                 get_translation(
@@ -417,10 +463,115 @@ class PiscinexaTempsFiltrationEffectueSensor(SensorEntity):
             )
         return attributes
 
+class PiscinexaFiltrationPlanSensor(SensorEntity):
+    """Coût estimé du plan de filtration du jour, avec ses blocs de marche en attributs."""
+
+    _unrecorded_attributes = frozenset({"pump_controlled", "surplus_mode", "solve_ms"})
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_plan_filtration"
+        self._attr_friendly_name = f"{name.capitalize()} Plan de filtration"
+        self._attr_unique_id = f"{entry.entry_id}_plan_filtration"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:calendar-clock"
+        self._attr_native_unit_of_measurement = hass.config.currency
+        self._attr_should_poll = False
+        self._scheduler = hass.data[DOMAIN][entry.entry_id]["scheduler"]
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._scheduler.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        plan = self._scheduler.plan
+        return plan["cost"] if plan else None
+
+    @property
+    def extra_state_attributes(self):
+        plan = self._scheduler.plan
+        if not plan:
+            return {}
+        now = dt_util.now()
+        next_transition = self._scheduler.next_transition(now)
+        return {
+            "day": plan["day"],
+            "blocks": [
+                f"{block['start'].strftime('%H:%M')}-{block['end'].strftime('%H:%M')}" for block in plan["blocks"]
+            ],
+            "planned_hours": plan["planned_hours"],
+            "required_hours": plan["required_hours"],
+            "feasible": plan["feasible"],
+            "min_block_relaxed": plan["min_block_relaxed"],
+            "running_now": self._scheduler.is_running_at(now),
+            "next_transition": next_transition.isoformat() if next_transition else None,
+            "pump_controlled": self._hass.data[DOMAIN][self._entry.entry_id]["pump_controller"].enabled,
+            "surplus_mode": self._hass.data[DOMAIN][self._entry.entry_id]["pump_controller"].surplus_mode,
+            "solve_ms": plan["solve_ms"],
+        }
+
+class PiscinexaWaterTemperatureForecastSensor(SensorEntity):
+    """Température de l'eau prévue pour demain, avec la durée de filtration correspondante."""
+
+    _unrecorded_attributes = frozenset({"coefficients", "samples"})
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_temperature_prevue"
+        self._attr_friendly_name = f"{name.capitalize()} Température de l'eau prévue"
+        self._attr_unique_id = f"{entry.entry_id}_temperature_prevue"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:thermometer-auto"
+        self._attr_native_unit_of_measurement = "°C"
+        self._attr_should_poll = False
+        self._model = hass.data[DOMAIN][entry.entry_id]["temperature_model"]
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._model.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        prediction = self._model.prediction
+        return prediction["water_temperature"] if prediction else None
+
+    @property
+    def extra_state_attributes(self):
+        attributes = dict(self._model.prediction or {})
+        attributes.pop("water_temperature", None)
+        model = self._model.as_dict()
+        attributes["coefficients"] = model["coefficients"]
+        attributes["samples"] = model["samples"]
+        return attributes
+
 class PiscinexaTemperatureSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_temperature"
         self._attr_friendly_name = f"{name.capitalize()} Température"
@@ -434,15 +585,14 @@ class PiscinexaTemperatureSensor(SensorEntity):
         )
         self._attr_icon = "mdi:thermometer"
         self._attr_native_unit_of_measurement = "°C"
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
-        sensor_id = self._entry.data.get("temperature_sensor")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_sensor
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "temperature_sensor", self._async_update_from_sensor
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -534,7 +684,7 @@ class PiscinexaTemperatureSensor(SensorEntity):
                         return None
                 return None
         try:
-            temperature = float(self._entry.data.get("temperature", 20.0))
+            temperature = self._config.temperature
             _LOGGER.debug(f"Utilisation de la température par défaut/manuelle: {temperature}")
             self._hass.data[DOMAIN][self._entry.entry_id]["temperature"] = temperature
             new_value = round(temperature, 1)
@@ -565,6 +715,7 @@ class PiscinexaTemperatureSensor(SensorEntity):
 class PiscinexaPhSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._hass = hass
         self._attr_name = f"{name}_ph"
@@ -579,50 +730,60 @@ class PiscinexaPhSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._last_state = None
-        sensor_id = self._entry.data.get("ph_sensor")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_sensor
-                )
-            )
-        input_id = f"input_number.{name}_ph_current"
-        if hass.states.get(input_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [input_id], self._async_update_from_input
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "ph_sensor", self._async_update_from_sensor
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_number_missing",
-                    {"entity_id": input_id}
-                )
+        )
+        self._input_id = entry_entity_id(hass, entry, "number", "ph_current")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_id], self._async_update_from_input
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
             subscription()
         self._subscriptions.clear()
 
+    async def async_added_to_hass(self):
+        self._async_update_fleet()
+
     @callback
     def _async_update_from_sensor(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_input(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
+    @callback
+    def _async_update_fleet(self):
+        """Reporte dans la flotte si le pH sort de la plage idéale ; le getter reste sans effet."""
+        value = self._read_value()
+        if value is not None:
+            self._fleet.async_update(
+                self._entry.entry_id,
+                METRIC_PH_OUT_OF_RANGE,
+                0 if PH_MIN_IDEAL <= value <= PH_MAX_IDEAL else 1,
+            )
+
     @property
     def name(self):
         return self._attr_friendly_name
 
     @property
     def native_value(self):
+        return self._read_value()
+
+    def _read_value(self):
         sensor_id = self._entry.data.get("ph_sensor")
         if sensor_id:
             state = self._hass.states.get(sensor_id)
@@ -635,23 +796,12 @@ class PiscinexaPhSensor(SensorEntity):
                             {"sensor_id": sensor_id}
                         )
                     )
+                    # Plus de relevé en cours : l'équilibre de l'eau ne s'évalue pas sur un pH périmé
+                    self._hass.data[DOMAIN][self._entry.entry_id].pop("ph_current", None)
                     return None
                 try:
                     value = round(float(state.state), 1)
                     self._hass.data[DOMAIN][self._entry.entry_id]["ph_current"] = value
-                    input_id = f"input_number.{self._name}_ph_current"
-                    if self._hass.states.get(input_id):
-                        self._hass.states.async_set(
-                            input_id,
-                            value,
-                            {
-                                "friendly_name": f"{self._name.capitalize()} pH Actuel",
-                                "min": 0,
-                                "max": 14,
-                                "step": 0.1,
-                                "unit_of_measurement": None,
-                            },
-                        )
                     # Log si l'état a changé
                     if self._last_state != value:
                         _LOGGER.info(
@@ -672,8 +822,9 @@ class PiscinexaPhSensor(SensorEntity):
                             {"sensor_id": sensor_id, "state": state.state}
                         )
                     )
+                    self._hass.data[DOMAIN][self._entry.entry_id].pop("ph_current", None)
                     return None
-        input_state = self._hass.states.get(f"input_number.{self._name}_ph_current")
+        input_state = self._hass.states.get(self._input_id)
         if input_state and input_state.state not in ("unknown", "unavailable"):
             try:
                 value = round(float(input_state.state), 1)
@@ -700,7 +851,7 @@ class PiscinexaPhSensor(SensorEntity):
                 )
                 return None
         try:
-            value = round(float(self._entry.data["ph_current"]), 1)
+            value = round(self._config.ph_current, 1)
             # Log si l'état a changé
             if self._last_state != value:
                 _LOGGER.info(
@@ -724,9 +875,12 @@ class PiscinexaPhSensor(SensorEntity):
             return None
 
 class PiscinexaPhPlusAjouterSensor(SensorEntity):
+    _unrecorded_attributes = frozenset({"volume", "ph_current", "ph_target"})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_ph_plus_ajouter"
         self._attr_friendly_name = f"{name.capitalize()} pH+ à ajouter"
@@ -739,33 +893,35 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
             sw_version=VERSION,
         )
         self._attr_icon = "mdi:bottle-tonic-plus"
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_ph"], self._async_update_from_ph
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_ph"], self._async_update_from_ph
             )
         )
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_volume_eau"], self._async_update_from_volume
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_volume_eau"], self._async_update_from_volume
             )
         )
-        self._input_select_id = f"input_select.{name}_ph_plus_treatment"
-        if hass.states.get(self._input_select_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_id], self._async_update_from_select
-                )
+        # Cible modifiable sur l'entité number, où les options la reportent
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [entry_entity_id(hass, entry, "number", "ph_target")], self._async_update_from_ph
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_id}
-                )
+        )
+        self._input_select_id = entry_entity_id(hass, entry, "select", "ph_plus_treatment")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_id], self._async_update_from_select
             )
+        )
+
+    async def async_added_to_hass(self):
+        self._async_update_fleet()
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -774,14 +930,17 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
 
     @callback
     def _async_update_from_ph(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_volume(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_select(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @property
@@ -797,37 +956,32 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
             get_translation(
                 self._hass,
                 "ph_plus_unit_error",
-                {"error": f"input_select {self._input_select_id} indisponible"}
+                {"error": f"select {self._input_select_id} indisponible"}
             )
         )
         return UNIT_LITERS
 
+    @callback
+    def _async_update_fleet(self):
+        """Reporte la dose dans le total de flotte de son unité ; le getter reste sans effet."""
+        value = self._compute_dose()
+        unit = self.native_unit_of_measurement
+        for metric_unit in (UNIT_LITERS, UNIT_GRAMS):
+            self._fleet.async_update(
+                self._entry.entry_id,
+                unit_metric(METRIC_PH_PLUS, metric_unit),
+                value if metric_unit == unit else 0,
+            )
+
     @property
     def native_value(self):
+        return self._compute_dose()
+
+    def _compute_dose(self):
         try:
-            try:
-                ph_current = float(self._entry.data.get("ph_current", 7.0))
-            except (ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    get_translation(
-                        self._hass,
-                        "default_value_read_error",
-                        {"type": "pH actuel", "error": str(e)}
-                    )
-                )
-                ph_current = 7.0
+            ph_current = self._config.ph_current
 
-            try:
-                ph_target = float(self._entry.data.get("ph_target", 7.4))
-            except (ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    get_translation(
-                        self._hass,
-                        "default_value_read_error",
-                        {"type": "pH cible", "error": str(e)}
-                    )
-                )
-                ph_target = 7.4
+            ph_target = number_value(self._hass, self._entry, "ph_target", self._config.ph_target)
 
             if ph_current >= ph_target:
                 return 0
@@ -851,10 +1005,7 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
             ph_difference = ph_target - ph_current
             select_state = self._hass.states.get(self._input_select_id)
             treatment = select_state.state if select_state and select_state.state not in ("unknown", "unavailable") else "Liquide"
-            if treatment == "Liquide":
-                dose = ph_difference * volume_val * 0.012
-            else:
-                dose = ph_difference * volume_val * 1.2
+            dose = ph_dose(ph_difference, volume_val, treatment)
             new_value = round(dose, 2)
 
             # Log si l'état a changé
@@ -885,8 +1036,8 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
     def extra_state_attributes(self):
         attributes = {}
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = number_value(self._hass, self._entry, "ph_target", self._config.ph_target)
             volume = self._hass.states.get(f"sensor.{self._name}_volume_eau")
             if volume:
                 attributes["volume"] = float(volume.state)
@@ -903,9 +1054,12 @@ class PiscinexaPhPlusAjouterSensor(SensorEntity):
         return attributes
 
 class PiscinexaPhMinusAjouterSensor(SensorEntity):
+    _unrecorded_attributes = frozenset({"volume", "ph_current", "ph_target"})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_ph_minus_ajouter"
         self._attr_friendly_name = f"{name.capitalize()} pH- à ajouter"
@@ -918,33 +1072,35 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
             sw_version=VERSION,
         )
         self._attr_icon = "mdi:water-minus"
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_ph"], self._async_update_from_ph
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_ph"], self._async_update_from_ph
             )
         )
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_volume_eau"], self._async_update_from_volume
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_volume_eau"], self._async_update_from_volume
             )
         )
-        self._input_select_id = f"input_select.{name}_ph_minus_treatment"
-        if hass.states.get(self._input_select_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_id], self._async_update_from_select
-                )
+        # Cible modifiable sur l'entité number, où les options la reportent
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [entry_entity_id(hass, entry, "number", "ph_target")], self._async_update_from_ph
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_id}
-                )
+        )
+        self._input_select_id = entry_entity_id(hass, entry, "select", "ph_minus_treatment")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_id], self._async_update_from_select
             )
+        )
+
+    async def async_added_to_hass(self):
+        self._async_update_fleet()
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -953,14 +1109,17 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
 
     @callback
     def _async_update_from_ph(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_volume(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_select(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @property
@@ -976,16 +1135,31 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
             get_translation(
                 self._hass,
                 "ph_minus_unit_error",
-                {"error": f"input_select {self._input_select_id} indisponible"}
+                {"error": f"select {self._input_select_id} indisponible"}
             )
         )
         return UNIT_LITERS
 
+    @callback
+    def _async_update_fleet(self):
+        """Reporte la dose dans le total de flotte de son unité ; le getter reste sans effet."""
+        value = self._compute_dose()
+        unit = self.native_unit_of_measurement
+        for metric_unit in (UNIT_LITERS, UNIT_GRAMS):
+            self._fleet.async_update(
+                self._entry.entry_id,
+                unit_metric(METRIC_PH_MINUS, metric_unit),
+                value if metric_unit == unit else 0,
+            )
+
     @property
     def native_value(self):
+        return self._compute_dose()
+
+    def _compute_dose(self):
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = number_value(self._hass, self._entry, "ph_target", self._config.ph_target)
             if ph_current <= ph_target:
                 return 0
             volume = self._hass.states.get(f"sensor.{self._name}_volume_eau")
@@ -994,10 +1168,7 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
                 ph_difference = ph_current - ph_target
                 select_state = self._hass.states.get(self._input_select_id)
                 treatment = select_state.state if select_state and select_state.state not in ("unknown", "unavailable") else "Liquide"
-                if treatment == "Liquide":
-                    dose = ph_difference * volume_val * 0.012
-                else:
-                    dose = ph_difference * volume_val * 1.2
+                dose = ph_dose(ph_difference, volume_val, treatment)
                 new_value = round(dose, 2)
 
                 # Log si l'état a changé
@@ -1028,8 +1199,8 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
     def extra_state_attributes(self):
         attributes = {}
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = number_value(self._hass, self._entry, "ph_target", self._config.ph_target)
             volume = self._hass.states.get(f"sensor.{self._name}_volume_eau")
             if volume:
                 attributes["volume"] = float(volume.state)
@@ -1048,6 +1219,7 @@ class PiscinexaPhMinusAjouterSensor(SensorEntity):
 class PiscinexaPhTargetSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._hass = hass
         self._attr_name = f"{name}_ph_target"
@@ -1062,23 +1234,15 @@ class PiscinexaPhTargetSensor(SensorEntity):
         )
         self._attr_icon = "mdi:target"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
-        input_id = f"input_number.{name}_ph_target"
-        if hass.states.get(input_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [input_id], self._async_update_from_input
-                )
-            )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_number_missing",
-                    {"entity_id": input_id}
-                )
+        self._input_id = entry_entity_id(hass, entry, "number", "ph_target")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_id], self._async_update_from_input
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1096,7 +1260,11 @@ class PiscinexaPhTargetSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            new_value = round(float(self._entry.data["ph_target"]), 1)
+            input_state = self._hass.states.get(self._input_id)
+            if input_state and input_state.state not in ("unknown", "unavailable"):
+                new_value = round(float(input_state.state), 1)
+            else:
+                new_value = round(self._config.ph_target, 1)
             # Log si l'état a changé
             if self._last_state != new_value:
                 _LOGGER.info(
@@ -1122,6 +1290,7 @@ class PiscinexaPhTargetSensor(SensorEntity):
 class PiscinexaChloreSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._hass = hass
         self._attr_name = f"{name}_chlore"
@@ -1136,50 +1305,61 @@ class PiscinexaChloreSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water-check"
         self._attr_native_unit_of_measurement = UNIT_MG_PER_LITER
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._last_state = None
-        sensor_id = self._entry.data.get("chlore_sensor")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_sensor
-                )
-            )
-        input_id = f"input_number.{name}_chlore_current"
-        if hass.states.get(input_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [input_id], self._async_update_from_input
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "chlore_sensor", self._async_update_from_sensor
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_number_missing",
-                    {"entity_id": input_id}
-                )
+        )
+        self._input_id = entry_entity_id(hass, entry, "number", "chlore_current")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_id], self._async_update_from_input
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
             subscription()
         self._subscriptions.clear()
 
+    async def async_added_to_hass(self):
+        self._async_update_fleet()
+
     @callback
     def _async_update_from_sensor(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_input(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
+    @callback
+    def _async_update_fleet(self):
+        """Reporte dans la flotte si le chlore sort de la plage cible ; le getter reste sans effet."""
+        value = self._read_value()
+        if value is not None:
+            targets = chlorine_targets(self._hass, self._entry)
+            self._fleet.async_update(
+                self._entry.entry_id,
+                METRIC_CHLORE_OUT_OF_RANGE,
+                0 if targets.minimum <= value <= targets.maximum else 1,
+            )
+
     @property
     def name(self):
         return self._attr_friendly_name
 
     @property
     def native_value(self):
+        return self._read_value()
+
+    def _read_value(self):
         sensor_id = self._entry.data.get("chlore_sensor")
         if sensor_id:
             state = self._hass.states.get(sensor_id)
@@ -1187,19 +1367,6 @@ class PiscinexaChloreSensor(SensorEntity):
                 try:
                     value = round(float(state.state), 1)
                     self._hass.data[DOMAIN][self._entry.entry_id]["chlore_current"] = value
-                    input_id = f"input_number.{self._name}_chlore_current"
-                    if self._hass.states.get(input_id):
-                        self._hass.states.async_set(
-                            input_id,
-                            value,
-                            {
-                                "friendly_name": f"{self._name.capitalize()} Chlore Actuel",
-                                "min": 0,
-                                "max": 10,
-                                "step": 0.1,
-                                "unit_of_measurement": UNIT_MG_PER_LITER,
-                            },
-                        )
                     # Log si l'état a changé
                     if self._last_state != value:
                         _LOGGER.info(
@@ -1221,7 +1388,7 @@ class PiscinexaChloreSensor(SensorEntity):
                         )
                     )
                     return None
-        input_state = self._hass.states.get(f"input_number.{self._name}_chlore_current")
+        input_state = self._hass.states.get(self._input_id)
         if input_state and input_state.state not in ("unknown", "unavailable"):
             try:
                 value = round(float(input_state.state), 1)
@@ -1248,7 +1415,7 @@ class PiscinexaChloreSensor(SensorEntity):
                 )
                 return None
         try:
-            value = round(float(self._entry.data["chlore_current"]), 1)
+            value = round(self._config.chlore_current, 1)
             # Log si l'état a changé
             if self._last_state != value:
                 _LOGGER.info(
@@ -1274,6 +1441,7 @@ class PiscinexaChloreSensor(SensorEntity):
 class PiscinexaChloreTargetSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._hass = hass
         self._attr_name = f"{name}_chlore_target"
@@ -1288,23 +1456,15 @@ class PiscinexaChloreTargetSensor(SensorEntity):
         )
         self._attr_icon = "mdi:target"
         self._attr_native_unit_of_measurement = UNIT_MG_PER_LITER
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
-        input_id = f"input_number.{name}_chlore_target"
-        if hass.states.get(input_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [input_id], self._async_update_from_input
-                )
-            )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_number_missing",
-                    {"entity_id": input_id}
-                )
+        self._input_id = entry_entity_id(hass, entry, "number", "chlore_target")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_id], self._async_update_from_input
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1322,7 +1482,11 @@ class PiscinexaChloreTargetSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            new_value = round(float(self._entry.data["chlore_target"]), 1)
+            input_state = self._hass.states.get(self._input_id)
+            if input_state and input_state.state not in ("unknown", "unavailable"):
+                new_value = round(float(input_state.state), 1)
+            else:
+                new_value = round(self._config.chlore_target, 1)
             # Log si l'état a changé
             if self._last_state != new_value:
                 _LOGGER.info(
@@ -1346,9 +1510,12 @@ class PiscinexaChloreTargetSensor(SensorEntity):
             return None
 
 class PiscinexaChloreAjouterSensor(SensorEntity):
+    _unrecorded_attributes = frozenset({"volume", "chlore_current", "chlore_target", *TARGET_ATTRIBUTES})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_chloreaajouter"
         self._attr_friendly_name = f"{name.capitalize()} Chlore à Ajouter"
@@ -1362,33 +1529,38 @@ class PiscinexaChloreAjouterSensor(SensorEntity):
         )
         self._attr_icon = "mdi:bottle-tonic-plus"
         self._message = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._fleet = hass.data[DOMAIN]["fleet"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_chlore"], self._async_update_from_chlore
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_chlore"], self._async_update_from_chlore
             )
         )
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_volume_eau"], self._async_update_from_volume
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_volume_eau"], self._async_update_from_volume
             )
         )
-        self._input_select_id = f"input_select.{name}_chlore_treatment"
-        if hass.states.get(self._input_select_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_id], self._async_update_from_select
-                )
+        self._input_select_id = entry_entity_id(hass, entry, "select", "chlore_treatment")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_id], self._async_update_from_select
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_id}
-                )
+        )
+
+    async def async_added_to_hass(self):
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [
+                    entry_entity_id(self._hass, self._entry, "number", "cya"),
+                    entry_entity_id(self._hass, self._entry, "number", "chlore_target"),
+                ],
+                self._async_update_from_targets,
             )
+        )
+        self._async_update_fleet()
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1397,14 +1569,22 @@ class PiscinexaChloreAjouterSensor(SensorEntity):
 
     @callback
     def _async_update_from_chlore(self, event):
+        self._async_update_fleet()
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _async_update_from_targets(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_volume(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @callback
     def _async_update_from_select(self, event):
+        self._async_update_fleet()
         self.async_schedule_update_ha_state(True)
 
     @property
@@ -1424,28 +1604,33 @@ class PiscinexaChloreAjouterSensor(SensorEntity):
             get_translation(
                 self._hass,
                 "chlore_unit_error",
-                {"error": f"input_select {self._input_select_id} indisponible"}
+                {"error": f"select {self._input_select_id} indisponible"}
             )
         )
         return UNIT_GRAMS
 
+    @callback
+    def _async_update_fleet(self):
+        """Reporte la dose dans le total de flotte de son unité ; le getter reste sans effet."""
+        value = self._compute_dose()
+        unit = self.native_unit_of_measurement
+        for metric_unit in (UNIT_GRAMS, "unités"):
+            self._fleet.async_update(
+                self._entry.entry_id,
+                unit_metric(METRIC_CHLORE, metric_unit),
+                value if metric_unit == unit else 0,
+            )
+
     @property
     def native_value(self):
+        return self._compute_dose()
+
+    def _compute_dose(self):
         try:
-            try:
-                chlore_current = float(self._entry.data.get("chlore_current", 1.0))
-            except (ValueError, TypeError) as e:
-                _LOGGER.warning(
-                    get_translation(
-                        self._hass,
-                        "default_value_read_error",
-                        {"type": "chlore actuel", "error": str(e)}
-                    )
-                )
-                chlore_current = 1.0
+            chlore_current = self._config.chlore_current
 
             try:
-                chlore_target = float(self._entry.data.get("chlore_target", 2.0))
+                chlore_target = chlorine_targets(self._hass, self._entry).target
             except (ValueError, TypeError) as e:
                 _LOGGER.warning(
                     get_translation(
@@ -1475,12 +1660,7 @@ class PiscinexaChloreAjouterSensor(SensorEntity):
             chlore_difference = chlore_target - chlore_current
             select_state = self._hass.states.get(self._input_select_id)
             treatment = select_state.state if select_state and select_state.state not in ("unknown", "unavailable") else "Chlore choc (poudre)"
-            if treatment == "Liquide":
-                dose = chlore_difference * volume_val * 10
-            elif treatment == "Pastille lente":
-                dose = (chlore_difference * volume_val) / 20
-            else:
-                dose = chlore_difference * volume_val * 10
+            dose = chlore_dose(chlore_difference, volume_val, treatment)
 
             if dose <= 0:
                 self._message = get_translation(self._hass, "remove_chlorine_message")
@@ -1518,8 +1698,9 @@ class PiscinexaChloreAjouterSensor(SensorEntity):
     def extra_state_attributes(self):
         attributes = {}
         try:
-            attributes["chlore_current"] = float(self._entry.data["chlore_current"])
-            attributes["chlore_target"] = float(self._entry.data["chlore_target"])
+            attributes["chlore_current"] = self._config.chlore_current
+            attributes["chlore_target"] = self._config.chlore_target
+            attributes.update(chlorine_targets(self._hass, self._entry).as_dict())
             volume_entity = self._hass.states.get(f"sensor.{self._name}_volume_eau")
             if volume_entity:
                 attributes["volume"] = float(volume_entity.state)
@@ -1539,6 +1720,7 @@ class PiscinexaChloreDifferenceSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_chloredifference"
         self._attr_friendly_name = f"{name.capitalize()} Chlore Différence"
@@ -1552,11 +1734,12 @@ class PiscinexaChloreDifferenceSensor(SensorEntity):
         )
         self._attr_icon = "mdi:delta"
         self._attr_native_unit_of_measurement = UNIT_MG_PER_LITER
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_chlore"], self._async_update_from_chlore
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_chlore"], self._async_update_from_chlore
             )
         )
 
@@ -1576,8 +1759,8 @@ class PiscinexaChloreDifferenceSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            chlore_current = float(self._entry.data["chlore_current"])
-            chlore_target = float(self._entry.data["chlore_target"])
+            chlore_current = self._config.chlore_current
+            chlore_target = self._config.chlore_target
             difference = chlore_target - chlore_current
             new_value = round(difference, 1)
 
@@ -1621,15 +1804,14 @@ class PiscinexaPowerSensor(SensorEntity):
         )
         self._attr_icon = "mdi:flash"
         self._attr_native_unit_of_measurement = "W"
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
-        sensor_id = self._entry.data.get("power_sensor_entity_id")
-        if sensor_id:
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [sensor_id], self._async_update_from_sensor
-                )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source(
+                "power_sensor_entity_id", self._async_update_from_sensor
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1680,6 +1862,9 @@ class PiscinexaPowerSensor(SensorEntity):
             return None
 
 class PiscinexaPoolStateSensor(SensorEntity):
+    # Mesures déjà historisées par leurs propres capteurs, et seuils de chlore quasi constants
+    _unrecorded_attributes = frozenset({"temperature", "chlore", "ph", "temps_filtration_recommande", *TARGET_ATTRIBUTES})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
@@ -1696,19 +1881,34 @@ class PiscinexaPoolStateSensor(SensorEntity):
         )
         self._attr_icon = "mdi:pool"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
-        entities_to_track = [
-            f"sensor.{name}_temperature",
-            f"sensor.{name}_chlore",
-            f"sensor.{name}_ph",
-            f"sensor.{name}_tempsfiltration_recommande",
-        ]
+        self._status = PoolStatus.UNKNOWN
+        self._issues = None
+        self._readings = {}
+        self._lsi = None
+        self._targets = None
+        # Repli si les capteurs de mesure ne sont pas encore dans le registre
+        self._reading_ids = {
+            "temperature": f"sensor.{name}_temperature",
+            "chlore": f"sensor.{name}_chlore",
+            "ph": f"sensor.{name}_ph",
+            "temps_filtration_recommande": f"sensor.{name}_tempsfiltration_recommande",
+        }
+
+    async def async_added_to_hass(self):
+        self._reading_ids = {
+            key: measurement_entity_id(self._hass, self._entry, key, fallback)
+            for key, fallback in self._reading_ids.items()
+        }
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, entities_to_track, self._async_update_from_sensors
+            self._dispatcher.async_subscribe(
+                list(self._reading_ids.values()), self._async_update_from_sensors
             )
         )
+        # Premier relevé fait avec les entity_id de repli : recalcul avec les bons
+        self.async_schedule_update_ha_state(True)
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1723,76 +1923,32 @@ class PiscinexaPoolStateSensor(SensorEntity):
     def name(self):
         return self._attr_friendly_name
 
-    @property
-    def native_value(self):
+    def _reading(self, entity_id):
+        """Valeur numérique d'un capteur de mesure, None s'il est indisponible."""
+        state = self._hass.states.get(entity_id)
+        if state is None or state.state in ("unknown", "unavailable"):
+            return None
         try:
-            issues = []
-            temp_entity = self._hass.states.get(f"sensor.{self._name}_temperature")
-            if temp_entity and temp_entity.state not in ("unknown", "unavailable"):
-                temperature = float(temp_entity.state)
-                if temperature < 22:
-                    issues.append(get_translation(self._hass, "temperature_too_cold"))
-                elif temperature > 28:
-                    issues.append(get_translation(self._hass, "temperature_too_hot"))
-                else:
-                    issues.append(get_translation(self._hass, "temperature_ideal"))
-            else:
-                issues.append(get_translation(self._hass, "temperature_unavailable"))
-            chlore_entity = self._hass.states.get(f"sensor.{self._name}_chlore")
-            if chlore_entity and chlore_entity.state not in ("unknown", "unavailable"):
-                chlore = float(chlore_entity.state)
-                if chlore < 1:
-                    issues.append(get_translation(self._hass, "chlore_too_low"))
-                elif chlore > 3:
-                    issues.append(get_translation(self._hass, "chlore_too_high"))
-                else:
-                    issues.append(get_translation(self._hass, "chlore_ideal"))
-            else:
-                issues.append(get_translation(self._hass, "chlore_unavailable"))
-            ph_entity = self._hass.states.get(f"sensor.{self._name}_ph")
-            if ph_entity and ph_entity.state not in ("unknown", "unavailable"):
-                ph = float(ph_entity.state)
-                if ph < 7.2:
-                    issues.append(get_translation(self._hass, "ph_too_low"))
-                elif ph > 7.6:
-                    issues.append(get_translation(self._hass, "ph_too_high"))
-                else:
-                    issues.append(get_translation(self._hass, "ph_ideal"))
-            else:
-                issues.append(get_translation(self._hass, "ph_unavailable"))
-            filtration_entity = self._hass.states.get(f"sensor.{self._name}_tempsfiltration_recommande")
-            if filtration_entity and filtration_entity.state not in ("unknown", "unavailable") and temp_entity:
-                filtration_time = float(filtration_entity.state)
-                required_filtration = temperature / 2
-                if filtration_time < required_filtration:
-                    issues.append(get_translation(self._hass, "filtration_insufficient"))
-                else:
-                    issues.append(get_translation(self._hass, "filtration_ideal"))
-            else:
-                issues.append(get_translation(self._hass, "filtration_unavailable"))
-            if all(issue in [
-                get_translation(self._hass, "temperature_ideal"),
-                get_translation(self._hass, "chlore_ideal"),
-                get_translation(self._hass, "ph_ideal"),
-                get_translation(self._hass, "filtration_ideal")
-            ] for issue in issues):
-                new_value = get_translation(self._hass, "swimming_allowed")
-            else:
-                new_value = ", ".join(issues)
-
-            # Log si l'état a changé
-            if self._last_state != new_value:
-                _LOGGER.info(
-                    get_translation(
-                        self._hass,
-                        "state_changed",
-                        {"name": self._attr_friendly_name, "old_state": self._last_state, "new_state": new_value},
-                        default="État changé pour {name}: {old_state} → {new_state}"
-                    )
-                )
-                self._last_state = new_value
+            return float(state.state)
+        except (ValueError, TypeError):
+            return None
 
-            return new_value
+    async def async_update(self):
+        """Évalue l'état de la piscine une fois par relevé ; le texte n'est qu'un rendu de ce code."""
+        try:
+            self._readings = {key: self._reading(entity_id) for key, entity_id in self._reading_ids.items()}
+            self._lsi = evaluate_water_balance(self._hass, self._entry)["lsi"]
+            self._targets = chlorine_targets(self._hass, self._entry)
+            self._issues = pool_issues(
+                self._readings["temperature"],
+                self._readings["chlore"],
+                self._readings["ph"],
+                self._readings["temps_filtration_recommande"],
+                self._lsi,
+                self._targets.minimum,
+                self._targets.maximum,
+            )
+            self._status = pool_status(self._issues)
         except Exception as e:
             _LOGGER.error(
                 get_translation(
@@ -1801,50 +1957,265 @@ class PiscinexaPoolStateSensor(SensorEntity):
                     {"name": self._name, "error": str(e)}
                 )
             )
+            self._issues = None
+            self._status = PoolStatus.UNKNOWN
+            return
+
+        # Log si l'état a changé
+        new_state = f"{self._status.value} ({int(self._issues)})"
+        if self._last_state != new_state:
+            _LOGGER.info(
+                get_translation(
+                    self._hass,
+                    "state_changed",
+                    {"name": self._attr_friendly_name, "old_state": self._last_state, "new_state": new_state},
+                    default="État changé pour {name}: {old_state} → {new_state}"
+                )
+            )
+            self._last_state = new_state
+
+    @property
+    def native_value(self):
+        if self._issues is None:
             return get_translation(self._hass, "evaluation_error")
+        if not self._issues:
+            return get_translation(self._hass, "swimming_allowed")
+        return ", ".join(get_translation(self._hass, key) for key in issue_translation_keys(self._issues))
 
     @property
     def extra_state_attributes(self):
-        attributes = {}
-        try:
-            def safe_float(state, default=None):
-                if state and state not in ("unavailable", "unknown"):
-                    try:
-                        return float(state)
-                    except (ValueError, TypeError):
-                        return default
-                return default
+        # Codes indépendants de la langue, sur lesquels déclencher les automatisations
+        attributes = {
+            "status": self._status.value,
+            "issues": int(self._issues) if self._issues is not None else None,
+        }
+        if self._issues is not None:
+            attributes.update(self._readings)
+            attributes["lsi"] = self._lsi
+            attributes.update(self._targets.as_dict())
+        return attributes
 
-            temp_entity = self._hass.states.get(f"sensor.{self._name}_temperature")
-            if temp_entity:
-                attributes["temperature"] = safe_float(temp_entity.state)
+class PiscinexaLsiSensor(SensorEntity):
+    """Indice de saturation de Langelier, avec l'indice de Ryznar en attribut."""
 
-            chlore_entity = self._hass.states.get(f"sensor.{self._name}_chlore")
-            if chlore_entity:
-                attributes["chlore"] = safe_float(chlore_entity.state)
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_lsi"
+        self._attr_friendly_name = f"{name.capitalize()} Indice de Langelier"
+        self._attr_unique_id = f"{entry.entry_id}_lsi"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:scale-balance"
+        self._attr_native_unit_of_measurement = None
+        self._attr_should_poll = False
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._subscriptions = []
+        self._balance = None
 
-            ph_entity = self._hass.states.get(f"sensor.{self._name}_ph")
-            if ph_entity:
-                attributes["ph"] = safe_float(ph_entity.state)
+    async def async_added_to_hass(self):
+        # Chaque relevé de pH ou de température ne coûte qu'une interpolation dans les tables
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [
+                    entry_entity_id(self._hass, self._entry, "number", "alkalinity"),
+                    entry_entity_id(self._hass, self._entry, "number", "calcium_hardness"),
+                    entry_entity_id(self._hass, self._entry, "number", "tds"),
+                    measurement_entity_id(self._hass, self._entry, "ph", f"sensor.{self._name}_ph"),
+                    measurement_entity_id(
+                        self._hass, self._entry, "temperature", f"sensor.{self._name}_temperature"
+                    ),
+                ],
+                self._async_update_from_inputs,
+            )
+        )
 
-            filtration_entity = self._hass.states.get(f"sensor.{self._name}_tempsfiltration_recommande")
-            if filtration_entity:
-                attributes["temps_filtration_recommande"] = safe_float(filtration_entity.state)
+    async def async_will_remove_from_hass(self):
+        for subscription in self._subscriptions:
+            subscription()
+        self._subscriptions.clear()
 
+    @callback
+    def _async_update_from_inputs(self, event):
+        self.async_schedule_update_ha_state(True)
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    async def async_update(self):
+        try:
+            self._balance = evaluate_water_balance(self._hass, self._entry)
         except Exception as e:
             _LOGGER.error(
                 get_translation(
                     self._hass,
-                    "pool_state_attributes_error",
-                    {"error": str(e)}
+                    "lsi_error",
+                    {"name": self._name, "error": str(e)},
+                    default="Erreur lors du calcul de l'indice de Langelier pour {name} : {error}"
                 )
             )
+            self._balance = None
+
+    @property
+    def native_value(self):
+        return self._balance["lsi"] if self._balance else None
+
+    @property
+    def extra_state_attributes(self):
+        if not self._balance:
+            return {}
+        return {
+            "ryznar": self._balance["ryznar"],
+            "saturation_ph": self._balance["saturation_ph"],
+            "ph": self._balance["ph"],
+            "temperature": self._balance["temperature"],
+        }
+
+class PiscinexaHeatingSensor(RestoreEntity, SensorEntity):
+    """Durée de chauffe jusqu'à la température cible, avec l'énergie nécessaire en attributs."""
+
+    _unrecorded_attributes = frozenset({"heat_loss_coefficient", "heat_loss_samples"})
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_chauffage"
+        self._attr_friendly_name = f"{name.capitalize()} Durée de chauffe"
+        self._attr_unique_id = f"{entry.entry_id}_chauffage"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:heat-pump"
+        self._attr_native_unit_of_measurement = UNIT_HOURS
+        self._attr_should_poll = False
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._scheduler = hass.data[DOMAIN][entry.entry_id]["scheduler"]
+        self._subscriptions = []
+        self._estimator = HeatLossEstimator()
+        self._estimate = None
+
+    async def async_added_to_hass(self):
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.attributes.get("heat_loss_coefficient") is not None:
+            self._estimator = HeatLossEstimator(
+                float(last_state.attributes["heat_loss_coefficient"]),
+                int(last_state.attributes.get("heat_loss_samples", 0)),
+            )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe_source("temperature_sensor", self._async_temperature_reading)
+        )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [entry_entity_id(self._hass, self._entry, "number", "temperature_target")],
+                self._async_update_from_inputs,
+            )
+        )
+        self._subscriptions.append(self._scheduler.async_add_listener(self._async_recompute))
+        self._async_recompute()
+
+    async def async_will_remove_from_hass(self):
+        for subscription in self._subscriptions:
+            subscription()
+        self._subscriptions.clear()
+
+    def _air_temperature(self) -> float:
+        weather = self._entry.options.get(CONF_WEATHER_ENTITY)
+        state = self._hass.states.get(weather) if weather else None
+        try:
+            return float(state.attributes["temperature"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return DEFAULT_AIR_TEMPERATURE
+
+    def _water_temperature(self):
+        try:
+            return float(self._hass.data[DOMAIN][self._entry.entry_id]["temperature"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @callback
+    def _async_temperature_reading(self, event):
+        if event is None:
+            # Nouvelle sonde : ses relevés seront appris à sa prochaine mise à jour
+            self._async_recompute()
+            return
+        new_state = event.data.get("new_state")
+        # Converti en °C selon l'unité de la sonde, comme à sa validation
+        temperature = probe_value(new_state, KIND_TEMPERATURE) if new_state is not None else None
+        if temperature is None:
+            return
+        self._estimator.add_reading(dt_util.utcnow(), temperature, self._air_temperature())
+        self._async_recompute(temperature)
+
+    @callback
+    def _async_update_from_inputs(self, event):
+        self._async_recompute()
+
+    @callback
+    def _async_recompute(self, temperature=None):
+        """Recalcule l'estimation ; quelques opérations par relevé, sans historique."""
+        temperature = self._water_temperature() if temperature is None else temperature
+        if temperature is None:
+            return
+        runtime = self._hass.data[DOMAIN][self._entry.entry_id]
+        options = self._entry.options
+        pump_power = float(options.get(CONF_HEAT_PUMP_POWER) or 0)
+        self._estimate = heating_estimate(
+            float(runtime.get("volume", 30.0)),
+            temperature,
+            number_value(self._hass, self._entry, "temperature_target", 28.0),
+            pump_power,
+            float(options.get(CONF_HEAT_PUMP_COP, DEFAULT_HEAT_PUMP_COP)),
+            self._estimator.coefficient,
+            self._air_temperature(),
+        )
+        self._estimate["cheapest_start"] = None
+        plan = self._scheduler.plan
+        if plan and self._estimate["hours"]:
+            now = dt_util.now()
+            day_start = dt_util.start_of_local_day(now)
+            first_slot = int((now - day_start).total_seconds() // (SLOT_MINUTES * 60))
+            slots = -(-int(self._estimate["hours"] * 60) // SLOT_MINUTES)
+            window = cheapest_window(plan["prices"], first_slot, slots)
+            if window is not None:
+                start, price_sum = window
+                self._estimate["cheapest_start"] = (day_start + timedelta(minutes=start * SLOT_MINUTES)).isoformat()
+                self._estimate["cheapest_cost"] = round(price_sum * pump_power / 1000 * SLOT_MINUTES / 60, 2)
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        return self._estimate["hours"] if self._estimate else None
+
+    @property
+    def extra_state_attributes(self):
+        attributes = dict(self._estimate or {})
+        attributes.pop("hours", None)
+        attributes["heat_loss_coefficient"] = round(self._estimator.coefficient, 5)
+        attributes["heat_loss_samples"] = self._estimator.samples
         return attributes
 
 class PiscinexaPhDifferenceSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_phdifference"
         self._attr_friendly_name = f"{name.capitalize()} pH Différence"
@@ -1858,13 +2229,14 @@ class PiscinexaPhDifferenceSensor(SensorEntity):
         )
         self._attr_icon = "mdi:delta"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(self._hass, [f"sensor.{name}_ph"], self._async_update_from_ph)
+            self._dispatcher.async_subscribe([f"sensor.{name}_ph"], self._async_update_from_ph)
         )
         self._subscriptions.append(
-            async_track_state_change_event(self._hass, [f"sensor.{name}_ph_target"], self._async_update_from_ph_target)
+            self._dispatcher.async_subscribe([f"sensor.{name}_ph_target"], self._async_update_from_ph_target)
         )
 
     async def async_will_remove_from_hass(self):
@@ -1887,8 +2259,8 @@ class PiscinexaPhDifferenceSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = self._config.ph_target
             difference = ph_target - ph_current
             new_value = round(difference, 1)
 
@@ -1919,6 +2291,7 @@ class PiscinexaPhTreatmentSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_ph_treatment"
         self._attr_friendly_name = f"{name.capitalize()} pH Traitement"
@@ -1932,48 +2305,31 @@ class PiscinexaPhTreatmentSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water-pump"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_ph"], self._async_update_from_ph
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_ph"], self._async_update_from_ph
             )
         )
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_ph_target"], self._async_update_from_ph_target
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_ph_target"], self._async_update_from_ph_target
             )
         )
-        self._input_select_ph_plus = f"input_select.{name}_ph_plus_treatment"
-        self._input_select_ph_minus = f"input_select.{name}_ph_minus_treatment"
-        if hass.states.get(self._input_select_ph_plus):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_ph_plus], self._async_update_from_select
-                )
-            )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_ph_plus}
-                )
-            )
-        if hass.states.get(self._input_select_ph_minus):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_ph_minus], self._async_update_from_select
-                )
+        self._input_select_ph_plus = entry_entity_id(hass, entry, "select", "ph_plus_treatment")
+        self._input_select_ph_minus = entry_entity_id(hass, entry, "select", "ph_minus_treatment")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_ph_plus], self._async_update_from_select
             )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_ph_minus}
-                )
+        )
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_ph_minus], self._async_update_from_select
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -1999,8 +2355,8 @@ class PiscinexaPhTreatmentSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = self._config.ph_target
             if ph_current < ph_target:
                 select_state = self._hass.states.get(self._input_select_ph_plus)
                 new_value = select_state.state if select_state and select_state.state not in ("unknown", "unavailable") else "Liquide"
@@ -2037,6 +2393,7 @@ class PiscinexaChloreTreatmentSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_chlore_treatment"
         self._attr_friendly_name = f"{name.capitalize()} Chlore Traitement"
@@ -2050,33 +2407,25 @@ class PiscinexaChloreTreatmentSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water-check"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_chlore"], self._async_update_from_chlore
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_chlore"], self._async_update_from_chlore
             )
         )
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, [f"sensor.{name}_chlore_target"], self._async_update_from_chlore_target
+            self._dispatcher.async_subscribe(
+                [f"sensor.{name}_chlore_target"], self._async_update_from_chlore_target
             )
         )
-        self._input_select_id = f"input_select.{name}_chlore_treatment"
-        if hass.states.get(self._input_select_id):
-            self._subscriptions.append(
-                async_track_state_change_event(
-                    hass, [self._input_select_id], self._async_update_from_select
-                )
-            )
-        else:
-            _LOGGER.warning(
-                get_translation(
-                    self._hass,
-                    "input_select_missing",
-                    {"entity_id": self._input_select_id}
-                )
+        self._input_select_id = entry_entity_id(hass, entry, "select", "chlore_treatment")
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [self._input_select_id], self._async_update_from_select
             )
+        )
 
     async def async_will_remove_from_hass(self):
         for subscription in self._subscriptions:
@@ -2102,8 +2451,8 @@ class PiscinexaChloreTreatmentSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            chlore_current = float(self._entry.data["chlore_current"])
-            chlore_target = float(self._entry.data["chlore_target"])
+            chlore_current = self._config.chlore_current
+            chlore_target = self._config.chlore_target
             if chlore_current < chlore_target:
                 select_state = self._hass.states.get(self._input_select_id)
                 new_value = select_state.state if select_state and select_state.state not in ("unknown", "unavailable") else "Chlore choc (poudre)"
@@ -2133,10 +2482,116 @@ class PiscinexaChloreTreatmentSensor(SensorEntity):
             )
             return None
 
+class PiscinexaTreatmentPlanSensor(SensorEntity):
+    """Plan de traitement ordonné le moins coûteux pour atteindre les cibles."""
+
+    _unrecorded_attributes = frozenset({"steps", "summary", "currency"})
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_plan_traitement"
+        self._attr_friendly_name = f"{name.capitalize()} Plan de traitement"
+        self._attr_unique_id = f"{entry.entry_id}_plan_traitement"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:clipboard-list-outline"
+        self._attr_native_unit_of_measurement = "étapes"
+        self._attr_should_poll = False
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._subscriptions = []
+        self._plan = None
+        self._plan_key = None
+
+    async def async_added_to_hass(self):
+        # Les cibles sont des entités number déjà publiées : on ne s'abonne
+        # qu'une fois ajouté pour ne pas planifier de mise à jour trop tôt.
+        # Le CYA fixe la cible de chlore effective.
+        self._subscriptions.append(
+            self._dispatcher.async_subscribe(
+                [
+                    measurement_entity_id(self._hass, self._entry, "ph", f"sensor.{self._name}_ph_actuel"),
+                    measurement_entity_id(self._hass, self._entry, "chlore", f"sensor.{self._name}_chlore_actuel"),
+                    entry_entity_id(self._hass, self._entry, "number", "ph_target"),
+                    entry_entity_id(self._hass, self._entry, "number", "chlore_target"),
+                    entry_entity_id(self._hass, self._entry, "number", "cya"),
+                ],
+                self._async_update_from_source,
+            )
+        )
+        # Les prix ne sont pas des entités : l'écouteur des options recalcule le plan quand ils changent
+        self._hass.data[DOMAIN][self._entry.entry_id]["refresh_treatment_plan"] = self._async_refresh
+
+    async def async_will_remove_from_hass(self):
+        for subscription in self._subscriptions:
+            subscription()
+        self._subscriptions.clear()
+        self._hass.data[DOMAIN][self._entry.entry_id].pop("refresh_treatment_plan", None)
+
+    @callback
+    def _async_update_from_source(self, event):
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _async_refresh(self):
+        self.async_schedule_update_ha_state(True)
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    async def async_update(self):
+        """Recalcule le plan dans l'exécuteur, seulement si ses entrées ont changé."""
+        try:
+            snapshot = build_snapshot(self._hass, self._entry)
+            prices = product_prices(self._entry)
+            key = (tuple(sorted(snapshot.items())), repr(prices))
+            if key == self._plan_key:
+                return
+            self._plan = await async_plan_treatment(self._hass, snapshot, prices)
+            self._plan_key = key
+        except Exception as e:
+            _LOGGER.error(
+                get_translation(
+                    self._hass,
+                    "treatment_plan_error",
+                    {"name": self._name, "error": str(e)},
+                    default="Erreur lors du calcul du plan de traitement pour {name} : {error}"
+                )
+            )
+            self._plan = None
+            self._plan_key = None
+
+    @property
+    def native_value(self):
+        if not self._plan or not self._plan["feasible"]:
+            return None
+        return len(self._plan["steps"])
+
+    @property
+    def extra_state_attributes(self):
+        if not self._plan:
+            return {}
+        return {
+            "feasible": self._plan["feasible"],
+            "steps": self._plan["steps"],
+            "summary": plan_summary(self._plan),
+            "total_cost": self._plan["total_cost"],
+            "currency": self._hass.config.currency,
+            "total_hours": self._plan["total_hours"],
+        }
+
 class PiscinexaChloreStateSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_etat_chlore"
         self._attr_friendly_name = f"{name.capitalize()} État Chlore"
@@ -2150,6 +2605,7 @@ class PiscinexaChloreStateSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water-check"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         entities_to_track = [
@@ -2157,8 +2613,8 @@ class PiscinexaChloreStateSensor(SensorEntity):
             f"sensor.{name}_chlore_target",
         ]
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, entities_to_track, self._async_update_from_sensors
+            self._dispatcher.async_subscribe(
+                entities_to_track, self._async_update_from_sensors
             )
         )
 
@@ -2178,8 +2634,8 @@ class PiscinexaChloreStateSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            chlore_current = float(self._entry.data["chlore_current"])
-            chlore_target = float(self._entry.data["chlore_target"])
+            chlore_current = self._config.chlore_current
+            chlore_target = self._config.chlore_target
             new_value = get_translation(self._hass, "chlore_state_ok", default="OK") if abs(chlore_current - chlore_target) <= 0.1 else get_translation(self._hass, "chlore_state_adjust", default="Veuillez réajuster le chlore")
 
             # Log si l'état a changé
@@ -2210,6 +2666,7 @@ class PiscinexaPhStateSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_etat_ph"
         self._attr_friendly_name = f"{name.capitalize()} État pH"
@@ -2223,6 +2680,7 @@ class PiscinexaPhStateSensor(SensorEntity):
         )
         self._attr_icon = "mdi:water"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         entities_to_track = [
@@ -2230,8 +2688,8 @@ class PiscinexaPhStateSensor(SensorEntity):
             f"sensor.{name}_ph_target",
         ]
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, entities_to_track, self._async_update_from_sensors
+            self._dispatcher.async_subscribe(
+                entities_to_track, self._async_update_from_sensors
             )
         )
 
@@ -2251,8 +2709,8 @@ class PiscinexaPhStateSensor(SensorEntity):
     @property
     def native_value(self):
         try:
-            ph_current = float(self._entry.data["ph_current"])
-            ph_target = float(self._entry.data["ph_target"])
+            ph_current = self._config.ph_current
+            ph_target = self._config.ph_target
             new_value = get_translation(self._hass, "ph_state_ok", default="OK") if abs(ph_current - ph_target) <= 0.2 else get_translation(self._hass, "ph_state_adjust", default="Veuillez réajuster le pH")
 
             # Log si l'état a changé
@@ -2283,6 +2741,7 @@ class PiscinexaTemperatureStateSensor(SensorEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
+        self._config = hass.data[DOMAIN][entry.entry_id]["config"]
         self._name = name
         self._attr_name = f"{name}_etat_temperature"
         self._attr_friendly_name = f"{name.capitalize()} État Température"
@@ -2296,14 +2755,15 @@ class PiscinexaTemperatureStateSensor(SensorEntity):
         )
         self._attr_icon = "mdi:thermometer"
         self._attr_native_unit_of_measurement = None
+        self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
         self._subscriptions = []
         self._last_state = None
         entities_to_track = [
             f"sensor.{name}_temperature",
         ]
         self._subscriptions.append(
-            async_track_state_change_event(
-                hass, entities_to_track, self._async_update_from_sensors
+            self._dispatcher.async_subscribe(
+                entities_to_track, self._async_update_from_sensors
             )
         )
 
@@ -2355,7 +2815,7 @@ class PiscinexaTemperatureStateSensor(SensorEntity):
                     _LOGGER.error(f"Erreur de conversion de la température: {e}, état={temp_entity.state}")
                     return get_translation(self._hass, "temperature_unavailable", default="Température indisponible")
             try:
-                temperature = float(self._entry.data.get("temperature", 20.0))
+                temperature = self._config.temperature
                 _LOGGER.debug(f"Utilisation de la température par défaut/manuelle: {temperature}")
                 if temperature < 18:
                     new_value = get_translation(self._hass, "temperature_state_wait", default="Attendre un peu")
@@ -2392,6 +2852,9 @@ class PiscinexaTemperatureStateSensor(SensorEntity):
             return get_translation(self._hass, "temperature_unavailable", default="Température indisponible")
 
 class PiscinexaPoolTypeSensor(SensorEntity):
+    # Texte d'installation et dimensions : fixes
+    _unrecorded_attributes = frozenset({"installation_info", "dimensions", "depth", "length", "width", "diameter"})
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
         self._hass = hass
         self._entry = entry
@@ -2498,6 +2961,7 @@ class PiscinexaPoolTypeSensor(SensorEntity):
                     "unknown_installation_info",
                     default="Informations d'installation non disponibles."
                 )
+            attributes["dimensions"] = pool_dimensions(self._entry.data)
             attributes["depth"] = self._entry.data.get("depth", "N/A")
             if pool_type == POOL_TYPE_SQUARE:
                 attributes["length"] = self._entry.data.get("length", "N/A")
@@ -2520,3 +2984,264 @@ class PiscinexaPoolTypeSensor(SensorEntity):
                 default="Erreur lors de la récupération des informations."
             )
         return attributes
+
+# (clé, libellé, agrégat principal, unité, icône, attributs supplémentaires {nom: agrégat})
+FLEET_SENSOR_DESCRIPTIONS = [
+    ("ph_hors_plage", "pH hors plage", METRIC_PH_OUT_OF_RANGE, "piscines", "mdi:alert-circle-outline", {}),
+    ("chlore_hors_plage", "Chlore hors plage", METRIC_CHLORE_OUT_OF_RANGE, "piscines", "mdi:alert-circle-outline", {}),
+    (
+        "ph_plus_total", "pH plus à ajouter (total)", unit_metric(METRIC_PH_PLUS, UNIT_LITERS), UNIT_LITERS,
+        "mdi:bottle-tonic-plus", {"total_g": unit_metric(METRIC_PH_PLUS, UNIT_GRAMS)},
+    ),
+    (
+        "ph_minus_total", "pH moins à ajouter (total)", unit_metric(METRIC_PH_MINUS, UNIT_LITERS), UNIT_LITERS,
+        "mdi:water-minus", {"total_g": unit_metric(METRIC_PH_MINUS, UNIT_GRAMS)},
+    ),
+    (
+        "chlore_total", "Chlore à ajouter (total)", unit_metric(METRIC_CHLORE, UNIT_GRAMS), UNIT_GRAMS,
+        "mdi:bottle-tonic-plus", {"total_unites": unit_metric(METRIC_CHLORE, "unités")},
+    ),
+    ("filtration_total", "Temps de filtration effectué aujourd'hui (total)", METRIC_FILTRATION_HOURS, UNIT_HOURS, "mdi:clock-check", {}),
+    ("energie_total", "Énergie de filtration (total)", METRIC_ENERGY_KWH, "kWh", "mdi:lightning-bolt", {}),
+]
+
+class PiscinexaFleetSensor(SensorEntity):
+    """Agrégat global sur l'ensemble des piscines configurées."""
+
+    def __init__(self, hass: HomeAssistant, fleet, key: str, label: str, metric: str, unit: str, icon: str, extra: dict):
+        self._hass = hass
+        self._fleet = fleet
+        self._metric = metric
+        self._extra = extra
+        self._attr_friendly_name = f"Piscinexa Flotte {label}"
+        self._attr_unique_id = f"piscinexa_fleet_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, "piscinexa_fleet")},
+            name="Piscinexa Flotte",
+            manufacturer="Piscinexa",
+            model="Flotte",
+            sw_version=VERSION,
+        )
+        self._attr_icon = icon
+        self._attr_native_unit_of_measurement = unit
+        self._attr_should_poll = False
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(
+            self._fleet.async_add_listener([self._metric, *self._extra.values()], self.async_write_ha_state)
+        )
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        return self._fleet.total(self._metric)
+
+    @property
+    def extra_state_attributes(self):
+        attributes = {name: self._fleet.total(metric) for name, metric in self._extra.items()}
+        attributes["pool_count"] = self._fleet.pool_count(self._metric)
+        return attributes
+
+STOCK_LABELS = {
+    PRODUCT_PH_PLUS: "Stock pH+",
+    PRODUCT_PH_MINUS: "Stock pH-",
+    PRODUCT_CHLORE: "Stock chlore",
+}
+
+class PiscinexaStockSensor(SensorEntity):
+    """Jours de stock restants pour un produit, d'une piscine ou du stock partagé.
+
+    Pour une piscine, la valeur suit la forme choisie dans son select de
+    traitement ; pour le stock partagé, c'est la forme qui s'épuisera en
+    premier.
+    """
+
+    # Un dictionnaire détaillé par forme de produit
+    _unrecorded_attributes = frozenset(form for units in PRODUCT_UNITS.values() for form in units)
+
+    def __init__(self, hass: HomeAssistant, product: str, label: str, entry: ConfigEntry = None, pool: str = None):
+        self._hass = hass
+        self._entry = entry
+        self._pool = pool
+        self._product = product
+        self._inventory = hass.data[DOMAIN]["inventory"]
+        self._subscriptions = []
+        # « pH+ » et « pH- » se slugifient tous deux en « ph » : l'entity_id suit la clé du produit
+        if pool is None:
+            self.entity_id = f"sensor.piscinexa_flotte_stock_{product}_partage"
+            self._attr_friendly_name = f"Piscinexa Flotte {label} partagé"
+            self._attr_unique_id = f"piscinexa_fleet_stock_{product}"
+            self._attr_device_info = DeviceInfo(
+                identifiers={(DOMAIN, "piscinexa_fleet")},
+                name="Piscinexa Flotte",
+                manufacturer="Piscinexa",
+                model="Flotte",
+                sw_version=VERSION,
+            )
+        else:
+            self.entity_id = f"sensor.{slugify(pool)}_stock_{product}"
+            self._attr_friendly_name = f"{pool.capitalize()} {label}"
+            self._attr_unique_id = f"{entry.entry_id}_stock_{product}"
+            self._attr_device_info = DeviceInfo(
+                identifiers={(DOMAIN, f"piscinexa_{pool}")},
+                name=pool.capitalize(),
+                manufacturer="Piscinexa",
+                model="Piscine",
+                sw_version=VERSION,
+            )
+            self._select_id = entry_entity_id(hass, entry, "select", f"{product}_treatment")
+            self._dispatcher = hass.data[DOMAIN][entry.entry_id]["dispatcher"]
+        self._attr_icon = "mdi:package-variant"
+        self._attr_native_unit_of_measurement = UNIT_DAYS
+        self._attr_should_poll = False
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._inventory.async_add_listener(self.async_write_ha_state))
+        if self._pool is not None:
+            self._subscriptions.append(
+                self._dispatcher.async_subscribe([self._select_id], self._async_update_from_select)
+            )
+
+    async def async_will_remove_from_hass(self):
+        for subscription in self._subscriptions:
+            subscription()
+        self._subscriptions.clear()
+
+    @callback
+    def _async_update_from_select(self, event):
+        self.async_write_ha_state()
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    def _selected_form(self):
+        select_state = self._hass.states.get(self._select_id)
+        if select_state and select_state.state in PRODUCT_UNITS[self._product]:
+            return select_state.state
+        return None
+
+    def _scope(self, form):
+        if self._pool is None:
+            return SHARED_SCOPE
+        return self._inventory.scope_for(self._pool, self._product, form)
+
+    @property
+    def native_value(self):
+        if self._pool is not None:
+            form = self._selected_form()
+            return self._inventory.days_remaining(self._scope(form), self._product, form) if form else None
+        days = [
+            self._inventory.days_remaining(SHARED_SCOPE, self._product, form)
+            for form in PRODUCT_UNITS[self._product]
+        ]
+        days = [value for value in days if value is not None]
+        return min(days) if days else None
+
+    @property
+    def extra_state_attributes(self):
+        attributes = {}
+        for form, unit in PRODUCT_UNITS[self._product].items():
+            scope = self._scope(form)
+            attributes[form] = {
+                "scope": scope,
+                "stock": self._inventory.stock(scope, self._product, form),
+                "unit": unit,
+                "daily_consumption": self._inventory.daily_consumption(scope, self._product, form),
+                "days_remaining": self._inventory.days_remaining(scope, self._product, form),
+            }
+        if self._pool is not None:
+            attributes["selected_form"] = self._selected_form()
+        return attributes
+
+class PiscinexaProfilingSensor(SensorEntity):
+    """Temps de calcul cumulé des capteurs de la piscine, avec les entités les plus coûteuses.
+
+    Créé seulement avec l'option profiling, et désactivé par défaut. L'état
+    est rafraîchi à chaque interrogation plutôt qu'à chaque mesure, pour ne
+    pas ajouter d'écritures à celles qu'il observe.
+    """
+
+    _unrecorded_attributes = frozenset({"entities"})
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._name = name
+        self._attr_name = f"{name}_temps_calcul"
+        self._attr_friendly_name = f"{name.capitalize()} Temps de calcul"
+        self._attr_unique_id = f"{entry.entry_id}_temps_calcul"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_{name}")},
+            name=name.capitalize(),
+            manufacturer="Piscinexa",
+            model="Piscine",
+            sw_version=VERSION,
+        )
+        self._attr_icon = "mdi:timer-cog-outline"
+        self._attr_native_unit_of_measurement = "ms"
+        self._attr_state_class = "total_increasing"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self._profiler = hass.data[DOMAIN][entry.entry_id]["profiler"]
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        return round(self._profiler.total_seconds * 1000, 3)
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "calls": self._profiler.calls,
+            "entities": dict(self._profiler.by_entity()[:TOP_ENTITIES]),
+        }
+
+SIMULATOR_SENSOR_DESCRIPTIONS = [
+    ("ph", "pH", STREAM_PROBES, None, SensorDeviceClass.PH, "mdi:ph"),
+    ("chlore", "Chlore", STREAM_PROBES, UNIT_MG_PER_LITER, None, "mdi:water-check"),
+    ("temperature", "Température", STREAM_PROBES, UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE, "mdi:thermometer"),
+    ("power", "Puissance pompe", STREAM_POWER, UnitOfPower.WATT, SensorDeviceClass.POWER, "mdi:pump"),
+]
+
+class PiscinexaSimulatorSensor(SensorEntity):
+    """Mesure synthétique d'une piscine simulée, utilisable comme source d'une vraie entrée."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, simulator, key: str, label: str, stream: str, unit, device_class, icon: str):
+        self._hass = hass
+        self._entry = entry
+        self._simulator = simulator
+        self._key = key
+        self._stream = stream
+        name = entry.data["name"]
+        self._attr_friendly_name = f"{name.capitalize()} Simulateur {label}"
+        self._attr_unique_id = f"{entry.entry_id}_simulateur_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"piscinexa_simulateur_{name}")},
+            name=f"{name.capitalize()} Simulateur",
+            manufacturer="Piscinexa",
+            model="Simulateur",
+            sw_version=VERSION,
+        )
+        self._attr_icon = icon
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_state_class = "measurement"
+        self._attr_should_poll = False
+
+    async def async_added_to_hass(self):
+        self.async_on_remove(self._simulator.async_add_listener(self._stream, self.async_write_ha_state))
+
+    @property
+    def name(self):
+        return self._attr_friendly_name
+
+    @property
+    def native_value(self):
+        return self._simulator.readings[self._key]
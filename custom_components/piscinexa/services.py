@@ -0,0 +1,224 @@
+"""Services de l'intégration Piscinexa."""
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN, CONF_SIMULATOR, PH_TREATMENT_OPTIONS, CHLORE_TREATMENT_OPTIONS
+from .dosage import PH_DOSE_COEFFICIENTS, CHLORE_DOSE_COEFFICIENTS, dose_grid, value_count, value_range
+from .inventory import PRODUCT_ALIASES, PRODUCT_UNITS, SHARED_SCOPE
+from .planner import PRODUCT_PRICES_SCHEMA, async_plan_treatment, build_snapshot, plan_summary, product_prices
+from .pool_import import async_import_pools, async_read_pools_file, validate_pools
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SIMULATE_DOSING = "simulate_dosing"
+SERVICE_PLAN_TREATMENT = "plan_treatment"
+SERVICE_APPLY_TREATMENT = "apply_treatment"
+SERVICE_RESTOCK = "restock"
+SERVICE_IMPORT_POOLS = "import_pools"
+
+# Nombre maximal de lignes par produit renvoyées par simulate_dosing
+MAX_SIMULATION_ROWS = 20000
+
+# Bornes des valeurs simulées, qui couvrent le pH comme le chlore (mg/L)
+SIMULATION_VALUE_MIN = 0.0
+SIMULATION_VALUE_MAX = 100.0
+SIMULATION_VALUE = vol.All(
+    vol.Coerce(float), vol.Range(min=SIMULATION_VALUE_MIN, max=SIMULATION_VALUE_MAX)
+)
+
+RANGE_SCHEMA = vol.Any(
+    vol.All(SIMULATION_VALUE, lambda value: {"min": value, "max": value, "step": 1.0}),
+    vol.Schema({
+        vol.Required("min"): SIMULATION_VALUE,
+        vol.Required("max"): SIMULATION_VALUE,
+        vol.Optional("step", default=0.1): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
+    }),
+)
+
+SIMULATE_DOSING_SCHEMA = vol.Schema({
+    vol.Optional("ph_current", default={"min": 6.8, "max": 8.0, "step": 0.1}): RANGE_SCHEMA,
+    vol.Optional("ph_target", default=7.4): RANGE_SCHEMA,
+    vol.Optional("chlore_current", default={"min": 0.0, "max": 3.0, "step": 0.5}): RANGE_SCHEMA,
+    vol.Optional("chlore_target", default=2.0): RANGE_SCHEMA,
+    vol.Required("volumes"): vol.All(cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0))]),
+    vol.Optional("ph_forms", default=list(PH_TREATMENT_OPTIONS)): vol.All(
+        cv.ensure_list, [vol.In(PH_TREATMENT_OPTIONS)]
+    ),
+    vol.Optional("chlore_forms", default=list(CHLORE_TREATMENT_OPTIONS)): vol.All(
+        cv.ensure_list, [vol.In(CHLORE_TREATMENT_OPTIONS)]
+    ),
+})
+
+PLAN_TREATMENT_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Optional("ph_current"): vol.Coerce(float),
+    vol.Optional("ph_target"): vol.Coerce(float),
+    vol.Optional("chlore_current"): vol.Coerce(float),
+    vol.Optional("chlore_target"): vol.Coerce(float),
+    vol.Optional("prices"): PRODUCT_PRICES_SCHEMA,
+})
+
+APPLY_TREATMENT_SCHEMA = vol.Schema({
+    vol.Required("name"): cv.string,
+    vol.Required("treatment_type"): vol.In(PRODUCT_ALIASES),
+    vol.Required("treatment_form"): cv.string,
+    vol.Required("quantity"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+
+RESTOCK_SCHEMA = vol.Schema({
+    vol.Optional("name"): cv.string,
+    vol.Required("treatment_type"): vol.In(PRODUCT_ALIASES),
+    vol.Required("treatment_form"): cv.string,
+    vol.Required("quantity"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional("replace", default=False): cv.boolean,
+})
+
+IMPORT_POOLS_SCHEMA = vol.Schema({
+    vol.Required("path"): cv.string,
+    vol.Optional("dry_run", default=False): cv.boolean,
+})
+
+
+def _count(bounds: dict) -> int:
+    return value_count(bounds["min"], bounds["max"], bounds["step"])
+
+
+def _expand(bounds: dict) -> list:
+    return value_range(bounds["min"], bounds["max"], bounds["step"])
+
+
+def _loaded_entry(hass: HomeAssistant, name: str):
+    """Retourne l'entrée chargée de la piscine portant ce nom."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (
+            entry.data.get("name") == name
+            and entry.entry_id in hass.data.get(DOMAIN, {})
+            and not entry.data.get(CONF_SIMULATOR)
+        ):
+            return entry
+    raise ServiceValidationError(f"Aucune piscine Piscinexa chargée nommée {name}")
+
+
+def _product_form(call: ServiceCall):
+    """Produit et forme d'un appel, la forme devant exister pour ce produit."""
+    product = PRODUCT_ALIASES[call.data["treatment_type"]]
+    form = call.data["treatment_form"]
+    if form not in PRODUCT_UNITS[product]:
+        raise ServiceValidationError(
+            f"Forme {form} inconnue pour {product} (formes possibles : {', '.join(PRODUCT_UNITS[product])})"
+        )
+    return product, form
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Enregistre les services de Piscinexa."""
+
+    async def async_simulate_dosing(call: ServiceCall) -> ServiceResponse:
+        """Calcule la grille complète des doses recommandées."""
+        volumes = call.data["volumes"]
+        ph_forms = call.data["ph_forms"]
+        chlore_forms = call.data["chlore_forms"]
+
+        # La taille de la grille est contrôlée avant de construire la moindre plage
+        rows = max(
+            _count(call.data["ph_current"]) * _count(call.data["ph_target"]) * len(ph_forms),
+            _count(call.data["chlore_current"]) * _count(call.data["chlore_target"]) * len(chlore_forms),
+        ) * len(volumes)
+        if rows > MAX_SIMULATION_ROWS:
+            raise ServiceValidationError(
+                f"La simulation demandée produirait {rows} lignes (maximum {MAX_SIMULATION_ROWS})"
+            )
+
+        ph_currents = _expand(call.data["ph_current"])
+        ph_targets = _expand(call.data["ph_target"])
+        chlore_currents = _expand(call.data["chlore_current"])
+        chlore_targets = _expand(call.data["chlore_target"])
+
+        response = {
+            "ph_plus": dose_grid(ph_currents, ph_targets, volumes, ph_forms, PH_DOSE_COEFFICIENTS),
+            "ph_minus": dose_grid(
+                ph_currents, ph_targets, volumes, ph_forms, PH_DOSE_COEFFICIENTS, raise_value=False
+            ),
+            "chlore": dose_grid(chlore_currents, chlore_targets, volumes, chlore_forms, CHLORE_DOSE_COEFFICIENTS),
+        }
+        _LOGGER.debug(f"Simulation de dosage : {rows} lignes maximum par produit")
+        return response
+
+    async def async_plan_treatment_service(call: ServiceCall) -> ServiceResponse:
+        """Calcule le plan de traitement d'une piscine, avec surcharges éventuelles."""
+        entry = _loaded_entry(hass, call.data["name"])
+        snapshot = build_snapshot(hass, entry)
+        for key in ("ph_current", "ph_target", "chlore_current", "chlore_target"):
+            if key in call.data:
+                snapshot[key] = call.data[key]
+        plan = await async_plan_treatment(hass, snapshot, product_prices(entry, call.data.get("prices")))
+        return {**plan, "summary": plan_summary(plan), "snapshot": snapshot}
+
+    async def async_apply_treatment(call: ServiceCall) -> ServiceResponse:
+        """Enregistre un traitement appliqué et décrémente le stock correspondant."""
+        name = _loaded_entry(hass, call.data["name"]).data["name"]
+        product, form = _product_form(call)
+        scope, stock = hass.data[DOMAIN]["inventory"].async_consume(name, product, form, call.data["quantity"])
+        _LOGGER.info(
+            f"Traitement appliqué pour {name} : {call.data['quantity']} {PRODUCT_UNITS[product][form]} "
+            f"de {product} ({form}), stock {scope} restant : {stock}"
+        )
+        return {"scope": scope, "stock": stock, "unit": PRODUCT_UNITS[product][form]}
+
+    async def async_restock(call: ServiceCall) -> ServiceResponse:
+        """Réapprovisionne le stock d'une piscine ou le stock partagé."""
+        scope = _loaded_entry(hass, call.data["name"]).data["name"] if call.data.get("name") else SHARED_SCOPE
+        product, form = _product_form(call)
+        stock = hass.data[DOMAIN]["inventory"].async_restock(
+            scope, product, form, call.data["quantity"], call.data["replace"]
+        )
+        return {"scope": scope, "stock": stock, "unit": PRODUCT_UNITS[product][form]}
+
+    async def async_import_pools_service(call: ServiceCall) -> ServiceResponse:
+        """Crée en une fois les piscines décrites par un fichier YAML ou JSON."""
+        raw = await async_read_pools_file(hass, call.data["path"])
+        pools, skipped = validate_pools(hass, raw)
+        if call.data["dry_run"]:
+            return {"created": [], "valid": [pool["name"] for pool in pools], "skipped": skipped}
+        created = await async_import_pools(hass, pools)
+        return {"created": created, "skipped": skipped}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SIMULATE_DOSING,
+        async_simulate_dosing,
+        schema=SIMULATE_DOSING_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_TREATMENT,
+        async_plan_treatment_service,
+        schema=PLAN_TREATMENT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_TREATMENT,
+        async_apply_treatment,
+        schema=APPLY_TREATMENT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTOCK,
+        async_restock,
+        schema=RESTOCK_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_POOLS,
+        async_import_pools_service,
+        schema=IMPORT_POOLS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,238 @@
+"""Piscine simulée : sondes et compteur de puissance synthétiques.
+
+Une entrée simulateur crée des capteurs de pH, de chlore, de température et
+de puissance de pompe, que le flux de configuration d'une piscine peut
+ensuite choisir comme sources. Réglés sur des périodes courtes, ils servent
+aussi de générateur de charge.
+"""
+import logging
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_PUMP_POWER,
+    CONF_SIM_POWER_INTERVAL,
+    CONF_SIM_PROBE_INTERVAL,
+    CONF_SIM_TIME_SCALE,
+    DEFAULT_PUMP_POWER,
+    DEFAULT_SIM_POWER_INTERVAL,
+    DEFAULT_SIM_PROBE_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STREAM_POWER = "power"
+STREAM_PROBES = "probes"
+
+# Température de l'eau : sinusoïde journalière, maximum en fin d'après-midi (°C, h)
+TEMPERATURE_AMPLITUDE = 1.2
+TEMPERATURE_PEAK_HOUR = 17
+
+# Décroissance du chlore libre (1/h à 25 °C), doublée tous les 10 °C et accrue par les UV en journée
+CHLORE_DECAY_RATE = 0.02
+CHLORE_UV_FACTOR = 3.0
+SUNRISE_HOUR = 7
+SUNSET_HOUR = 21
+# Production de l'électrolyseur, pompe en marche (mg/L/h)
+CHLORINATOR_RATE = 0.15
+
+# Le pH remonte vers l'équilibre du CO2 dissous, plus vite lorsque la pompe brasse l'eau (1/h)
+PH_EQUILIBRIUM = 8.2
+PH_DRIFT_RATE_IDLE = 0.002
+PH_DRIFT_RATE_PUMPING = 0.01
+# Régulateur de pH- à hystérésis : injection pompe en marche, du seuil haut jusqu'à la consigne (pH/h)
+PH_REGULATOR_SETPOINT = 7.3
+PH_REGULATOR_HIGH = 7.5
+PH_REGULATOR_RATE = 0.05
+
+# Filtration centrée sur le début d'après-midi, durée = température / 2
+FILTRATION_CENTER_HOUR = 14
+
+# Bruit de mesure (écart-type) des capteurs simulés
+NOISE = {"ph": 0.02, "chlore": 0.05, "temperature": 0.1, "power": 0.02}
+
+
+class PoolSimulation:
+    """Modèle physique simplifié d'une piscine, intégré pas à pas.
+
+    Chaque pas utilise la solution exacte des équations sur sa durée : le
+    modèle reste stable quelle que soit la période de mise à jour.
+    """
+
+    def __init__(self, mean_temperature: float, pump_power: float, now: datetime, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+        self._mean_temperature = mean_temperature
+        self._pump_power = pump_power
+        self._time = now
+        self.temperature = self._diurnal_temperature(now)
+        self.ph = PH_REGULATOR_SETPOINT
+        self.chlore = 2.0
+        self.pump_running = self._pump_scheduled(now)
+        self._dosing_ph = False
+
+    @staticmethod
+    def _hour(moment: datetime) -> float:
+        return moment.hour + moment.minute / 60 + moment.second / 3600
+
+    def _diurnal_temperature(self, moment: datetime) -> float:
+        phase = 2 * math.pi * (self._hour(moment) - TEMPERATURE_PEAK_HOUR) / 24
+        return self._mean_temperature + TEMPERATURE_AMPLITUDE * math.cos(phase)
+
+    def _pump_scheduled(self, moment: datetime) -> bool:
+        hours = min(max(self._mean_temperature / 2, 2), 24)
+        return abs(self._hour(moment) - FILTRATION_CENTER_HOUR) < hours / 2
+
+    def _sunlight(self, moment: datetime) -> float:
+        hour = self._hour(moment)
+        if not SUNRISE_HOUR < hour < SUNSET_HOUR:
+            return 0.0
+        return math.sin(math.pi * (hour - SUNRISE_HOUR) / (SUNSET_HOUR - SUNRISE_HOUR))
+
+    def advance(self, now: datetime) -> None:
+        """Fait évoluer l'eau jusqu'à now."""
+        hours = (now - self._time).total_seconds() / 3600
+        if hours <= 0:
+            return
+        self._time = now
+        self.pump_running = self._pump_scheduled(now)
+        self.temperature = self._diurnal_temperature(now)
+
+        decay = (
+            CHLORE_DECAY_RATE * 2 ** ((self.temperature - 25) / 10) * (1 + CHLORE_UV_FACTOR * self._sunlight(now))
+        )
+        production = CHLORINATOR_RATE if self.pump_running else 0.0
+        equilibrium = production / decay
+        self.chlore = equilibrium + (self.chlore - equilibrium) * math.exp(-decay * hours)
+
+        drift = PH_DRIFT_RATE_PUMPING if self.pump_running else PH_DRIFT_RATE_IDLE
+        self.ph = PH_EQUILIBRIUM + (self.ph - PH_EQUILIBRIUM) * math.exp(-drift * hours)
+        if self.ph >= PH_REGULATOR_HIGH:
+            self._dosing_ph = True
+        if self._dosing_ph and self.pump_running:
+            self.ph = max(self.ph - PH_REGULATOR_RATE * hours, PH_REGULATOR_SETPOINT)
+            self._dosing_ph = self.ph > PH_REGULATOR_SETPOINT
+
+    def _noisy(self, key: str, value: float, relative: bool = False) -> float:
+        sigma = NOISE[key] * (value if relative else 1)
+        return value + self._random.gauss(0, sigma)
+
+    def power_reading(self) -> float:
+        if not self.pump_running:
+            return 0.0
+        return round(max(self._noisy("power", self._pump_power, relative=True), 0.0), 1)
+
+    def probe_readings(self) -> Dict[str, float]:
+        return {
+            "ph": round(self._noisy("ph", self.ph), 2),
+            "chlore": round(max(self._noisy("chlore", self.chlore), 0.0), 2),
+            "temperature": round(self._noisy("temperature", self.temperature), 1),
+        }
+
+
+class PiscinexaSimulator:
+    """Fait avancer la simulation d'une entrée et publie ses mesures.
+
+    Le compteur de puissance et les sondes ont chacun leur période ; les
+    capteurs sont notifiés à chaque mesure de leur flux. Avec time_scale, le
+    temps simulé s'écoule plus vite que le temps réel, pour parcourir une
+    journée en quelques minutes lors d'une démonstration.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._hass = hass
+        config = {**entry.data, **entry.options}
+        self.name = entry.data["name"]
+        self.power_interval = float(config.get(CONF_SIM_POWER_INTERVAL, DEFAULT_SIM_POWER_INTERVAL))
+        self.probe_interval = float(config.get(CONF_SIM_PROBE_INTERVAL, DEFAULT_SIM_PROBE_INTERVAL))
+        self.time_scale = float(config.get(CONF_SIM_TIME_SCALE, 1.0))
+        self._started = dt_util.utcnow()
+        self._model = PoolSimulation(
+            float(config.get("temperature", 26.0)),
+            float(config.get(CONF_PUMP_POWER, DEFAULT_PUMP_POWER)),
+            self._simulated_now(),
+        )
+        self.readings: Dict[str, Optional[float]] = {"power": None, "ph": None, "chlore": None, "temperature": None}
+        self._ticks = {STREAM_POWER: 0, STREAM_PROBES: 0}
+        self._listeners: Dict[str, List[Callable[[], None]]] = {STREAM_POWER: [], STREAM_PROBES: []}
+        self._unsubs: List[CALLBACK_TYPE] = []
+
+    def _simulated_now(self) -> datetime:
+        elapsed = dt_util.utcnow() - self._started
+        return dt_util.as_local(self._started + elapsed * self.time_scale)
+
+    @callback
+    def async_start(self) -> None:
+        self._async_measure(STREAM_POWER)
+        self._async_measure(STREAM_PROBES)
+        self._unsubs.append(async_track_time_interval(
+            self._hass, self._async_power_tick, timedelta(seconds=self.power_interval),
+            name=f"Piscinexa simulateur {self.name} puissance",
+        ))
+        self._unsubs.append(async_track_time_interval(
+            self._hass, self._async_probes_tick, timedelta(seconds=self.probe_interval),
+            name=f"Piscinexa simulateur {self.name} sondes",
+        ))
+        _LOGGER.debug(
+            f"Simulateur {self.name} démarré : puissance toutes les {self.power_interval} s, "
+            f"sondes toutes les {self.probe_interval} s, temps x{self.time_scale}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+
+    @callback
+    def async_add_listener(self, stream: str, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Appelle listener à chaque nouvelle mesure du flux donné."""
+        self._listeners[stream].append(listener)
+
+        @callback
+        def _remove() -> None:
+            if listener in self._listeners[stream]:
+                self._listeners[stream].remove(listener)
+
+        return _remove
+
+    @callback
+    def _async_power_tick(self, _now: datetime) -> None:
+        self._async_measure(STREAM_POWER)
+
+    @callback
+    def _async_probes_tick(self, _now: datetime) -> None:
+        self._async_measure(STREAM_PROBES)
+
+    @callback
+    def _async_measure(self, stream: str) -> None:
+        self._model.advance(self._simulated_now())
+        if stream == STREAM_POWER:
+            self.readings["power"] = self._model.power_reading()
+        else:
+            self.readings.update(self._model.probe_readings())
+        self._ticks[stream] += 1
+        for listener in list(self._listeners[stream]):
+            listener()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """État du modèle et nombre de mesures, pour les diagnostics."""
+        return {
+            "power_interval": self.power_interval,
+            "probe_interval": self.probe_interval,
+            "time_scale": self.time_scale,
+            "simulated_time": self._simulated_now().isoformat(),
+            "pump_running": self._model.pump_running,
+            "model": {
+                "ph": round(self._model.ph, 3),
+                "chlore": round(self._model.chlore, 3),
+                "temperature": round(self._model.temperature, 2),
+            },
+            "measures": dict(self._ticks),
+        }
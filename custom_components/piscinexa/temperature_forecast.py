@@ -0,0 +1,332 @@
+"""Prévision de la température de l'eau à partir des prévisions météo."""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, CONF_WEATHER_ENTITY, CONF_COVER_ENTITY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Volume de référence (m³) auquel les coefficients du modèle sont rapportés
+REFERENCE_VOLUME = 30.0
+
+# Variables explicatives : constante, écart air - eau, ensoleillement (0 à 1),
+# vent (dizaines de km/h), part de la journée sous couverture
+FEATURES = ("bias", "air_delta", "sun", "wind", "covered")
+# Coefficients initiaux (°C par jour), raisonnables avant tout apprentissage
+PRIOR_COEFFICIENTS = (0.0, 0.15, 1.0, -0.3, 0.3)
+PRIOR_VARIANCE = 10.0
+FORGETTING_FACTOR = 0.98
+
+COVERED_STATES = ("closed", "on")
+
+# Valeurs retenues lorsque la météo ne fournit pas la nébulosité ou le vent
+DEFAULT_CLOUD_COVERAGE = 50.0
+DEFAULT_WIND_SPEED = 0.0
+
+
+def _attribute(values: Dict[str, Any], key: str, default: float) -> float:
+    value = values.get(key)
+    return default if value is None else float(value)
+
+
+class RecursiveLeastSquares:
+    """Moindres carrés récursifs avec facteur d'oubli.
+
+    Chaque observation met à jour les coefficients et leur matrice de
+    covariance en O(n²), sans conserver l'historique des observations.
+    """
+
+    def __init__(self, prior: Sequence[float], variance: float = PRIOR_VARIANCE, forgetting: float = FORGETTING_FACTOR):
+        size = len(prior)
+        self.theta: List[float] = list(prior)
+        self.covariance: List[List[float]] = [
+            [variance if row == column else 0.0 for column in range(size)] for row in range(size)
+        ]
+        self.forgetting = forgetting
+        self.samples = 0
+
+    def predict(self, x: Sequence[float]) -> float:
+        return sum(coefficient * value for coefficient, value in zip(self.theta, x))
+
+    def update(self, x: Sequence[float], y: float) -> float:
+        """Intègre une observation ; retourne l'erreur de prévision a priori."""
+        size = len(self.theta)
+        px = [sum(self.covariance[row][column] * x[column] for column in range(size)) for row in range(size)]
+        denominator = self.forgetting + sum(x[row] * px[row] for row in range(size))
+        gain = [value / denominator for value in px]
+        error = y - self.predict(x)
+        self.theta = [coefficient + g * error for coefficient, g in zip(self.theta, gain)]
+        self.covariance = [
+            [(self.covariance[row][column] - gain[row] * px[column]) / self.forgetting for column in range(size)]
+            for row in range(size)
+        ]
+        self.samples += 1
+        return error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"theta": self.theta, "covariance": self.covariance, "samples": self.samples}
+
+    def load(self, data: Dict[str, Any]) -> None:
+        if len(data.get("theta", [])) == len(self.theta):
+            self.theta = [float(value) for value in data["theta"]]
+            self.covariance = [[float(value) for value in row] for row in data["covariance"]]
+            self.samples = int(data.get("samples", 0))
+
+
+def features(air: float, water: float, cloud: float, wind: float, covered: float, volume: float) -> List[float]:
+    """Vecteur explicatif d'une journée, ramené au volume de référence."""
+    scale = REFERENCE_VOLUME / max(volume, 1.0)
+    values = (1.0, air - water, 1 - min(max(cloud, 0.0), 100.0) / 100, wind / 10, covered)
+    return [value * scale for value in values]
+
+
+def forecast_day(forecast: Sequence[Dict[str, Any]], day: date) -> Optional[Dict[str, float]]:
+    """Moyennes des prévisions (horaires ou journalières) d'une date locale."""
+    air, cloud, wind = [], [], []
+    for item in forecast:
+        when = dt_util.parse_datetime(str(item.get("datetime", "")))
+        if when is None or dt_util.as_local(when).date() != day or item.get("temperature") is None:
+            continue
+        temperature = float(item["temperature"])
+        if item.get("templow") is not None:
+            temperature = (temperature + float(item["templow"])) / 2
+        air.append(temperature)
+        cloud.append(_attribute(item, "cloud_coverage", DEFAULT_CLOUD_COVERAGE))
+        wind.append(_attribute(item, "wind_speed", DEFAULT_WIND_SPEED))
+    if not air:
+        return None
+    return {
+        "air_temperature": sum(air) / len(air),
+        "cloud_coverage": sum(cloud) / len(cloud),
+        "wind_speed": sum(wind) / len(wind),
+    }
+
+
+class PiscinexaWaterTemperatureModel:
+    """Prévoit la température de l'eau du lendemain d'une piscine.
+
+    Les prévisions de l'entité météo sont mises en cache et ne sont
+    redemandées que lorsque cette entité est mise à jour. Chaque jour, à
+    minuit, la variation observée de la température de l'eau et la météo
+    relevée pendant la journée ajoutent une observation au modèle, ajusté
+    par moindres carrés récursifs et persisté entre les redémarrages.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, dispatcher, scheduler):
+        self._hass = hass
+        self._entry = entry
+        self._dispatcher = dispatcher
+        self._scheduler = scheduler
+        self._weather_id: Optional[str] = entry.options.get(CONF_WEATHER_ENTITY) or None
+        self._cover_id: Optional[str] = entry.options.get(CONF_COVER_ENTITY) or None
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.temperature_model.{entry.entry_id}")
+        self._model = RecursiveLeastSquares(PRIOR_COEFFICIENTS)
+        self._unsubs: List[CALLBACK_TYPE] = []
+        self._listeners: List[Callable[[], None]] = []
+        self._forecast: List[Dict[str, Any]] = []
+        self._forecast_version: Optional[datetime] = None
+        self._fetching = False
+        self._fetches = 0
+        self._cache_hits = 0
+        # Relevés de la journée en cours : sommes et nombre d'échantillons
+        self._day: Dict[str, float] = {}
+        self._water_start: Optional[float] = None
+        self.prediction: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._weather_id is not None
+
+    async def async_load(self) -> None:
+        """Charge le modèle et les relevés de la journée enregistrés."""
+        if not self.enabled:
+            return
+        data = await self._store.async_load() or {}
+        self._model.load(data.get("model", {}))
+        if data.get("day", {}).get("date") == dt_util.now().date().isoformat():
+            self._day = data["day"]
+            self._water_start = data.get("water_start")
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {"model": self._model.as_dict(), "day": self._day, "water_start": self._water_start}
+
+    @callback
+    def async_start(self) -> None:
+        """Suit l'entité météo et la couverture, et apprend chaque jour à minuit."""
+        if not self.enabled:
+            return
+        watched = [self._weather_id] + ([self._cover_id] if self._cover_id else [])
+        self._unsubs.append(self._dispatcher.async_subscribe(watched, self._async_source_changed))
+        self._unsubs.append(
+            async_track_time_change(self._hass, self._async_new_day, hour=0, minute=0, second=0)
+        )
+        self._async_sample()
+        self._async_refresh_forecast()
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        self._listeners.clear()
+
+    def _water_temperature(self) -> Optional[float]:
+        value = self._hass.data[DOMAIN][self._entry.entry_id].get("temperature")
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _volume(self) -> float:
+        return float(self._hass.data[DOMAIN][self._entry.entry_id].get("volume", REFERENCE_VOLUME))
+
+    def _covered(self) -> float:
+        if not self._cover_id:
+            return 0.0
+        state = self._hass.states.get(self._cover_id)
+        return 1.0 if state is not None and state.state in COVERED_STATES else 0.0
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        self._async_sample()
+        if event.data.get("entity_id") == self._weather_id:
+            self._async_refresh_forecast()
+
+    @callback
+    def _async_sample(self) -> None:
+        """Ajoute la météo courante et l'état de la couverture aux relevés du jour."""
+        state = self._hass.states.get(self._weather_id)
+        if state is None or state.attributes.get("temperature") is None:
+            return
+        if self._water_start is None:
+            self._water_start = self._water_temperature()
+        today = dt_util.now().date().isoformat()
+        if self._day.get("date") != today:
+            self._day = {"date": today, "count": 0, "air": 0.0, "cloud": 0.0, "wind": 0.0, "covered": 0.0}
+        self._day["count"] += 1
+        self._day["air"] += float(state.attributes["temperature"])
+        self._day["cloud"] += _attribute(state.attributes, "cloud_coverage", DEFAULT_CLOUD_COVERAGE)
+        self._day["wind"] += _attribute(state.attributes, "wind_speed", DEFAULT_WIND_SPEED)
+        self._day["covered"] += self._covered()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_refresh_forecast(self) -> None:
+        """Redemande les prévisions seulement si l'entité météo a changé depuis le dernier appel."""
+        state = self._hass.states.get(self._weather_id)
+        if state is None:
+            return
+        if state.last_updated == self._forecast_version or self._fetching:
+            self._cache_hits += 1
+            return
+        self._fetching = True
+        self._hass.async_create_task(self._async_fetch_forecast(state.last_updated))
+
+    async def _async_fetch_forecast(self, version: datetime) -> None:
+        try:
+            for forecast_type in ("hourly", "daily"):
+                try:
+                    response = await self._hass.services.async_call(
+                        "weather",
+                        "get_forecasts",
+                        {"entity_id": self._weather_id, "type": forecast_type},
+                        blocking=True,
+                        return_response=True,
+                    )
+                except HomeAssistantError as e:
+                    _LOGGER.debug(f"Prévisions {forecast_type} indisponibles pour {self._weather_id} : {e}")
+                    continue
+                forecast = (response or {}).get(self._weather_id, {}).get("forecast") or []
+                if forecast:
+                    self._forecast = forecast
+                    break
+            self._forecast_version = version
+            self._fetches += 1
+        finally:
+            self._fetching = False
+        self._async_predict()
+
+    @callback
+    def _async_new_day(self, now: datetime) -> None:
+        """Ajoute l'observation de la journée écoulée au modèle."""
+        water = self._water_temperature()
+        if self._day.get("count") and self._water_start is not None and water is not None:
+            count = self._day["count"]
+            x = features(
+                self._day["air"] / count,
+                self._water_start,
+                self._day["cloud"] / count,
+                self._day["wind"] / count,
+                self._day["covered"] / count,
+                self._volume(),
+            )
+            error = self._model.update(x, water - self._water_start)
+            _LOGGER.debug(
+                f"Modèle de température de {self._entry.data['name']} mis à jour "
+                f"(écart de prévision {error:.2f} °C, {self._model.samples} jours)"
+            )
+        self._day = {}
+        self._water_start = water
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        self._async_sample()
+        self._async_predict()
+
+    @callback
+    def _async_predict(self) -> None:
+        """Prévoit la température de l'eau de demain et transmet la durée de filtration au planificateur."""
+        water = self._water_temperature()
+        tomorrow = dt_util.now().date() + timedelta(days=1)
+        weather = forecast_day(self._forecast, tomorrow)
+        if water is None or weather is None:
+            return
+        covered = self._covered()
+        x = features(
+            weather["air_temperature"], water, weather["cloud_coverage"], weather["wind_speed"], covered, self._volume()
+        )
+        temperature = round(water + self._model.predict(x), 1)
+        hours = round(temperature / 2, 1)
+        self.prediction = {
+            "date": tomorrow.isoformat(),
+            "water_temperature": temperature,
+            "filtration_hours": hours,
+            "covered": bool(covered),
+            **{key: round(value, 1) for key, value in weather.items()},
+        }
+        self._scheduler.async_set_forecast_hours(tomorrow, hours)
+        for listener in list(self._listeners):
+            listener()
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Appelle listener à chaque nouvelle prévision."""
+        self._listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def as_dict(self) -> Dict[str, Any]:
+        """État du modèle, pour les attributs et les diagnostics."""
+        return {
+            "weather_entity": self._weather_id,
+            "cover_entity": self._cover_id,
+            "coefficients": dict(zip(FEATURES, (round(value, 4) for value in self._model.theta))),
+            "samples": self._model.samples,
+            "forecast_entries": len(self._forecast),
+            "forecast_fetches": self._fetches,
+            "forecast_cache_hits": self._cache_hits,
+        }
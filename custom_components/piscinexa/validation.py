@@ -0,0 +1,158 @@
+"""Validation des sondes choisies dans le flux de configuration.
+
+Une sonde mal choisie (valeur texte, mauvaise unité, valeur absurde) ferait
+échouer les capteurs à chaque mise à jour : elle est refusée dès sa
+sélection. Avant le récapitulatif, les sources sont observées quelques
+secondes pour mesurer leur fréquence de mise à jour et prévisualiser les
+valeurs calculées.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import TREATMENT_FORM_FROM_CONFIG
+from .discovery import KIND_CHLORE, KIND_PH, KIND_POWER, KIND_TEMPERATURE, UNIT_KINDS
+from .dosage import chlore_coefficient, chlore_dose, ph_coefficient, ph_dose
+from .pool_config import pool_volume
+
+_LOGGER = logging.getLogger(__name__)
+
+# Plages plausibles par type de sonde (température en °C)
+PLAUSIBLE_RANGES = {
+    KIND_PH: (0.0, 14.0),
+    KIND_CHLORE: (0.0, 20.0),
+    KIND_TEMPERATURE: (-5.0, 50.0),
+    KIND_POWER: (0.0, 10000.0),
+}
+
+# Unités connues mais non converties par les capteurs
+UNSUPPORTED_UNITS = {"mv", "kw"}
+
+# Durée d'observation des sources avant le récapitulatif
+SAMPLING_SECONDS = 10
+
+# Au-delà, une source sans mise à jour est signalée comme figée
+STALE_AFTER = timedelta(hours=6)
+
+# Clés de configuration des sources, avec leur type de sonde
+SOURCE_KINDS = {
+    "ph_sensor": KIND_PH,
+    "chlore_sensor": KIND_CHLORE,
+    "temperature_sensor": KIND_TEMPERATURE,
+    "power_sensor_entity_id": KIND_POWER,
+}
+
+
+def probe_value(state: State, kind: str) -> Optional[float]:
+    """Valeur numérique d'une sonde, en °C pour la température ; None si elle n'est pas numérique."""
+    try:
+        value = float(state.state)
+    except ValueError:
+        return None
+    unit = (state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) or "").strip().lower()
+    if kind == KIND_TEMPERATURE and unit == "°f":
+        value = (value - 32) * 5 / 9
+    return value
+
+
+def check_probe(hass: HomeAssistant, entity_id: str, kind: str) -> Optional[str]:
+    """Clé d'erreur du flux si la sonde ne convient pas, None sinon.
+
+    Une sonde momentanément indisponible n'est pas refusée : elle est
+    signalée dans le récapitulatif.
+    """
+    state = hass.states.get(entity_id)
+    if state is None:
+        return "sensor_not_found"
+    if state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    unit = (state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) or "").strip().lower()
+    if unit in UNSUPPORTED_UNITS or UNIT_KINDS.get(unit, kind) != kind:
+        return "sensor_unit_mismatch"
+    value = probe_value(state, kind)
+    if value is None:
+        return "sensor_not_numeric"
+    low, high = PLAUSIBLE_RANGES[kind]
+    if not low <= value <= high:
+        return "sensor_out_of_range"
+    return None
+
+
+async def async_sample_probes(hass: HomeAssistant, sources: Dict[str, str], seconds: float) -> Dict[str, Dict[str, Any]]:
+    """Observe les sources pendant seconds et retourne, par clé, leur valeur et leur activité."""
+    updates = {entity_id: 0 for entity_id in sources.values()}
+
+    @callback
+    def _async_updated(event: Event) -> None:
+        updates[event.data["entity_id"]] += 1
+
+    unsub = async_track_state_change_event(hass, list(updates), _async_updated)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        unsub()
+
+    now = dt_util.utcnow()
+    report = {}
+    for key, entity_id in sources.items():
+        state = hass.states.get(entity_id)
+        value = probe_value(state, SOURCE_KINDS[key]) if state else None
+        age = (now - state.last_updated).total_seconds() if state else None
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            problem = "unavailable"
+        elif value is None:
+            problem = "not_numeric"
+        elif not updates[entity_id] and age > STALE_AFTER.total_seconds():
+            problem = "stale"
+        else:
+            problem = None
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT) if state else None
+        if SOURCE_KINDS[key] == KIND_TEMPERATURE and value is not None:
+            # probe_value convertit déjà les °F
+            unit = "°C"
+        report[key] = {
+            "entity_id": entity_id,
+            "value": round(value, 2) if value is not None else None,
+            "unit": unit,
+            "updates": updates[entity_id],
+            "age_seconds": round(age) if age is not None else None,
+            "problem": problem,
+        }
+    _LOGGER.debug(f"Échantillonnage des sources sur {seconds} s : {report}")
+    return report
+
+
+def _current(data: Dict[str, Any], report: Dict[str, Dict[str, Any]], key: str, manual_key: str) -> Optional[float]:
+    """Valeur mesurée par la source si elle est lisible, sinon la valeur saisie."""
+    value = report.get(key, {}).get("value")
+    if value is None:
+        value = data.get(manual_key)
+    return float(value) if value is not None else None
+
+
+def preview_values(data: Dict[str, Any], report: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[Optional[float], str]]:
+    """Valeurs calculées que produiront les capteurs avec ces sources : (valeur, unité)."""
+    volume = pool_volume(data)
+    preview: Dict[str, Tuple[Optional[float], str]] = {"volume": (round(volume, 1), "m³")}
+    ph = _current(data, report, "ph_sensor", "ph_current")
+    if ph is not None and data.get("ph_target") is not None:
+        difference = float(data["ph_target"]) - ph
+        product = "ph_plus_treatment" if difference > 0 else "ph_minus_treatment"
+        form = TREATMENT_FORM_FROM_CONFIG.get(data.get(product), data.get(product))
+        dose = ph_dose(abs(difference), volume, form)
+        preview["ph_plus" if difference > 0 else "ph_minus"] = (round(dose, 2), ph_coefficient(form)[1])
+    chlore = _current(data, report, "chlore_sensor", "chlore_current")
+    if chlore is not None and data.get("chlore_target") is not None:
+        form = TREATMENT_FORM_FROM_CONFIG.get(data.get("chlore_treatment"), data.get("chlore_treatment"))
+        dose = chlore_dose(max(float(data["chlore_target"]) - chlore, 0.0), volume, form)
+        preview["chlore"] = (round(dose, 2), chlore_coefficient(form)[1])
+    temperature = _current(data, report, "temperature_sensor", "temperature")
+    if temperature is not None:
+        preview["filtration_hours"] = (round(temperature / 2, 1), "h")
+    return preview
@@ -0,0 +1,116 @@
+"""Équilibre calco-carbonique de l'eau : indices de Langelier et de Ryznar."""
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .helpers import number_value
+
+# Valeurs par défaut des entrées (mg/L, exprimées en CaCO3 pour TAC et dureté)
+DEFAULT_ALKALINITY = 100.0
+DEFAULT_CALCIUM_HARDNESS = 250.0
+DEFAULT_TDS = 1000.0
+
+# Plage d'un indice de Langelier considéré comme équilibré
+LSI_MIN_BALANCED = -0.3
+LSI_MAX_BALANCED = 0.3
+
+# Tables précalculées : facteur de température de 0 à 50 °C par pas de 0,5 °C,
+# facteur TDS de 0 à 6000 mg/L par pas de 50 mg/L
+TEMPERATURE_TABLE_START, TEMPERATURE_TABLE_STEP, TEMPERATURE_TABLE_SIZE = 0.0, 0.5, 101
+TDS_TABLE_START, TDS_TABLE_STEP, TDS_TABLE_SIZE = 0.0, 50.0, 121
+
+
+def _temperature_factor(temperature: float) -> float:
+    return -13.12 * math.log10(temperature + 273.15) + 34.55
+
+
+def _tds_factor(tds: float) -> float:
+    return (math.log10(max(tds, 1.0)) - 1) / 10
+
+
+TEMPERATURE_FACTORS = tuple(
+    _temperature_factor(TEMPERATURE_TABLE_START + index * TEMPERATURE_TABLE_STEP)
+    for index in range(TEMPERATURE_TABLE_SIZE)
+)
+TDS_FACTORS = tuple(
+    _tds_factor(TDS_TABLE_START + index * TDS_TABLE_STEP)
+    for index in range(TDS_TABLE_SIZE)
+)
+
+
+def interpolate(values: Sequence[float], start: float, step: float, x: float) -> float:
+    """Interpolation linéaire dans une table à pas constant, bornée aux extrémités."""
+    position = (x - start) / step
+    if position <= 0:
+        return values[0]
+    if position >= len(values) - 1:
+        return values[-1]
+    index = int(position)
+    fraction = position - index
+    return values[index] + (values[index + 1] - values[index]) * fraction
+
+
+class WaterBalance:
+    """Calcule le pH de saturation à partir des entrées chimiques de la piscine.
+
+    Les facteurs calcium, alcalinité et TDS ne sont recalculés que lorsque
+    ces entrées changent ; le facteur de température est lu dans une table
+    interpolée, ce qui rend négligeable le recalcul à chaque relevé.
+    """
+
+    def __init__(self):
+        self._inputs: Optional[Tuple[float, float, float]] = None
+        self._constant = 0.0
+
+    def set_inputs(self, alkalinity: float, calcium_hardness: float, tds: float) -> None:
+        """Met à jour les entrées chimiques ; sans effet si elles n'ont pas changé."""
+        inputs = (alkalinity, calcium_hardness, tds)
+        if inputs == self._inputs:
+            return
+        self._inputs = inputs
+        tds_factor = interpolate(TDS_FACTORS, TDS_TABLE_START, TDS_TABLE_STEP, tds)
+        calcium_factor = math.log10(max(calcium_hardness, 1.0)) - 0.4
+        alkalinity_factor = math.log10(max(alkalinity, 1.0))
+        self._constant = 9.3 + tds_factor - calcium_factor - alkalinity_factor
+
+    def saturation_ph(self, temperature: float) -> float:
+        """pH de saturation (pHs) à la température donnée."""
+        return self._constant + interpolate(
+            TEMPERATURE_FACTORS, TEMPERATURE_TABLE_START, TEMPERATURE_TABLE_STEP, temperature
+        )
+
+    def langelier(self, ph: float, temperature: float) -> float:
+        """Indice de saturation de Langelier : pH - pHs."""
+        return ph - self.saturation_ph(temperature)
+
+    def ryznar(self, ph: float, temperature: float) -> float:
+        """Indice de stabilité de Ryznar : 2 pHs - pH."""
+        return 2 * self.saturation_ph(temperature) - ph
+
+
+def evaluate_water_balance(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Optional[float]]:
+    """Indices courants d'une piscine, à partir de ses entrées et des dernières mesures.
+
+    Sans relevé de pH disponible, les indices valent None : la valeur saisie à
+    la configuration ne dit rien de l'eau actuelle.
+    """
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    balance = runtime.setdefault("water_balance", WaterBalance())
+    balance.set_inputs(
+        number_value(hass, entry, "alkalinity", DEFAULT_ALKALINITY),
+        number_value(hass, entry, "calcium_hardness", DEFAULT_CALCIUM_HARDNESS),
+        number_value(hass, entry, "tds", DEFAULT_TDS),
+    )
+    ph = runtime.get("ph_current")
+    temperature = float(runtime.get("temperature", 20.0))
+    saturation_ph = balance.saturation_ph(temperature)
+    return {
+        "lsi": round(ph - saturation_ph, 2) if ph is not None else None,
+        "ryznar": round(2 * saturation_ph - ph, 2) if ph is not None else None,
+        "saturation_ph": round(saturation_ph, 2),
+        "ph": ph,
+        "temperature": temperature,
+    }